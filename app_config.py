@@ -22,7 +22,7 @@ PLACEHOLDER_TEXT_COLOR = "#708090"
 MAIN_WINDOW_WIDTH = 960
 MAIN_WINDOW_HEIGHT = 540
 POPUP_WINDOW_WIDTH = 450
-POPUP_WINDOW_HEIGHT = 250
+POPUP_WINDOW_HEIGHT = 275
 
 # --- Fonts ---
 POPPINS_BOLD_PATH = os.path.join(FONTS_DIR, "Poppins-Bold.ttf")
@@ -71,3 +71,64 @@ LIBRARIES_USED = [
 ]
 
 DEFAULT_WHISPER_MODEL = "base"
+
+# --- Media Types ---
+AUDIO_EXTENSIONS = ['.mp3', '.wav', '.m4a', '.flac', '.ogg', '.aac']
+VIDEO_EXTENSIONS = ['.mp4', '.mkv', '.mov', '.avi', '.flv', '.wmv', '.webm']
+
+# --- Transcription Engine ---
+WHISPER_DEVICE = "auto"          # "auto" (CUDA if available, else CPU), "cuda" or "cpu"
+WHISPER_CPU_PRECISION = "fp32"   # "fp32" or "int8" (dynamically quantized Linear layers)
+WHISPER_CPU_THREADS = 0          # Intra-op threads for CPU inference, 0 = PyTorch default
+WHISPER_CPU_INTEROP_THREADS = 0  # Inter-op threads for CPU inference, 0 = PyTorch default
+MODEL_CACHE_RAM_BUDGET_MB = 4096  # Unused models are evicted (LRU) above this total, 0 = unlimited
+MODEL_IDLE_TIMEOUT_SECONDS = 900  # Unused models are unloaded after this long, 0 = never
+BATCH_WORKER_PROCESSES = 0      # Parallel worker processes per batch, 0 = auto (1 on CUDA), 1 = in-process
+BATCH_THREADS_PER_WORKER = 4    # CPU cores given to each worker when BATCH_WORKER_PROCESSES is auto
+PREFETCH_LOOKAHEAD_FILES = 2    # Files decoded ahead of the one being transcribed
+PREFETCH_MAX_BUFFER_MB = 1024   # Cap on decoded PCM held in the prefetch buffer
+PREFETCH_DECODE_THREADS = 2     # Background ffmpeg decodes running at once
+TRANSCRIPTION_CACHE_ENABLED = True
+TRANSCRIPTION_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".speech_to_text_cache", "transcriptions")
+TRANSCRIPTION_CACHE_MAX_MB = 512  # Least recently used results are evicted above this size
+VAD_ENABLED = True               # Voice-activity pre-pass: only detected speech is sent to Whisper
+VAD_FRAME_MS = 30
+VAD_THRESHOLD_DB = 12.0          # 300-3400 Hz band energy must be this far above the noise floor
+VAD_ABSOLUTE_FLOOR_DB = -55.0    # Frames quieter than this (dBFS) are never speech; also caps the noise floor
+VAD_NOISE_PERCENTILE = 5         # Percentile of band energy taken as the noise floor
+VAD_MIN_SPEECH_MS = 250
+VAD_MIN_SILENCE_MS = 600         # Shorter pauses are kept inside a speech region
+VAD_SPEECH_PAD_MS = 250
+VAD_GAP_MS = 300                 # Silence inserted between concatenated speech regions
+CHUNKED_MIN_DURATION_SECONDS = 1200 # Longer recordings are split and transcribed by parallel workers
+CHUNK_TARGET_SECONDS = 300          # Approximate chunk length
+CHUNK_OVERLAP_SECONDS = 2.0         # Audio shared by neighbouring chunks, deduplicated when stitching
+CHUNK_CUT_SEARCH_SECONDS = 20.0     # Window around each target boundary searched for the quietest cut
+BATCHED_INFERENCE_ENABLED = False   # Decode 30 s windows independently in batches (no previous-text conditioning)
+ENCODER_BATCH_SIZE = 8              # Mel windows stacked into one encoder/decoder forward pass
+STREAM_STEP_SECONDS = 1.0           # Live mode: new audio between two decode passes over the window
+STREAM_MAX_LATENCY_SECONDS = 8.0    # Live mode: unconfirmed audio after which text is finalized regardless
+STREAM_CHUNK_SECONDS = 0.25         # Live mode: size of the chunks read from a pipe or replayed file
+STARTUP_PROFILE_ENABLED = True      # Print per-phase startup timings once the loading screen is done
+STARTUP_PROFILE_PATH = ""           # Also write them to this JSON file when set
+FAST_MODEL_LOADING = True           # Memory-map pre-converted weights instead of torch.load + SHA-256 on every launch
+MODEL_WEIGHT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".speech_to_text_cache", "models")
+TRANSCRIPTION_DAEMON_ENABLED = False # Send batches to a running transcription daemon (python -m transcription_daemon)
+DAEMON_HOST = "127.0.0.1"
+DAEMON_PORT = 8765
+DAEMON_WORKER_THREADS = 1           # Jobs the daemon transcribes at once; jobs for the same model take turns
+DAEMON_JOB_RETENTION_SECONDS = 3600 # Finished jobs stay queryable this long
+BATCH_MANIFEST_DIR = os.path.join(os.path.expanduser("~"), ".speech_to_text_cache", "batches")
+BATCH_MANIFEST_FSYNC_SECONDS = 2.0  # Committed segments are flushed at once and fsynced at most this often
+EXPORT_WORKER_THREADS = 2           # Background threads writing documents while the next file is transcribed
+EXPORT_MAX_PENDING = 4              # Finished transcripts waiting to be written before the batch waits for the writers
+SEGMENT_WRITER_FLUSH_SECONDS = 1.0  # SRT/WebVTT/JSONL output is flushed to disk at most this often while transcribing
+PDF_FONT_CACHE_ENABLED = True       # Parse each PDF font once per process instead of once per document
+PDF_MEASURED_LINE_WRAP = True       # Wrap PDF text with cached character widths instead of multi_cell
+STREAMING_DOCX_EXPORT = True        # Generate Word XML directly into the .docx zip instead of building python-docx objects
+MEDIA_PROBE_WORKERS = 8             # ffprobe processes run at once when reading durations of selected files
+MEDIA_PROBE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".speech_to_text_cache", "media_probe.json")
+NATIVE_AUDIO_ENABLED = True         # Read WAV audio and WAV/FLAC durations in-process instead of spawning ffmpeg/ffprobe
+UI_UPDATE_INTERVAL_MS = 50          # Progress popup redraws at most this often, however fast segments arrive
+METRICS_ENABLED = True              # Per-stage timings, real-time factor and peak memory for every batch
+METRICS_REPORT_DIR = os.path.join(os.path.expanduser("~"), ".speech_to_text_cache", "metrics")  # JSON/CSV report per batch
@@ -0,0 +1,134 @@
+# audio_prefetch.py
+import os
+import threading
+import concurrent.futures
+
+import app_config as config
+from native_audio import SAMPLE_RATE, load_audio, media_duration
+
+BYTES_PER_SECOND_PCM = SAMPLE_RATE * 4 # 16 kHz mono float32
+# Files of unknown duration are budgeted as if encoded at 32 kbps (16 bytes of PCM per byte of file),
+# and never below the 30 s the progress bar assumes for them
+PCM_BYTES_PER_UNKNOWN_FILE_BYTE = 16
+UNKNOWN_MIN_SECONDS = 30.0
+
+class AudioPrefetcher:
+    """
+    Decodes the next files of a batch to 16 kHz float32 PCM on background threads while the
+    current file is being transcribed.
+
+    At most `lookahead` files ahead of the consumer are decoded, and the decoded arrays held in
+    the buffer never exceed `max_buffer_mb`. Files whose PCM would not fit are left for the model
+    to decode itself, so get() returns None for them. Without a duration from `file_durations` or
+    the WAV/FLAC header, a file's size is budgeted pessimistically and only one such file is
+    decoded ahead at a time.
+    """
+    def __init__(self, file_paths, file_durations: dict = None, lookahead: int = None,
+                 max_buffer_mb: float = None, decode_threads: int = None):
+        self.file_paths = list(file_paths)
+        self.file_durations = file_durations or {}
+        self.lookahead = config.PREFETCH_LOOKAHEAD_FILES if lookahead is None else lookahead
+        max_buffer_mb = config.PREFETCH_MAX_BUFFER_MB if max_buffer_mb is None else max_buffer_mb
+        self.max_buffer_bytes = int(max_buffer_mb * 1024 * 1024)
+        decode_threads = decode_threads or config.PREFETCH_DECODE_THREADS
+
+        self._lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, decode_threads),
+                                                               thread_name_prefix="audio-prefetch")
+        self._futures = {}  # index -> Future[np.ndarray | None]
+        self._reserved = {}  # index -> bytes reserved in the buffer
+        self._skipped = set()
+        self._unknown = set()  # Indices in the buffer whose size was only guessed
+        self._next_to_submit = 0
+        self._consumed_up_to = 0
+        self._closed = False
+        self._dispatch()
+
+    def _estimated_bytes(self, file_path):
+        """(PCM bytes the decoded file is expected to take, whether its duration is known)."""
+        duration = self.file_durations.get(file_path) or media_duration(file_path)
+        if duration and duration > 0:
+            return int(duration * BYTES_PER_SECOND_PCM), True
+        try:
+            guessed = os.path.getsize(file_path) * PCM_BYTES_PER_UNKNOWN_FILE_BYTE
+        except OSError:
+            guessed = 0
+        return max(guessed, int(UNKNOWN_MIN_SECONDS * BYTES_PER_SECOND_PCM)), False
+
+    def _dispatch(self):
+        with self._lock:
+            while (not self._closed and self._next_to_submit < len(self.file_paths)
+                   and self._next_to_submit - self._consumed_up_to <= self.lookahead):
+                index = self._next_to_submit
+                estimated, known = self._estimated_bytes(self.file_paths[index])
+                if estimated > self.max_buffer_bytes:
+                    self._skipped.add(index)  # Too large to buffer, decoded inline by the model
+                    self._next_to_submit += 1
+                    continue
+                if self._reserved and sum(self._reserved.values()) + estimated > self.max_buffer_bytes:
+                    break  # Wait for the consumer to free buffer space
+                if not known and self._unknown:
+                    break  # One guessed size at a time: wait until the previous one is decoded
+                if not known:
+                    self._unknown.add(index)
+                self._reserved[index] = estimated
+                self._futures[index] = self._executor.submit(self._decode, index)
+                self._next_to_submit += 1
+
+    def _decode(self, index):
+        file_path = self.file_paths[index]
+        try:
+            audio = load_audio(file_path, sr=SAMPLE_RATE)
+        except Exception as e:
+            print(f"AudioPrefetcher - Warning: Could not pre-decode '{os.path.basename(file_path)}': {e}")
+            with self._lock:
+                self._unknown.discard(index)
+            self._dispatch()
+            return None
+        with self._lock:
+            # Durations from ffprobe are estimates; account for the real size once it is known.
+            self._unknown.discard(index)
+            if audio.nbytes > self.max_buffer_bytes and index > self._consumed_up_to:
+                self._reserved.pop(index, None)  # Only kept when the consumer needs it now and would decode it anyway
+                audio = None
+            else:
+                self._reserved[index] = audio.nbytes
+        self._dispatch()  # The real size may leave room (or a guessed-size slot) for the next file
+        return audio
+
+    def get(self, index):
+        """
+        Returns the decoded PCM array for file `index` (blocking until it is ready) or None if the
+        caller should decode the file itself. Buffers of earlier files are released.
+        """
+        with self._lock:
+            for done_index in [i for i in self._reserved if i < index]:
+                self._reserved.pop(done_index, None)
+                self._futures.pop(done_index, None)
+                self._unknown.discard(done_index)
+            self._consumed_up_to = max(self._consumed_up_to, index)
+        self._dispatch()
+        with self._lock:
+            future = self._futures.pop(index, None)
+            if future is None or index in self._skipped:
+                return None
+        audio = future.result()
+        if audio is None:
+            with self._lock:
+                self._reserved.pop(index, None)
+        self._dispatch()
+        return audio
+
+    def buffered_bytes(self) -> int:
+        with self._lock:
+            return sum(self._reserved.values())
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            for future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+            self._reserved.clear()
+            self._unknown.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,287 @@
+# batch_engine.py
+import os
+import queue
+import multiprocessing
+import concurrent.futures
+
+import app_config as config
+import transcription_daemon
+import transcription_handler
+from audio_prefetch import AudioPrefetcher
+from transcription_control import TranscriptionCancelled, TranscriptionControl
+
+def usable_cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError: # Not available on Windows/macOS
+        return os.cpu_count() or 1
+
+def resolve_worker_count(file_count: int, device: str, requested: int = None) -> int:
+    """
+    Number of worker processes for a batch. A single GPU is shared by one worker; on the CPU
+    "auto" (0) gives every worker BATCH_THREADS_PER_WORKER cores. Never more workers than files.
+    """
+    requested = config.BATCH_WORKER_PROCESSES if requested is None else requested
+    if device == "cuda":
+        count = 1
+    elif requested and requested > 0:
+        count = requested
+    else:
+        count = usable_cpu_count() // max(1, config.BATCH_THREADS_PER_WORKER)
+    return max(1, min(count, file_count))
+
+def partition_threads(worker_count: int) -> int:
+    """Intra-op threads per worker so that all workers together don't oversubscribe the CPU."""
+    return max(1, usable_cpu_count() // max(1, worker_count))
+
+# --- Worker process side ---
+_WORKER_STATE = {}
+
+def _worker_init(model_key, threads, progress_queue, cancel_event, pause_event):
+    model_name, device, precision = model_key
+    _WORKER_STATE.update({"model_key": model_key, "progress_queue": progress_queue, "cancel_event": cancel_event,
+                          "pause_event": pause_event})
+    # Each worker holds its own model, loaded once for the lifetime of the process.
+    transcription_handler.initialize_whisper_model(model_name, device=device, precision=precision,
+                                                   cpu_threads=threads, cpu_interop_threads=1)
+
+def worker_model_key():
+    return _WORKER_STATE["model_key"]
+
+def worker_cancelled() -> bool:
+    return _WORKER_STATE["cancel_event"].is_set()
+
+def worker_control() -> TranscriptionControl:
+    """The pool's cancel/pause events as a TranscriptionControl for the decode loop."""
+    return TranscriptionControl(_WORKER_STATE["cancel_event"], _WORKER_STATE["pause_event"])
+
+def worker_report(event: dict):
+    """Sends a progress event from a worker process to the parent."""
+    _WORKER_STATE["progress_queue"].put(event)
+
+def _worker_transcribe(index, file_path, transcribe_options):
+    if worker_cancelled():
+        return None
+    model_name, device, precision = worker_model_key()
+
+    def progress_cb(event):
+        worker_report({**event, "file_index": index})
+
+    progress_cb({'type': 'file_started', 'file_path': file_path})
+    # Workers already run in parallel, so a long file is not split further (chunk_workers=1)
+    return transcription_handler.transcribe_media(file_path, progress_callback=progress_cb,
+                                                  model_name=model_name, device=device, precision=precision,
+                                                  chunk_workers=1, control=worker_control(), **transcribe_options)
+
+def start_worker_pool(workers: int, model_key):
+    """
+    Starts a pool of worker processes that each load `model_key` with a partitioned thread count.
+    Returns (pool, progress_queue, cancel_event, pause_event); workers report through worker_report()
+    and stop or pause at their next decoded window when the events are set.
+    """
+    threads = partition_threads(workers)
+    mp_context = multiprocessing.get_context("spawn")
+    progress_queue = mp_context.Queue()
+    cancel_event = mp_context.Event()
+    pause_event = mp_context.Event()
+    pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                                                  initializer=_worker_init,
+                                                  initargs=(model_key, threads, progress_queue, cancel_event, pause_event))
+    print(f"BatchEngine: Started {workers} worker processes x {threads} threads.")
+    return pool, progress_queue, cancel_event, pause_event
+
+# --- Parent process side ---
+def mirror_event(source, target):
+    """Copies the state of an optional event (e.g. the UI's pause flag) onto a worker pool's event."""
+    if source is not None and source.is_set() != target.is_set():
+        target.set() if source.is_set() else target.clear()
+
+def _drain_progress(progress_queue, progress_callback, timeout: float = 0.0):
+    while True:
+        try:
+            event = progress_queue.get(timeout=timeout) if timeout else progress_queue.get_nowait()
+        except queue.Empty:
+            return
+        if progress_callback:
+            progress_callback(event)
+
+def run_batch(files_to_process, progress_callback=None, cancel_event=None, pause_event=None, worker_count: int = None,
+              model_name: str = None, device: str = None, precision: str = None,
+              language: str = None, task: str = "transcribe", file_durations: dict = None,
+              use_cache: bool = None, use_vad: bool = None, manifest=None, resume_segments: list = None):
+    """
+    Transcribes a list of files and yields (index, file_path, result) in input order, where result is
+    the dict returned by transcription_handler.transcribe_media or None on failure.
+
+    With more than one worker the files are spread over a process pool. Progress events are the same
+    dicts transcribe_media emits, tagged with 'file_index', and are always delivered on the thread
+    that iterates this generator.
+
+    Setting `cancel_event` stops the running files within one decoded window; while `pause_event` is set
+    they wait at their next window (models and decoder state stay loaded) and continue once it is cleared.
+
+    With TRANSCRIPTION_DAEMON_ENABLED and a daemon running, the files are queued on the daemon
+    instead, which already holds the model.
+
+    In-process runs decode the next files ahead of time (see AudioPrefetcher); `file_durations`
+    lets the prefetcher budget its buffer before decoding.
+
+    With a BatchManifest, files it records as done are handed back from the manifest without being
+    transcribed, every newly decoded segment is committed to it, and unfinished files resume after
+    their last committed segment. The caller marks files done once their output is written.
+    `resume_segments` (one list or None per file) is the lower-level form of the same resumption.
+    """
+    files_to_process = list(files_to_process)
+    if manifest is not None:
+        yield from _run_with_manifest(manifest, files_to_process, progress_callback, cancel_event,
+                                      dict(pause_event=pause_event, worker_count=worker_count, model_name=model_name, device=device,
+                                           precision=precision, language=language, task=task,
+                                           file_durations=file_durations, use_cache=use_cache, use_vad=use_vad))
+        return
+    file_options = [{"resume_segments": segments} if segments else {}
+                    for segments in (resume_segments or [None] * len(files_to_process))]
+    transcribe_options = {"language": language, "task": task, "use_cache": use_cache, "use_vad": use_vad}
+    if config.TRANSCRIPTION_DAEMON_ENABLED:
+        client = transcription_daemon.DaemonClient()
+        if client.is_available():
+            yield from _run_on_daemon(client, files_to_process, {**transcribe_options, "model_name": model_name,
+                                                                 "device": device, "precision": precision},
+                                      file_options, progress_callback, cancel_event, pause_event)
+            return
+        print("BatchEngine: Transcription daemon not reachable, transcribing in this process.")
+
+    model_key = transcription_handler.resolve_model_key(model_name, device, precision)
+    workers = resolve_worker_count(len(files_to_process), model_key[1] if model_key else "cpu", worker_count)
+
+    if workers <= 1 or model_key is None:
+        control = TranscriptionControl(cancel_event, pause_event)
+        prefetcher = AudioPrefetcher(files_to_process, file_durations=file_durations)
+        try:
+            for index, file_path in enumerate(files_to_process):
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+
+                def progress_cb(event, index=index):
+                    if progress_callback:
+                        progress_callback({**event, "file_index": index})
+
+                progress_cb({'type': 'file_started', 'file_path': file_path})
+                result = transcription_handler.transcribe_media(file_path, progress_callback=progress_cb,
+                                                                model_name=model_name, device=device, precision=precision,
+                                                                audio=prefetcher.get(index), control=control,
+                                                                **transcribe_options, **file_options[index])
+                yield index, file_path, result
+        finally:
+            prefetcher.close()
+        return
+
+    yield from _run_process_pool(files_to_process, workers, model_key, transcribe_options, file_options,
+                                 progress_callback, cancel_event, pause_event)
+
+def _run_with_manifest(manifest, files_to_process, progress_callback, cancel_event, batch_options):
+    pending = [index for index in range(len(files_to_process)) if not manifest.is_done(index)]
+
+    def progress_cb(event):
+        event = {**event, "file_index": pending[event.get("file_index", 0)]}
+        if event["type"] == "segment" and not event.get("replayed"):
+            manifest.commit_segment(event["file_index"], event["segment"])
+        if progress_callback:
+            progress_callback(event)
+
+    pending_results = run_batch([files_to_process[i] for i in pending], progress_callback=progress_cb,
+                                cancel_event=cancel_event,
+                                resume_segments=[manifest.committed_segments(i) or None for i in pending],
+                                **batch_options)
+    try:
+        for index, file_path in enumerate(files_to_process):
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            if manifest.is_done(index):
+                result = manifest.result(index)
+                if progress_callback:
+                    progress_callback({'type': 'file_started', 'file_path': file_path, 'file_index': index})
+                    for segment in result["segments"]:
+                        progress_callback({**transcription_handler._segment_event(segment), 'replayed': True,
+                                           'file_index': index})
+                    progress_callback({'type': 'status', 'message': f"Finished: {os.path.basename(file_path)} (earlier run).",
+                                       'file_index': index})
+                yield index, file_path, result
+                continue
+            try:
+                _, _, result = next(pending_results)
+            except StopIteration:
+                return  # Stopped early (cancelled)
+            yield index, file_path, result
+    finally:
+        pending_results.close()
+
+def _run_on_daemon(client, files_to_process, transcribe_options, file_options, progress_callback, cancel_event,
+                   pause_event):
+    # The daemon runs equal-priority jobs in submission order, so following them in order streams live progress.
+    job_ids = [client.submit(os.path.abspath(file_path), **transcribe_options, **options)
+               for file_path, options in zip(files_to_process, file_options)]
+    try:
+        for index, (file_path, job_id) in enumerate(zip(files_to_process, job_ids)):
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            if progress_callback:
+                progress_callback({'type': 'file_started', 'file_path': file_path, 'file_index': index})
+            result = None
+            control = TranscriptionControl(cancel_event, pause_event)
+            for event in client.events(job_id):
+                if event.get("type") == "job_finished":
+                    result = event.get("result")
+                    break
+                if progress_callback:
+                    progress_callback({**event, "file_index": index})
+                paused = control.paused
+                if paused:
+                    client.pause(job_id)  # The job sends no events while paused, so the wait happens here
+                try:
+                    control.checkpoint()
+                except TranscriptionCancelled:
+                    return  # The finally block cancels this job and the queued ones
+                if paused:
+                    client.resume(job_id)
+            yield index, file_path, result
+            job_ids[index] = None
+    finally:
+        for job_id in job_ids:
+            if job_id is not None:
+                try:
+                    client.cancel(job_id)  # A running job stops at its next window
+                except OSError:
+                    pass
+
+def _run_process_pool(files_to_process, workers, model_key, transcribe_options, file_options,
+                      progress_callback, cancel_event, pause_event):
+    pool, progress_queue, worker_cancel_event, worker_pause_event = start_worker_pool(workers, model_key)
+    try:
+        futures = [pool.submit(_worker_transcribe, index, file_path, {**transcribe_options, **file_options[index]})
+                   for index, file_path in enumerate(files_to_process)]
+        for index, future in enumerate(futures):
+            # Results are handed out strictly in input order; later files keep running meanwhile.
+            while True:
+                _drain_progress(progress_queue, progress_callback)
+                if cancel_event is not None and cancel_event.is_set():
+                    worker_cancel_event.set()
+                    return
+                mirror_event(pause_event, worker_pause_event)
+                try:
+                    result = future.result(timeout=0.1)
+                    break
+                except concurrent.futures.TimeoutError:
+                    continue
+                except Exception as e:
+                    print(f"BatchEngine - Error: Worker failed on '{os.path.basename(files_to_process[index])}': {e}")
+                    if progress_callback:
+                        progress_callback({'type': 'status', 'message': f"Error during transcription: {e}",
+                                           'is_error': True, 'file_index': index})
+                    result = None
+                    break
+            _drain_progress(progress_queue, progress_callback)
+            yield index, files_to_process[index], result
+        _drain_progress(progress_queue, progress_callback, timeout=0.2)
+    finally:
+        worker_cancel_event.set()
+        pool.shutdown(wait=False, cancel_futures=True)
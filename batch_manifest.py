@@ -0,0 +1,151 @@
+# batch_manifest.py
+import hashlib
+import json
+import os
+import threading
+import time
+
+import app_config as config
+
+FORMAT_VERSION = 1
+
+def batch_id_for(file_paths, settings: dict) -> str:
+    """Identifies a batch by its files (in order) and the settings that shape its output."""
+    identity = json.dumps({"files": [os.path.abspath(p) for p in file_paths], "settings": settings}, sort_keys=True)
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:24]
+
+def _write_json_atomic(path: str, payload):
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+class BatchManifest:
+    """
+    Durable record of a batch's progress, so a closed, crashed or cancelled batch can be resumed.
+
+    `<batch_id>.json` holds every file's state; finished files also keep their transcript text (combined
+    output is rebuilt from it). The segments of files still being transcribed are appended to one
+    `<batch_id>.<index>.segments.jsonl` journal per file as they are decoded, so a resumed file continues
+    after its last committed segment. The journals are flushed on every segment and fsynced at most every
+    BATCH_MANIFEST_FSYNC_SECONDS. With `keep_segments` finished files also keep their segments, for outputs
+    that are rebuilt from timed segments (combined subtitle files).
+    """
+    def __init__(self, file_paths, settings: dict, manifest_dir: str = None, keep_segments: bool = False):
+        self.file_paths = [os.path.abspath(p) for p in file_paths]
+        self.settings = settings
+        self.batch_id = batch_id_for(self.file_paths, settings)
+        self.manifest_dir = manifest_dir or config.BATCH_MANIFEST_DIR
+        self.keep_segments = keep_segments
+        self.path = os.path.join(self.manifest_dir, f"{self.batch_id}.json")
+        self._lock = threading.Lock()
+        self._journals = {}  # index -> open file
+        self._last_fsync = {}
+        self._files = [{"path": p, "state": "pending"} for p in self.file_paths]
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"BatchManifest - Warning: Ignoring unreadable manifest '{self.path}': {e}")
+            return
+        if data.get("format_version") == FORMAT_VERSION and [f["path"] for f in data.get("files", [])] == self.file_paths:
+            self._files = data["files"]
+
+    def _journal_path(self, index: int) -> str:
+        return os.path.join(self.manifest_dir, f"{self.batch_id}.{index}.segments.jsonl")
+
+    def _save(self):
+        # Caller holds self._lock
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        _write_json_atomic(self.path, {"format_version": FORMAT_VERSION, "batch_id": self.batch_id,
+                                       "updated": time.time(), "settings": self.settings, "files": self._files})
+
+    def has_progress(self) -> bool:
+        """True if an earlier run of this batch finished files or committed segments."""
+        return (any(f["state"] == "done" for f in self._files)
+                or any(self.committed_segments(i) for i in range(len(self._files))))
+
+    def is_done(self, index: int) -> bool:
+        with self._lock:
+            return self._files[index]["state"] == "done"
+
+    def done_count(self) -> int:
+        with self._lock:
+            return sum(1 for f in self._files if f["state"] == "done")
+
+    def result(self, index: int) -> dict:
+        """The stored result of a finished file, shaped like transcribe_media's (segments only with keep_segments)."""
+        with self._lock:
+            entry = self._files[index]
+            return {"text": entry.get("text", ""), "segments": entry.get("segments", []), "language": entry.get("language"),
+                    "no_speech": entry.get("no_speech", False), "from_cache": False, "from_manifest": True}
+
+    def committed_segments(self, index: int) -> list:
+        """Segments of an unfinished file that were decoded in an earlier run, in timeline order."""
+        segments = []
+        try:
+            with open(self._journal_path(index), "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        segments.append(json.loads(line))
+                    except ValueError:
+                        break  # A torn last line from an interrupted write
+        except FileNotFoundError:
+            pass
+        return segments
+
+    def commit_segment(self, index: int, segment: dict):
+        with self._lock:
+            journal = self._journals.get(index)
+            if journal is None:
+                os.makedirs(self.manifest_dir, exist_ok=True)
+                journal = self._journals[index] = open(self._journal_path(index), "a", encoding="utf-8")
+            journal.write(json.dumps(segment) + "\n")
+            journal.flush()
+            now = time.monotonic()
+            if now - self._last_fsync.get(index, 0.0) >= config.BATCH_MANIFEST_FSYNC_SECONDS:
+                os.fsync(journal.fileno())
+                self._last_fsync[index] = now
+
+    def mark_done(self, index: int, result: dict, output_path: str = None):
+        """Records a finished (and, in separate-files mode, exported) file and drops its segment journal."""
+        with self._lock:
+            self._files[index] = {"path": self.file_paths[index], "state": "done", "text": result.get("text", ""),
+                                  "language": result.get("language"), "no_speech": result.get("no_speech", False),
+                                  "output": output_path}
+            if self.keep_segments:
+                self._files[index]["segments"] = result.get("segments", [])
+            self._save()
+            self._discard_journal(index)
+
+    def _discard_journal(self, index: int):
+        journal = self._journals.pop(index, None)
+        if journal is not None:
+            journal.close()
+        try:
+            os.remove(self._journal_path(index))
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+        with self._lock:
+            for journal in self._journals.values():
+                journal.close()
+            self._journals.clear()
+
+    def delete(self):
+        """Removes the manifest and all journals, once the batch is complete or should start over."""
+        with self._lock:
+            for index in range(len(self._files)):
+                self._discard_journal(index)
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,73 @@
+# benchmarks/batched_inference.py
+"""
+Throughput comparison of sequential window decoding (iter_segments) against batched encoder
+inference (batched_inference) at several batch sizes.
+
+Usage (from the repository root):
+    python -m benchmarks.batched_inference path/to/audio.wav [more files...] --model base --batch-sizes 1 4 8 16
+
+Every file is decoded once up front so only inference is timed. The sequential path transcribes the
+files one after another; the batched paths pack the windows of all files into shared batches.
+RTF is processing time divided by audio duration; lower is better, < 1.0 is faster than real time.
+The results are printed as a Markdown table that can be pasted into the README.
+"""
+import argparse
+import time
+
+from whisper.audio import SAMPLE_RATE, load_audio
+
+import app_config as config
+import batched_inference
+import transcription_handler
+
+def time_sequential(model, audios, language):
+    start = time.perf_counter()
+    segment_count = 0
+    for audio in audios:
+        segment_count += sum(1 for _ in transcription_handler.iter_segments(
+            audio, language=language, model=model, condition_on_previous_text=False))
+    return time.perf_counter() - start, segment_count
+
+def time_batched(model, audios, language, batch_size):
+    start = time.perf_counter()
+    segment_count = sum(1 for _ in batched_inference.iter_batched_files(
+        audios, language=language, model=model, batch_size=batch_size))
+    return time.perf_counter() - start, segment_count
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sequential and batched Whisper window decoding throughput.")
+    parser.add_argument("files", nargs="+", help="Audio/video files to transcribe.")
+    parser.add_argument("--model", default=config.DEFAULT_WHISPER_MODEL, help="Whisper model name.")
+    parser.add_argument("--device", default=config.WHISPER_DEVICE, help='"auto", "cuda" or "cpu".')
+    parser.add_argument("--precision", default=config.WHISPER_CPU_PRECISION, help="CPU precision (fp32 or int8).")
+    parser.add_argument("--language", default="en", help="Language code; fixed so detection isn't timed.")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, config.ENCODER_BATCH_SIZE],
+                        help="Encoder batch sizes to measure.")
+    parser.add_argument("--threads", type=int, default=config.WHISPER_CPU_THREADS, help="Intra-op threads (0 = PyTorch default).")
+    args = parser.parse_args()
+
+    intra, inter = transcription_handler.configure_cpu_threads(args.threads, config.WHISPER_CPU_INTEROP_THREADS)
+    model_key = transcription_handler.resolve_model_key(args.model, args.device, args.precision)
+    if model_key is None:
+        raise SystemExit("The requested device is not available.")
+    audios = [load_audio(fp) for fp in args.files]
+    audio_seconds = sum(len(audio) for audio in audios) / SAMPLE_RATE
+
+    with transcription_handler.MODEL_REGISTRY.use(model_key) as model:
+        # Warm-up pass so one-off allocations don't skew the first measurement.
+        time_batched(model, [audios[0][:SAMPLE_RATE * 30]], args.language, 1)
+        rows = [("sequential", *time_sequential(model, audios, args.language))]
+        for batch_size in args.batch_sizes:
+            rows.append((f"batched x{batch_size}", *time_batched(model, audios, args.language, batch_size)))
+
+    print(f"\nModel: {model_key[0]} on {model_key[1]} ({model_key[2]}) | Threads: {intra} intra-op / {inter} inter-op"
+          f" | Audio: {audio_seconds:.1f}s in {len(audios)} file(s)\n")
+    print("| Path | Transcribe (s) | Segments | RTF | Speed-up vs sequential |")
+    print("|------|----------------|----------|-----|------------------------|")
+    baseline_seconds = rows[0][1]
+    for name, seconds, segment_count in rows:
+        rtf = seconds / audio_seconds if audio_seconds > 0 else float("nan")
+        print(f"| {name} | {seconds:.2f} | {segment_count} | {rtf:.3f} | {baseline_seconds / seconds:.2f}x |")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/cpu_modes.py
+"""
+Real-time-factor comparison of the CPU inference modes (fp32 vs. int8).
+
+Usage (from the repository root):
+    python -m benchmarks.cpu_modes path/to/audio.wav [more files...] --model base --threads 8
+
+RTF is processing time divided by audio duration; lower is better, < 1.0 is faster than real time.
+The results are printed as a Markdown table that can be pasted into the README.
+"""
+import argparse
+import time
+
+import whisper
+
+import app_config as config
+import transcription_handler
+import utils
+
+def run_mode(model_name, precision, file_paths, durations):
+    load_start = time.perf_counter()
+    model = transcription_handler.load_model_for_device(model_name, "cpu", precision)
+    load_seconds = time.perf_counter() - load_start
+
+    # Warm-up pass so one-off allocations don't skew the first file.
+    model.transcribe(whisper.pad_or_trim(whisper.load_audio(file_paths[0])), fp16=False, language="en")
+
+    transcribe_seconds = 0.0
+    for file_path in file_paths:
+        start = time.perf_counter()
+        model.transcribe(file_path, fp16=False)
+        transcribe_seconds += time.perf_counter() - start
+    audio_seconds = sum(durations)
+    return {
+        "precision": precision,
+        "load_seconds": load_seconds,
+        "transcribe_seconds": transcribe_seconds,
+        "audio_seconds": audio_seconds,
+        "rtf": transcribe_seconds / audio_seconds if audio_seconds > 0 else float("nan"),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare real-time factor of CPU fp32 and int8 Whisper inference.")
+    parser.add_argument("files", nargs="+", help="Audio/video files to transcribe.")
+    parser.add_argument("--model", default=config.DEFAULT_WHISPER_MODEL, help="Whisper model name.")
+    parser.add_argument("--threads", type=int, default=config.WHISPER_CPU_THREADS, help="Intra-op threads (0 = PyTorch default).")
+    parser.add_argument("--interop-threads", type=int, default=config.WHISPER_CPU_INTEROP_THREADS, help="Inter-op threads (0 = PyTorch default).")
+    args = parser.parse_args()
+
+    intra, inter = transcription_handler.configure_cpu_threads(args.threads, args.interop_threads)
+    durations = [utils.get_media_duration(fp) for fp in args.files]
+
+    results = [run_mode(args.model, precision, args.files, durations)
+               for precision in transcription_handler.SUPPORTED_CPU_PRECISIONS]
+
+    print(f"\nModel: {args.model} | Threads: {intra} intra-op / {inter} inter-op | Audio: {sum(durations):.1f}s in {len(args.files)} file(s)\n")
+    print("| Precision | Load (s) | Transcribe (s) | RTF | Speed-up vs fp32 |")
+    print("|-----------|----------|----------------|-----|------------------|")
+    baseline_rtf = results[0]["rtf"]
+    for r in results:
+        print(f"| {r['precision']} | {r['load_seconds']:.2f} | {r['transcribe_seconds']:.2f} | {r['rtf']:.3f} | {baseline_rtf / r['rtf']:.2f}x |")
+
+if __name__ == "__main__":
+    main()
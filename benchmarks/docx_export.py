@@ -0,0 +1,69 @@
+# benchmarks/docx_export.py
+"""
+Word export time and memory: python-docx's object model compared with the streaming DOCX writer.
+
+Usage (from the repository root):
+    python -m benchmarks.docx_export --lines 10000 50000 --verify
+
+Each transcript is synthetic, one paragraph per line. Peak memory is the Python heap peak reported by
+tracemalloc; python-docx keeps its XML tree in lxml's C memory, which it doesn't see, so its real
+footprint is larger than shown. --verify reads both documents back with python-docx and checks that
+they hold the same paragraphs. The results are printed as a Markdown table that can be pasted into the README.
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import app_config as config
+import file_export_handler
+from benchmarks.pdf_export import synthetic_transcript
+
+MODES = {"python-docx": False, "streaming writer": True}
+
+def run(mode, text, output_path):
+    config.STREAMING_DOCX_EXPORT = MODES[mode]
+    tracemalloc.start()
+    start = time.perf_counter()
+    if not file_export_handler.save_text_to_word(text, output_path):
+        raise RuntimeError(f"Export failed in mode '{mode}'.")
+    seconds = time.perf_counter() - start
+    peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    return {"seconds": seconds, "peak_mb": peak_mb, "size_kb": os.path.getsize(output_path) / 1024}
+
+def same_paragraphs(path_a, path_b) -> bool:
+    from docx import Document
+    return [p.text for p in Document(path_a).paragraphs] == [p.text for p in Document(path_b).paragraphs]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark python-docx against the streaming DOCX writer.")
+    parser.add_argument("--lines", type=int, nargs="+", default=[10000, 50000], help="Transcript sizes in lines.")
+    parser.add_argument("--verify", action="store_true", help="Check that both writers produce the same paragraphs.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    output_dir = tempfile.mkdtemp(prefix="docx-export-bench-")
+    try:
+        print("| Lines | Writer | Time (s) | Peak heap (MB) | File (KB) | Speed-up |")
+        print("|-------|--------|----------|----------------|-----------|----------|")
+        for line_count in args.lines:
+            text = synthetic_transcript(line_count * 5, rng)
+            paths, baseline = {}, None
+            for mode in MODES:
+                paths[mode] = os.path.join(output_dir, f"{line_count}-{mode.replace(' ', '_')}.docx")
+                r = run(mode, text, paths[mode])
+                baseline = baseline or r["seconds"]
+                print(f"| {line_count} | {mode} | {r['seconds']:.2f} | {r['peak_mb']:.0f} | {r['size_kb']:.0f} | "
+                      f"{baseline / r['seconds']:.2f}x |", flush=True)
+            if args.verify and not same_paragraphs(*paths.values()):
+                print(f"Mismatch: the writers produced different paragraphs for {line_count} lines.")
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
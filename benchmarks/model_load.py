@@ -0,0 +1,90 @@
+# benchmarks/model_load.py
+"""
+Load time and peak memory of whisper.load_model compared with the memory-mapped weight cache.
+
+Usage (from the repository root):
+    python -m benchmarks.model_load --model base --device cpu --runs 3
+
+Every measurement runs in a fresh Python process so peak RSS and warm caches don't carry over.
+"cold" converts the checkpoint into the weight cache first (a one-time cost), "warm" loads the
+already converted weights. The results are printed as a Markdown table that can be pasted into the README.
+Peak RSS is read with the `resource` module and is not available on Windows.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+MODES = ("whisper.load_model", "weight cache (cold)", "weight cache (warm)")
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # bytes on macOS, KB elsewhere
+
+def child_main(mode, model_name, device, cache_dir):
+    import whisper
+    import app_config as config
+    import model_weights
+    config.MODEL_WEIGHT_CACHE_DIR = cache_dir
+    cache = model_weights.WeightCache(cache_dir=cache_dir)
+    start = time.perf_counter()
+    if mode == "whisper.load_model":
+        model = whisper.load_model(model_name, device=device)
+    else:
+        model = cache.load(model_name, device)
+    load_seconds = time.perf_counter() - start
+    del model
+    print(json.dumps({"load_seconds": load_seconds, "peak_rss_mb": peak_rss_mb()}))
+
+def run_child(mode, model_name, device, cache_dir):
+    command = [sys.executable, "-m", "benchmarks.model_load", "--child", mode,
+               "--model", model_name, "--device", device, "--cache-dir", cache_dir]
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Whisper model load time and peak RSS with and without the weight cache.")
+    parser.add_argument("--model", default="base", help="Whisper model name.")
+    parser.add_argument("--device", default="cpu", help='"cpu" or "cuda".')
+    parser.add_argument("--runs", type=int, default=3, help="Runs per mode (the best time is reported).")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--cache-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child_main(args.child, args.model, args.device, args.cache_dir)
+        return
+
+    cache_dir = tempfile.mkdtemp(prefix="weight-cache-bench-")
+    try:
+        results = {}
+        for mode in MODES:
+            runs = []
+            for _ in range(1 if mode == "weight cache (cold)" else args.runs):
+                if mode == "weight cache (cold)":
+                    shutil.rmtree(cache_dir, ignore_errors=True)
+                    os.makedirs(cache_dir)
+                runs.append(run_child(mode, args.model, args.device, cache_dir))
+            results[mode] = min(runs, key=lambda r: r["load_seconds"])
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"\nModel: {args.model} on {args.device} | best of {args.runs} run(s), cold conversion run once\n")
+    print("| Loader | Load (s) | Peak RSS (MB) | Speed-up vs whisper.load_model |")
+    print("|--------|----------|---------------|--------------------------------|")
+    baseline = results[MODES[0]]["load_seconds"]
+    for mode in MODES:
+        r = results[mode]
+        rss = f"{r['peak_rss_mb']:.0f}" if r["peak_rss_mb"] is not None else "n/a"
+        print(f"| {mode} | {r['load_seconds']:.2f} | {rss} | {baseline / r['load_seconds']:.2f}x |")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# benchmarks/pdf_export.py
+"""
+PDF export throughput with and without the font cache and the measured line wrap.
+
+Usage (from the repository root):
+    python -m benchmarks.pdf_export --documents 1000 --hours 10
+
+Two workloads are written with synthetic transcripts: many short documents (a separate-files batch)
+and one very long transcript (about 2.5 words per second of speech, one line per ~5 s segment).
+Peak memory is the Python heap peak reported by tracemalloc. The results are printed as a Markdown
+table that can be pasted into the README.
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import app_config as config
+import file_export_handler
+
+MODES = {
+    "per-document fonts, multi_cell": {"font_cache": False, "measured_wrap": False},
+    "font cache, multi_cell": {"font_cache": True, "measured_wrap": False},
+    "font cache + measured wrap": {"font_cache": True, "measured_wrap": True},
+}
+
+WORDS = ("the of and to a in that is was he for it with as his on be at by had are but from or have an they which "
+         "one you were all we when there can been has more if no out so said what up its about into than them "
+         "transcription recording meeting question answer").split()
+
+def synthetic_transcript(seconds: float, rng: random.Random) -> str:
+    lines = []
+    for _ in range(max(1, int(seconds / 5))):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 16))]
+        lines.append(" ".join(words).capitalize() + ".")
+    return "\n".join(lines)
+
+def write_pdf(text, output_path):
+    pdf = file_export_handler.PDF()
+    pdf.alias_nb_pages()
+    pdf.add_page()
+    pdf.chapter_body(text)
+    pdf.output(output_path)
+
+def run(mode, texts, output_dir):
+    options = MODES[mode]
+    config.PDF_FONT_CACHE_ENABLED = options["font_cache"]
+    config.PDF_MEASURED_LINE_WRAP = options["measured_wrap"]
+    file_export_handler.clear_font_cache()
+    tracemalloc.start()
+    start = time.perf_counter()
+    for index, text in enumerate(texts):
+        write_pdf(text, os.path.join(output_dir, f"{index}.pdf"))
+    seconds = time.perf_counter() - start
+    peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    return {"seconds": seconds, "peak_mb": peak_mb, "documents": len(texts)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF export with and without font caching and measured line wrapping.")
+    parser.add_argument("--documents", type=int, default=1000, help="Short documents in the batch workload.")
+    parser.add_argument("--document-seconds", type=float, default=120, help="Speech per short document.")
+    parser.add_argument("--hours", type=float, default=10, help="Length of the long transcript.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    workloads = {
+        f"{args.documents} documents": [synthetic_transcript(args.document_seconds, rng) for _ in range(args.documents)],
+        f"{args.hours:g}-hour transcript": [synthetic_transcript(args.hours * 3600, rng)],
+    }
+    output_dir = tempfile.mkdtemp(prefix="pdf-export-bench-")
+    try:
+        print("| Workload | Mode | Time (s) | Docs/s | Peak heap (MB) | Speed-up |")
+        print("|----------|------|----------|--------|----------------|----------|")
+        for workload, texts in workloads.items():
+            baseline = None
+            for mode in MODES:
+                r = run(mode, texts, output_dir)
+                baseline = baseline or r["seconds"]
+                print(f"| {workload} | {mode} | {r['seconds']:.2f} | {r['documents'] / r['seconds']:.1f} | "
+                      f"{r['peak_mb']:.0f} | {baseline / r['seconds']:.2f}x |", flush=True)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# benchmarks/synthetic_audio.py
+"""
+Deterministic test recordings for the benchmarks: speech-like audio (formant-synthesized syllables
+with pitch drift, fricatives and pauses) and plain tone sweeps, with a chosen share of silence.
+The same seed always gives the same samples, so results from different runs and machines are
+measured on identical input.
+
+Usage (from the repository root):
+    python -m benchmarks.synthetic_audio --out bench_audio --seconds 30 120 --formats wav flac --silence 0 0.5
+
+Formats other than 16 kHz mono WAV ("wav44k" is 44.1 kHz stereo, "flac" and "mp3") exercise the
+resampling and ffmpeg decoding paths; flac and mp3 are encoded with ffmpeg and skipped without it.
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import subprocess
+import wave
+
+import numpy as np
+
+KINDS = ("speech", "tones")
+FORMATS = {"wav": 16000, "wav44k": 44100, "flac": 16000, "mp3": 16000}  # Format -> sample rate
+
+# F1-F3 (Hz) of a few vowels, after Peterson & Barney
+VOWEL_FORMANTS = ((730, 1090, 2440), (270, 2290, 3010), (300, 870, 2240), (530, 1840, 2480), (570, 840, 2410))
+FORMANT_BANDWIDTHS = (80.0, 100.0, 120.0)
+NOISE_FLOOR = 10 ** (-60 / 20)  # -60 dBFS background, also in the pauses
+
+def _voiced_syllable(samples, sample_rate, rng):
+    f0 = rng.uniform(100, 220) * np.linspace(1.0, rng.uniform(0.85, 1.15), samples)  # Pitch drifts through the syllable
+    f0 *= 1.0 + 0.01 * rng.standard_normal(samples).cumsum() / np.sqrt(samples)  # Jitter
+    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+    formants = VOWEL_FORMANTS[rng.integers(len(VOWEL_FORMANTS))]
+    harmonics = np.arange(1, int(4000 / f0.mean()) + 1)
+    frequencies = harmonics * f0.mean()
+    gains = np.zeros(harmonics.size)
+    for formant, bandwidth in zip(formants, FORMANT_BANDWIDTHS):
+        gains += 1.0 / np.sqrt((1 - (frequencies / formant) ** 2) ** 2 + (frequencies * bandwidth / formant ** 2) ** 2)
+    gains /= harmonics  # Glottal source tilt
+    signal = (gains[:, None] * np.sin(harmonics[:, None] * phase[None, :])).sum(axis=0)
+    return signal / (np.abs(signal).max() or 1.0)
+
+def _fricative(samples, sample_rate, rng):
+    spectrum = np.fft.rfft(rng.standard_normal(samples))
+    frequencies = np.fft.rfftfreq(samples, 1 / sample_rate)
+    spectrum[(frequencies < 2500) | (frequencies > min(7000, sample_rate / 2))] = 0
+    signal = np.fft.irfft(spectrum, samples)
+    return 0.4 * signal / (np.abs(signal).max() or 1.0)
+
+def _speech(samples, sample_rate, rng):
+    out = np.zeros(samples)
+    position = 0
+    while position < samples:
+        length = min(samples - position, int(rng.uniform(0.12, 0.32) * sample_rate))
+        syllable = _fricative(length, sample_rate, rng) if rng.random() < 0.2 else _voiced_syllable(length, sample_rate, rng)
+        out[position:position + length] = syllable * np.hanning(length) * rng.uniform(0.3, 0.8)
+        position += length
+    return out
+
+def _tones(samples, sample_rate, rng):
+    t = np.arange(samples) / sample_rate
+    start, end = rng.uniform(200, 600), rng.uniform(800, 3000)
+    sweep = np.sin(2 * np.pi * (start * t + (end - start) * t ** 2 / (2 * max(t[-1], 1e-9))))
+    return 0.5 * sweep + 0.2 * np.sin(2 * np.pi * rng.uniform(100, 400) * t)
+
+def _plan_utterances(seconds, silence_ratio, rng):
+    """(start, length) of the sounding parts, in seconds, so that about `silence_ratio` of the file is pause."""
+    sounding, lengths = seconds * (1.0 - silence_ratio), []
+    while sum(lengths) < sounding - 1e-9:
+        lengths.append(min(rng.uniform(1.5, 6.0), sounding - sum(lengths)))
+    gaps = rng.dirichlet(np.ones(len(lengths) + 1)) * (seconds - sum(lengths)) if lengths else [seconds]
+    plan, position = [], gaps[0]
+    for length, gap in zip(lengths, gaps[1:]):
+        plan.append((position, length))
+        position += length + gap
+    return plan
+
+def generate(kind: str, seconds: float, sample_rate: int = 16000, silence_ratio: float = 0.0, seed: int = 0) -> np.ndarray:
+    """Mono float32 audio in [-1, 1]; identical for identical arguments."""
+    rng = np.random.default_rng([seed, KINDS.index(kind), int(seconds * 1000), int(silence_ratio * 1000), sample_rate])
+    total = int(seconds * sample_rate)
+    audio = NOISE_FLOOR * rng.standard_normal(total)
+    source = _speech if kind == "speech" else _tones
+    for start, length in _plan_utterances(seconds, silence_ratio, rng):
+        first = int(start * sample_rate)
+        samples = min(int(length * sample_rate), total - first)
+        if samples > 0:
+            audio[first:first + samples] += source(samples, sample_rate, rng)
+    return np.clip(audio, -1.0, 1.0).astype(np.float32)
+
+def write_wav(path: str, audio: np.ndarray, sample_rate: int, channels: int = 1):
+    pcm = (audio * 32767).astype("<i2")
+    if channels > 1:
+        pcm = np.repeat(pcm[:, None], channels, axis=1)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(channels)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
+
+def create_recording(directory: str, kind: str, seconds: float, fmt: str, silence_ratio: float = 0.0, seed: int = 0):
+    """
+    Writes one recording and returns (path, sha256 of its PCM), or (None, None) when the format needs
+    ffmpeg and it isn't installed.
+    """
+    sample_rate = FORMATS[fmt]
+    audio = generate(kind, seconds, sample_rate, silence_ratio, seed)
+    checksum = hashlib.sha256(audio.tobytes()).hexdigest()
+    name = f"{kind}-{seconds:g}s-sil{int(silence_ratio * 100)}"
+    wav_path = os.path.join(directory, f"{name}-{fmt}.wav")
+    write_wav(wav_path, audio, sample_rate, channels=2 if fmt == "wav44k" else 1)
+    if fmt in ("wav", "wav44k"):
+        return wav_path, checksum
+    if shutil.which("ffmpeg") is None:
+        os.remove(wav_path)
+        return None, None
+    path = os.path.join(directory, f"{name}.{fmt}")
+    subprocess.run(["ffmpeg", "-y", "-v", "error", "-i", wav_path, path], check=True)
+    os.remove(wav_path)
+    return path, checksum
+
+def main():
+    parser = argparse.ArgumentParser(description="Write deterministic synthetic test recordings.")
+    parser.add_argument("--out", required=True, help="Output directory.")
+    parser.add_argument("--kinds", nargs="+", choices=KINDS, default=["speech"])
+    parser.add_argument("--seconds", type=float, nargs="+", default=[30, 120])
+    parser.add_argument("--formats", nargs="+", choices=list(FORMATS), default=["wav"])
+    parser.add_argument("--silence", type=float, nargs="+", default=[0.0], help="Shares of silence (0-1).")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for kind in args.kinds:
+        for seconds in args.seconds:
+            for silence_ratio in args.silence:
+                for fmt in args.formats:
+                    path, checksum = create_recording(args.out, kind, seconds, fmt, silence_ratio, args.seed)
+                    print(f"{path or f'{fmt}: skipped (ffmpeg not found)'}  {checksum or ''}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+# benchmarks/transcription_suite.py
+"""
+End-to-end transcription benchmark on deterministic synthetic audio, with regression checks against a
+stored baseline.
+
+Usage (from the repository root):
+    python -m benchmarks.transcription_suite --save-baseline benchmarks/baseline.json
+    python -m benchmarks.transcription_suite --baseline benchmarks/baseline.json
+
+Every combination of --models, --kinds, --seconds, --formats and --silence is one case (see
+benchmarks.synthetic_audio for the recordings). Each case runs on the CPU in a fresh Python process,
+so model caches and peak RSS don't carry over, and the best of --runs is kept. Measured per case:
+RTF (processing time / audio duration, lower is better), time to first segment, peak RSS, the time
+to export the transcript to Word and PDF, and the pipeline stage times from transcription_metrics.
+The transcription cache is bypassed and the language is fixed to English.
+
+With --baseline, lower-is-better metrics that grew by more than their threshold (see THRESHOLDS,
+override with --threshold rtf=0.2) are reported as regressions and the exit code is 1. Baselines are
+only comparable on the same machine and settings; the environment is stored with them. The results
+are printed as a Markdown table that can be pasted into the README.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import synthetic_audio
+
+# Allowed relative growth before a metric counts as a regression, and the absolute growth that is
+# always ignored (timer and allocator noise on small values)
+THRESHOLDS = {"rtf": 0.10, "time_to_first_segment": 0.20, "peak_rss_mb": 0.10, "export_seconds": 0.25}
+NOISE_FLOORS = {"rtf": 0.005, "time_to_first_segment": 0.05, "peak_rss_mb": 10.0, "export_seconds": 0.02}
+
+def case_key(model, kind, seconds, fmt, silence_ratio) -> str:
+    return f"{model}/{kind}-{seconds:g}s-{fmt}-sil{int(silence_ratio * 100)}"
+
+def child_main(args):
+    import torch
+    import file_export_handler
+    import transcription_handler
+    from transcription_metrics import peak_rss_mb
+
+    torch.manual_seed(args.seed)  # Temperature fallback samples
+    transcription_handler.configure_cpu_threads(args.threads, 0)
+    model_key = transcription_handler.resolve_model_key(args.models[0], "cpu", args.precision)
+    if model_key is None:
+        raise SystemExit("CPU inference is unavailable.")
+    first_segment = {}
+
+    def progress(event):
+        if event["type"] == "segment" and "at" not in first_segment:
+            first_segment["at"] = time.perf_counter()
+
+    with transcription_handler.MODEL_REGISTRY.use(model_key):  # Loaded up front, kept for the call below
+        start = time.perf_counter()
+        result = transcription_handler.transcribe_media(args.file, language="en", progress_callback=progress,
+                                                        model_name=model_key[0], device="cpu", precision=model_key[2],
+                                                        use_cache=False)
+        seconds = time.perf_counter() - start
+    if result is None:
+        raise SystemExit("Transcription failed.")
+
+    export_dir = tempfile.mkdtemp(prefix="suite-export-")
+    try:
+        export_start = time.perf_counter()
+        file_export_handler.save_text_to_word(result["text"], os.path.join(export_dir, "t.docx"))
+        file_export_handler.save_text_to_pdf(result["text"], os.path.join(export_dir, "t.pdf"))
+        export_seconds = time.perf_counter() - export_start
+    finally:
+        shutil.rmtree(export_dir, ignore_errors=True)
+
+    print(json.dumps({
+        "transcribe_seconds": seconds,
+        "time_to_first_segment": first_segment["at"] - start if first_segment else None,
+        "segments": len(result["segments"]),
+        "export_seconds": export_seconds,
+        "peak_rss_mb": peak_rss_mb(),
+        "stage_seconds": (result.get("metrics") or {}).get("stage_seconds", {}),
+    }))
+
+def run_case(file_path, model, args):
+    command = [sys.executable, "-m", "benchmarks.transcription_suite", "--child", file_path, "--models", model,
+               "--precision", args.precision, "--threads", str(args.threads), "--seed", str(args.seed)]
+    output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def environment(args) -> dict:
+    import numpy
+    versions = {"python": platform.python_version(), "numpy": numpy.__version__}
+    for module in ("torch", "whisper"):
+        try:
+            versions[module] = getattr(__import__(module), "__version__", "unknown")
+        except ImportError:
+            versions[module] = None
+    return {"machine": platform.machine(), "processor": platform.processor(), "system": platform.system(),
+            "cpu_count": os.cpu_count(), "threads": args.threads, "precision": args.precision,
+            "seed": args.seed, "versions": versions}
+
+def compare(results, baseline, thresholds):
+    """Rows of (case, metric, baseline, current, relative change, regressed) for every shared metric."""
+    rows = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        if previous.get("audio_sha256") != current.get("audio_sha256"):
+            print(f"Warning: {key} was generated from different audio than the baseline (seed or numpy changed?).")
+        for metric, threshold in thresholds.items():
+            old, new = previous.get(metric), current.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old if old else 0.0
+            regressed = new - old > NOISE_FLOORS.get(metric, 0.0) and change > threshold
+            rows.append((key, metric, old, new, change, regressed))
+    return rows
+
+def parse_thresholds(overrides):
+    thresholds = dict(THRESHOLDS)
+    for item in overrides or []:
+        name, _, value = item.partition("=")
+        if name not in thresholds or not value:
+            raise SystemExit(f"Invalid --threshold '{item}'; expected one of {', '.join(THRESHOLDS)} as NAME=FRACTION.")
+        thresholds[name] = float(value)
+    return thresholds
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcription on synthetic audio and check for regressions.")
+    parser.add_argument("--models", nargs="+", default=["tiny", "base"], help="Whisper model names.")
+    parser.add_argument("--kinds", nargs="+", choices=synthetic_audio.KINDS, default=["speech"])
+    parser.add_argument("--seconds", type=float, nargs="+", default=[30, 120], help="Recording lengths.")
+    parser.add_argument("--formats", nargs="+", choices=list(synthetic_audio.FORMATS), default=["wav", "flac"])
+    parser.add_argument("--silence", type=float, nargs="+", default=[0.0, 0.5], help="Shares of silence (0-1).")
+    parser.add_argument("--runs", type=int, default=1, help="Runs per case (the fastest is kept).")
+    parser.add_argument("--precision", default="fp32", help="CPU precision (fp32 or int8).")
+    parser.add_argument("--threads", type=int, default=0, help="Intra-op threads (0 = PyTorch default).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare against this baseline; exit code 1 on a regression.")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Store the results as the new baseline.")
+    parser.add_argument("--threshold", action="append", metavar="NAME=FRACTION", help="Override a regression threshold.")
+    parser.add_argument("--child", metavar="FILE", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        args.file = args.child
+        child_main(args)
+        return 0
+    thresholds = parse_thresholds(args.threshold)
+
+    audio_dir = tempfile.mkdtemp(prefix="transcription-suite-")
+    results = {}
+    try:
+        recordings = []
+        for kind in args.kinds:
+            for seconds in args.seconds:
+                for silence_ratio in args.silence:
+                    for fmt in args.formats:
+                        path, checksum = synthetic_audio.create_recording(audio_dir, kind, seconds, fmt, silence_ratio, args.seed)
+                        if path is None:
+                            print(f"Skipping {fmt}: ffmpeg not found.", file=sys.stderr)
+                            continue
+                        recordings.append((kind, seconds, fmt, silence_ratio, path, checksum))
+
+        print("| Case | RTF | First segment (s) | Segments | Peak RSS (MB) | Export (s) |")
+        print("|------|-----|-------------------|----------|---------------|------------|")
+        for model in args.models:
+            for kind, seconds, fmt, silence_ratio, path, checksum in recordings:
+                runs = [run_case(path, model, args) for _ in range(max(1, args.runs))]
+                best = min(runs, key=lambda r: r["transcribe_seconds"])
+                key = case_key(model, kind, seconds, fmt, silence_ratio)
+                results[key] = {**best, "rtf": best["transcribe_seconds"] / seconds, "audio_seconds": seconds,
+                                "audio_sha256": checksum}
+                first = best["time_to_first_segment"]
+                print(f"| {key} | {results[key]['rtf']:.3f} | {first:.2f} | {best['segments']} | "
+                      f"{best['peak_rss_mb']:.0f} | {best['export_seconds']:.2f} |" if first is not None else
+                      f"| {key} | {results[key]['rtf']:.3f} | n/a | {best['segments']} | "
+                      f"{best['peak_rss_mb']:.0f} | {best['export_seconds']:.2f} |", flush=True)
+    finally:
+        shutil.rmtree(audio_dir, ignore_errors=True)
+
+    report = {"environment": environment(args), "results": results}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"\nResults written to {path}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("environment") != report["environment"]:
+        print("\nWarning: the baseline was recorded in a different environment; differences may not be regressions.")
+    rows = compare(results, baseline.get("results", {}), thresholds)
+    print("\n| Case | Metric | Baseline | Current | Change | |")
+    print("|------|--------|----------|---------|--------|-|")
+    for key, metric, old, new, change, regressed in rows:
+        print(f"| {key} | {metric} | {old:.3f} | {new:.3f} | {change:+.1%} | {'REGRESSION' if regressed else 'ok'} |")
+    regressions = sum(1 for row in rows if row[5])
+    print(f"\n{regressions} regression(s) in {len(rows)} comparison(s).")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+# chunked_transcription.py
+import concurrent.futures
+import queue
+import re
+
+import numpy as np
+
+import app_config as config
+from transcription_control import TranscriptionCancelled
+
+SAMPLE_RATE = 16000
+CUT_FRAME_SAMPLES = 480 # 30 ms frames when looking for the quietest cut point
+
+def plan_chunks(audio: np.ndarray, target_seconds: float = None, overlap_seconds: float = None,
+                search_seconds: float = None):
+    """
+    Splits audio into chunks of roughly `target_seconds`, cutting at the quietest 30 ms frame within
+    `search_seconds` of each target boundary. Every chunk is extended by `overlap_seconds` on both sides
+    so words at a cut are heard whole; the overlap is resolved again when stitching.
+
+    Returns a list of dicts: start/end (samples actually transcribed) and own_start/own_end (seconds of
+    the timeline this chunk is responsible for).
+    """
+    target_seconds = target_seconds or config.CHUNK_TARGET_SECONDS
+    overlap_seconds = config.CHUNK_OVERLAP_SECONDS if overlap_seconds is None else overlap_seconds
+    search_seconds = config.CHUNK_CUT_SEARCH_SECONDS if search_seconds is None else search_seconds
+
+    total_samples = len(audio)
+    n_frames = total_samples // CUT_FRAME_SAMPLES
+    frame_energy = np.square(audio[:n_frames * CUT_FRAME_SAMPLES].reshape(n_frames, CUT_FRAME_SAMPLES),
+                             dtype=np.float32).mean(axis=1)
+
+    cuts = [0]
+    target_samples = int(target_seconds * SAMPLE_RATE)
+    search_frames = int(search_seconds * SAMPLE_RATE) // CUT_FRAME_SAMPLES
+    while total_samples - cuts[-1] > target_samples * 1.5:
+        target_frame = (cuts[-1] + target_samples) // CUT_FRAME_SAMPLES
+        low = max(cuts[-1] // CUT_FRAME_SAMPLES + 1, target_frame - search_frames)
+        high = min(n_frames, target_frame + search_frames + 1)
+        quietest_frame = low + int(np.argmin(frame_energy[low:high])) if high > low else target_frame
+        cuts.append(quietest_frame * CUT_FRAME_SAMPLES + CUT_FRAME_SAMPLES // 2)
+    cuts.append(total_samples)
+
+    overlap_samples = int(overlap_seconds * SAMPLE_RATE)
+    chunks = [{
+        "start": max(0, cut_start - overlap_samples),
+        "end": min(total_samples, cut_end + overlap_samples),
+        "own_start": cut_start / SAMPLE_RATE,
+        "own_end": cut_end / SAMPLE_RATE,
+    } for cut_start, cut_end in zip(cuts[:-1], cuts[1:])]
+    chunks[-1]["own_end"] = float("inf")  # Segments may run slightly past the end of the audio
+    return chunks
+
+def _normalized_text(text: str) -> str:
+    return re.sub(r"[^\w]+", " ", text.lower()).strip()
+
+def _is_boundary_duplicate(segment: dict, previous: dict) -> bool:
+    # The same words decoded by both neighbouring chunks inside their overlap
+    if previous is None or segment["start"] >= previous["end"]:
+        return False
+    current_text, previous_text = _normalized_text(segment["text"]), _normalized_text(previous["text"])
+    return bool(current_text) and current_text in previous_text
+
+class ChunkStitcher:
+    """
+    Joins the segments of chunks decoded independently (and out of order) into one timeline. A segment
+    is kept by the chunk that owns its midpoint, and a segment repeating the previous one inside the
+    overlap is dropped. Segments of the earliest unfinished chunk are released at once; later chunks
+    are held until every chunk before them is finished. Released segments are numbered in order.
+    """
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self._buffered = {index: [] for index in range(len(chunks))}
+        self._finished = set()
+        self._head = 0
+        self._segment_id = 0
+        self._previous = None
+
+    @property
+    def done(self) -> bool:
+        return self._head >= len(self.chunks)
+
+    def add(self, chunk_index: int, segment: dict) -> list:
+        """Takes one decoded segment (on the recording's timeline) and returns the segments now ready."""
+        self._buffered[chunk_index].append(segment)
+        return self._release()
+
+    def finish(self, chunk_index: int) -> list:
+        self._finished.add(chunk_index)
+        return self._release()
+
+    def _release(self):
+        ready = []
+        while self._head < len(self.chunks):
+            chunk = self.chunks[self._head]
+            for segment in self._buffered[self._head]:
+                midpoint = (segment["start"] + segment["end"]) / 2
+                if not chunk["own_start"] <= midpoint < chunk["own_end"]:
+                    continue  # Belongs to a neighbouring chunk's overlap
+                if _is_boundary_duplicate(segment, self._previous):
+                    continue
+                self._previous = {**segment, "id": self._segment_id}
+                self._segment_id += 1
+                ready.append(self._previous)
+            self._buffered[self._head] = []
+            if self._head not in self._finished:
+                break
+            self._head += 1
+        return ready
+
+# --- Worker process side ---
+# batch_engine and transcription_handler are imported inside the functions that need them, so the
+# planning and stitching rules above can be imported without torch or whisper.
+def _detect_language(audio):
+    import batch_engine, transcription_handler
+    return transcription_handler.detect_language(audio, *batch_engine.worker_model_key())
+
+def _start_worker():
+    pass  # Submitted to make the pool spawn a process (and load its model) ahead of the chunks
+
+def _transcribe_chunk(chunk_index, chunk_audio, offset_seconds, language, task, decode_options):
+    import batch_engine, transcription_handler
+    if batch_engine.worker_cancelled():
+        return chunk_index
+    model_name, device, precision = batch_engine.worker_model_key()
+    try:
+        for segment in transcription_handler.iter_segments(chunk_audio, language=language, task=task,
+                                                           model_name=model_name, device=device, precision=precision,
+                                                           control=batch_engine.worker_control(), **decode_options):
+            batch_engine.worker_report({"type": "chunk_segment", "chunk_index": chunk_index,
+                                        "segment": {**segment, "start": segment["start"] + offset_seconds,
+                                                    "end": segment["end"] + offset_seconds}})
+    except TranscriptionCancelled:
+        return chunk_index
+    batch_engine.worker_report({"type": "chunk_done", "chunk_index": chunk_index})
+    return chunk_index
+
+# --- Parent process side ---
+def _wait_for(future, control):
+    # A worker's result, polled so a cancel isn't held up by it
+    while True:
+        if control is not None and control.cancelled:
+            raise TranscriptionCancelled()
+        try:
+            return future.result(timeout=0.1)
+        except concurrent.futures.TimeoutError:
+            continue
+
+def iter_chunked_segments(audio: np.ndarray, language: str = None, task: str = "transcribe",
+                          status_callback=None, model_name: str = None, device: str = None,
+                          precision: str = None, workers: int = None, control=None, **decode_options):
+    """
+    Transcribes one long recording as independent chunks on parallel worker processes and yields the
+    stitched segments in timeline order. Segments of the earliest unfinished chunk are yielded as soon
+    as its worker decodes them; later chunks are buffered until every chunk before them is done.
+    Pausing `control` pauses every chunk worker at its next window; cancelling it stops them.
+    """
+    # Imported here rather than at the top, see the note above the worker functions
+    import batch_engine, transcription_handler
+
+    model_key = transcription_handler.resolve_model_key(model_name, device, precision)
+    if model_key is None:
+        raise RuntimeError("The requested device is not available.")
+    chunks = plan_chunks(audio)
+    workers = batch_engine.resolve_worker_count(len(chunks), model_key[1], workers)
+
+    if status_callback:
+        status_callback(f"Splitting into {len(chunks)} chunks on {workers} workers...")
+
+    pool, progress_queue, cancel_event, pause_event = batch_engine.start_worker_pool(workers, model_key)
+    try:
+        if language is None:
+            # Detected once so every chunk decodes in the same language. A model already loaded in this
+            # process is used; otherwise one of the workers detects it rather than loading another copy here.
+            if transcription_handler.MODEL_REGISTRY.is_loaded(model_key):
+                language = transcription_handler.detect_language(audio, *model_key)
+            else:
+                detection = pool.submit(_detect_language, audio[:30 * SAMPLE_RATE])
+                for _ in range(workers - 1):
+                    pool.submit(_start_worker)  # The other workers load their models during the detection
+                language = _wait_for(detection, control)
+            if status_callback:
+                status_callback(f"Detected language: {transcription_handler.LANGUAGES[language].title()}")
+        futures = [pool.submit(_transcribe_chunk, index, audio[chunk["start"]:chunk["end"]],
+                               chunk["start"] / SAMPLE_RATE, language, task, decode_options)
+                   for index, chunk in enumerate(chunks)]
+        stitcher = ChunkStitcher(chunks)
+        while not stitcher.done:
+            if control is not None:
+                if control.cancelled:
+                    raise TranscriptionCancelled()
+                batch_engine.mirror_event(control.pause_event, pause_event)  # Workers pause at their next window
+            try:
+                event = progress_queue.get(timeout=0.1)
+            except queue.Empty:
+                for future in futures:
+                    if future.done() and future.exception() is not None:
+                        raise RuntimeError(f"Chunk worker failed: {future.exception()}")
+                continue
+            if event.get("type") == "chunk_segment":
+                yield from stitcher.add(event["chunk_index"], event["segment"])
+            elif event.get("type") == "chunk_done":
+                yield from stitcher.finish(event["chunk_index"])
+    finally:
+        cancel_event.set()
+        pool.shutdown(wait=False, cancel_futures=True)
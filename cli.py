@@ -0,0 +1,297 @@
+# cli.py
+"""
+Headless batch transcription for machines without a display. Never imports the Tk UI; Pillow is
+loaded only for --format pdf (fpdf2 depends on it).
+
+Usage (from the repository root):
+    python -m cli transcribe recordings/ "interviews/*.mp3" --format docx --output-dir out/
+    python -m cli transcribe talk.mp4 --combined all_talks --format pdf --progress json
+
+With --progress json every event is printed to stdout as one JSON object per line; human-readable
+messages go to stderr. Exit codes: 0 every file succeeded, 1 at least one file failed,
+2 invalid arguments or no input files, 130 interrupted.
+
+An interrupted batch resumes where it stopped when the same command is run again; --restart discards
+that progress.
+
+Every batch ends with a "metrics" event (real-time factor, time to first segment, segments per second,
+peak memory, seconds per pipeline stage) and a JSON/CSV report in --metrics-dir.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import threading
+
+import app_config as config
+import segment_writers
+
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+OUTPUT_FORMATS = ("docx", "pdf", *segment_writers.SEGMENT_WRITERS) # srt, vtt and jsonl are written while transcribing
+
+def expand_inputs(inputs, recursive: bool = False):
+    """
+    Resolves files, glob patterns and directories to a de-duplicated list of media files in input order.
+    Directories contribute their files with a known audio/video extension, sorted by name.
+    """
+    media_extensions = set(config.AUDIO_EXTENSIONS) | set(config.VIDEO_EXTENSIONS)
+    found = []
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, "**", "*") if recursive else os.path.join(item, "*")
+            candidates = sorted(p for p in glob.glob(pattern, recursive=recursive)
+                                if os.path.isfile(p) and os.path.splitext(p)[1].lower() in media_extensions)
+        elif os.path.isfile(item):
+            candidates = [item]
+        else:
+            candidates = sorted(p for p in glob.glob(item, recursive=recursive) if os.path.isfile(p))
+        found.extend(os.path.abspath(p) for p in candidates)
+    return list(dict.fromkeys(found))
+
+class ProgressReporter:
+    """
+    Prints batch events as JSON lines on stdout, as plain text on stderr, or not at all.
+
+    In JSON mode the process-level stdout (fd 1, inherited by worker processes) is pointed at stderr,
+    so diagnostic prints from the engine can't interleave with the JSON stream.
+    """
+    def __init__(self, mode: str):
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._json_out = None
+        if mode == "json":
+            sys.stdout.flush()
+            self._json_out = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8")
+            os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    def emit(self, event: str, **fields):
+        if self.mode == "json":
+            line = json.dumps({"event": event, **fields}, ensure_ascii=False)
+            with self._lock:
+                self._json_out.write(line + "\n")
+                self._json_out.flush()
+        elif self.mode == "text":
+            message = fields.get("message") or fields.get("line") or fields.get("file", "")
+            with self._lock:
+                print(f"[{event}] {message}", file=sys.stderr, flush=True)
+
+def _save_function(output_format):
+    import file_export_handler
+    return file_export_handler.save_text_to_word if output_format == "docx" else file_export_handler.save_text_to_pdf
+
+def _save(text, output_path, output_format, reporter, index=None):
+    return _save_function(output_format)(text, output_path,
+                                         status_callback=lambda msg: reporter.emit("export", index=index, message=str(msg)))
+
+def _report_metrics(metrics, reporter, metrics_dir):
+    metrics.finish()
+    report_paths = metrics.write_report(metrics_dir) if config.METRICS_ENABLED else None
+    reporter.emit("metrics", **metrics.summary(), report=report_paths[0] if report_paths else None,
+                  message=metrics.format_summary())
+
+def _close_writers(file_writers, combined_writer):
+    # Whatever was decoded so far stays on disk as a valid file
+    for writer in file_writers.values():
+        writer.close()
+    if combined_writer:
+        combined_writer.close()
+
+def run_transcribe(args) -> int:
+    files = expand_inputs(args.inputs, recursive=args.recursive)
+    reporter = ProgressReporter(args.progress)
+    if not files:
+        reporter.emit("error", message="No media files matched the given inputs.")
+        return EXIT_USAGE
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    import batch_engine
+    from batch_manifest import BatchManifest
+    from export_pool import ExportPool
+    from media_probe import MediaProber
+    from transcription_metrics import BatchMetrics
+
+    settings = {key: getattr(args, key) for key in ("output_dir", "format", "combined", "model", "language", "task")}
+    settings["output_dir"] = os.path.abspath(args.output_dir)
+    streamed = args.format in segment_writers.SEGMENT_WRITERS
+    manifest = BatchManifest(files, settings, keep_segments=streamed and bool(args.combined))
+    if args.restart:
+        manifest.delete()
+    elif manifest.has_progress():
+        reporter.emit("batch_resumed", batch_id=manifest.batch_id, files_done=manifest.done_count())
+
+    prober = MediaProber()
+    prober.probe(files) # Durations for the metrics, probed in parallel and cached for the next run
+    metrics = BatchMetrics(files, prober.durations)
+    file_writers = {}
+    combined_writer = None
+    if streamed and args.combined:
+        durations = prober.wait(files)
+        time_offsets, offset = [], 0.0
+        for file_path in files:
+            time_offsets.append(offset) # Recordings play back to back in the combined file
+            offset += max(0.0, durations[file_path])
+        combined_writer = segment_writers.OrderedBatchWriter(
+            segment_writers.create_writer(args.format, os.path.join(args.output_dir, args.combined)), files, time_offsets)
+
+    def stream_segment(index, segment):
+        if combined_writer:
+            combined_writer.write(index, segment)
+            return
+        if index not in file_writers: # Opened on the first segment, so files finished in an earlier run are left as they are
+            file_writers[index] = segment_writers.create_writer(
+                args.format, os.path.join(args.output_dir, os.path.splitext(os.path.basename(files[index]))[0]))
+        file_writers[index].write(segment)
+
+    def finish_stream(index):
+        if combined_writer:
+            combined_writer.finish_file(index)
+            return combined_writer.writer.output_path
+        writer = file_writers.pop(index, None)
+        if writer is None:
+            return None
+        writer.close()
+        return writer.output_path
+
+    def progress_cb(event):
+        index = event.get("file_index")
+        if event["type"] == "file_started":
+            metrics.file_started(index)
+        elif event["type"] == "segment":
+            metrics.segment(index, event["end_seconds"], replayed=bool(event.get("replayed")))
+        if streamed and event["type"] == "segment" and "segment" in event:
+            with metrics.measure("export", index):
+                stream_segment(index, event["segment"])
+        if event["type"] == "file_started":
+            reporter.emit("file_started", index=index, file=event["file_path"])
+        elif event["type"] == "segment":
+            reporter.emit("segment", index=index, start=event["start_seconds"], end=event["end_seconds"],
+                          text=event["text_segment"], line=event["full_line"])
+        elif event["type"] == "status":
+            reporter.emit("status", index=index, message=event["message"], is_error=bool(event.get("is_error")))
+
+    reporter.emit("batch_started", files=len(files), output_dir=os.path.abspath(args.output_dir), format=args.format)
+    cancel_event = threading.Event()
+    counts = {"succeeded": 0, "failed": 0}
+    counts_lock = threading.Lock()
+    combined_parts = []
+    # Separate documents are written in the background while the next file is transcribed
+    export_pool = None if args.combined or streamed else ExportPool()
+
+    def finish_file(index, file_path, result, status, output_path=None):
+        from_manifest = bool(result and result.get("from_manifest"))
+        if status in ("ok", "no_speech") and not from_manifest:
+            manifest.mark_done(index, result, output_path)
+        with counts_lock:
+            counts["succeeded" if status in ("ok", "no_speech") else "failed"] += 1
+        reporter.emit("file_done", index=index, file=file_path, status=status, output=output_path,
+                      from_cache=bool(result and result.get("from_cache")), resumed=from_manifest,
+                      language=result.get("language") if result else None)
+
+    batch_results = batch_engine.run_batch(files, progress_callback=progress_cb, cancel_event=cancel_event,
+                                           worker_count=args.workers, model_name=args.model, device=args.device,
+                                           precision=args.precision, language=args.language, task=args.task,
+                                           use_cache=False if args.no_cache else None,
+                                           use_vad=False if args.no_vad else None, manifest=manifest)
+    try:
+        for index, file_path, result in batch_results:
+            filename = os.path.basename(file_path)
+            metrics.file_finished(index, result)
+            metrics.add_stage("probe", prober.probe_seconds.get(file_path, 0.0), index)
+            if streamed:
+                output_path = finish_stream(index)
+                finish_file(index, file_path, result, "failed" if result is None else
+                            "no_speech" if result.get("no_speech") else "ok", output_path)
+            elif result is None:
+                finish_file(index, file_path, result, "failed")
+            elif result.get("no_speech"):
+                if args.combined:
+                    combined_parts.append(f"--- Transcription for {filename} ---\n[No speech detected]\n\n")
+                finish_file(index, file_path, result, "no_speech")
+            elif args.combined:
+                combined_parts.append(f"--- Transcription for {filename} ---\n{result['text']}\n\n")
+                finish_file(index, file_path, result, "ok")
+            else:
+                output_path = os.path.join(args.output_dir, f"{os.path.splitext(filename)[0]}.{args.format}")
+                if result.get("from_manifest"):
+                    finish_file(index, file_path, result, "ok", output_path) # Saved in an earlier run
+                    continue
+                export_pool.submit(index, metrics.timed("export", _save_function(args.format), index), result["text"], output_path,
+                                   status_callback=lambda msg, index=index: reporter.emit("export", index=index, message=str(msg)),
+                                   on_done=lambda index, ok, path, file_path=file_path, result=result:
+                                       finish_file(index, file_path, result, "ok" if ok else "export_failed", path))
+    except KeyboardInterrupt:
+        cancel_event.set()
+        batch_results.close()
+        if export_pool:
+            export_pool.close() # Finished transcripts are still written
+        _close_writers(file_writers, combined_writer)
+        manifest.close()
+        prober.close()
+        _report_metrics(metrics, reporter, args.metrics_dir)
+        reporter.emit("batch_done", succeeded=counts["succeeded"], failed=counts["failed"], cancelled=True,
+                      exit_code=EXIT_INTERRUPTED)
+        return EXIT_INTERRUPTED
+    if export_pool:
+        export_pool.close()
+    _close_writers(file_writers, combined_writer)
+    failed = counts["failed"]
+    if combined_writer:
+        reporter.emit("combined_saved", output=combined_writer.writer.output_path)
+
+    if args.combined and combined_parts:
+        output_path = os.path.join(args.output_dir, f"{args.combined}.{args.format}")
+        with metrics.measure("export"):
+            saved = _save("".join(combined_parts), output_path, args.format, reporter)
+        if saved:
+            reporter.emit("combined_saved", output=output_path)
+        else:
+            failed += 1
+            reporter.emit("error", message=f"Failed to save {output_path}.")
+
+    if failed == 0:
+        manifest.delete()
+    else:
+        manifest.close() # Failed files are retried on the next run
+    prober.close()
+    _report_metrics(metrics, reporter, args.metrics_dir)
+    exit_code = EXIT_OK if failed == 0 else EXIT_FAILURES
+    reporter.emit("batch_done", succeeded=counts["succeeded"], failed=failed, cancelled=False, exit_code=exit_code)
+    return exit_code
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m cli", description=f"{config.APP_NAME} (headless)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    transcribe = subparsers.add_parser("transcribe", help="Transcribe files, glob patterns or directories.")
+    transcribe.add_argument("inputs", nargs="+", help="Media files, glob patterns or directories.")
+    transcribe.add_argument("-o", "--output-dir", default=os.getcwd(), help="Directory for the transcripts (default: current directory).")
+    transcribe.add_argument("-f", "--format", choices=OUTPUT_FORMATS, default="docx", help="Output format (srt, vtt and jsonl are written segment by segment).")
+    transcribe.add_argument("--combined", metavar="NAME", help="Write one combined file NAME.<format> instead of one per file.")
+    transcribe.add_argument("-r", "--recursive", action="store_true", help="Search directories and ** patterns recursively.")
+    transcribe.add_argument("--model", default=config.DEFAULT_WHISPER_MODEL, help="Whisper model name.")
+    transcribe.add_argument("--device", default=config.WHISPER_DEVICE, help='"auto", "cuda" or "cpu".')
+    transcribe.add_argument("--precision", default=config.WHISPER_CPU_PRECISION, help="CPU precision (fp32 or int8).")
+    transcribe.add_argument("--language", default=None, help="Language code; detected per file if omitted.")
+    transcribe.add_argument("--task", choices=["transcribe", "translate"], default="transcribe")
+    transcribe.add_argument("--workers", type=int, default=None, help="Worker processes (0 = auto, 1 = in-process).")
+    transcribe.add_argument("--no-cache", action="store_true", help="Neither read nor write the transcription cache.")
+    transcribe.add_argument("--no-vad", action="store_true", help="Send the full audio to the model (no voice-activity pre-pass).")
+    transcribe.add_argument("--restart", action="store_true", help="Discard the progress of an interrupted run of this batch.")
+    transcribe.add_argument("--progress", choices=["json", "text", "none"], default="json", help="Progress output style.")
+    transcribe.add_argument("--metrics-dir", default=config.METRICS_REPORT_DIR, help="Directory for the batch's JSON/CSV performance report.")
+    transcribe.set_defaults(handler=run_transcribe)
+    return parser
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support() # Batch worker processes re-import this module on Windows
+    sys.exit(main())
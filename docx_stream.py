@@ -0,0 +1,74 @@
+# docx_stream.py
+import importlib.util
+import os
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+DOCUMENT_PART = "word/document.xml"
+FLUSH_PARAGRAPHS = 1000  # Paragraphs buffered before they are written to the zip stream
+
+# Characters XML 1.0 can't hold (python-docx refuses them)
+_INVALID_XML_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+def default_template_path() -> str:
+    """python-docx's bundled default.docx, located without importing python-docx (and lxml)."""
+    spec = importlib.util.find_spec("docx")
+    if spec is None or not spec.submodule_search_locations:
+        raise FileNotFoundError("python-docx is not installed.")
+    return os.path.join(list(spec.submodule_search_locations)[0], "templates", "default.docx")
+
+def paragraph_xml(text: str) -> str:
+    """A paragraph as python-docx's add_paragraph(text) writes it: one run, tabs as <w:tab/>."""
+    text = _INVALID_XML_CHARS.sub("", text)
+    if not text:
+        return "<w:p/>"
+    runs = []
+    for index, part in enumerate(text.split("\t")):
+        if index:
+            runs.append("<w:tab/>")
+        if part:
+            runs.append(f'<w:t xml:space="preserve">{escape(part)}</w:t>')
+    return f"<w:p><w:r>{''.join(runs)}</w:r></w:p>"
+
+def _split_template_document(document_xml: str):
+    # Everything up to and including <w:body>, and the section properties that close the body
+    body_start = document_xml.index("<w:body")
+    body_open_end = document_xml.index(">", body_start) + 1
+    section_start = document_xml.rfind("<w:sectPr", body_open_end)
+    body_end = document_xml.rindex("</w:body>")
+    if section_start < 0:
+        section_start = body_end
+    return document_xml[:body_open_end], document_xml[section_start:]
+
+def write_docx(lines, output_path: str, template_path: str = None):
+    """
+    Writes `lines` (any iterable of strings) as one paragraph each into a .docx built on python-docx's
+    default template, the same document Document().add_paragraph() per line produces. The document XML
+    is generated straight into the zip container in one pass, so memory stays bounded by
+    FLUSH_PARAGRAPHS paragraphs however long the transcript is. The file is written under a temporary
+    name and moved into place when complete.
+    """
+    template_path = template_path or default_template_path()
+    temp_path = output_path + ".tmp"
+    try:
+        with zipfile.ZipFile(template_path) as template, \
+                zipfile.ZipFile(temp_path, "w", compression=zipfile.ZIP_DEFLATED) as target:
+            head, tail = _split_template_document(template.read(DOCUMENT_PART).decode("utf-8"))
+            for item in template.infolist():
+                if item.filename != DOCUMENT_PART:
+                    target.writestr(item, template.read(item.filename))
+            with target.open(DOCUMENT_PART, "w", force_zip64=True) as document:
+                document.write(head.encode("utf-8"))
+                buffered = []
+                for line in lines:
+                    buffered.append(paragraph_xml(line))
+                    if len(buffered) >= FLUSH_PARAGRAPHS:
+                        document.write("".join(buffered).encode("utf-8"))
+                        buffered = []
+                document.write(("".join(buffered) + tail).encode("utf-8"))
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
@@ -0,0 +1,84 @@
+# export_pool.py
+import concurrent.futures
+import os
+import threading
+
+import app_config as config
+
+class ExportPool:
+    """
+    Writes documents on background threads while the next file is being transcribed.
+
+    python-docx and fpdf2 lay documents out in pure Python, whereas the model spends its time in
+    PyTorch kernels that release the GIL, so the two overlap well. At most `max_pending` exports are
+    queued or running; submit() blocks beyond that so finished transcripts can't pile up in memory.
+    Outcomes are tracked per file index and returned by wait().
+    """
+    def __init__(self, max_workers: int = None, max_pending: int = None):
+        self.max_workers = max(1, max_workers or config.EXPORT_WORKER_THREADS)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers,
+                                                               thread_name_prefix="export")
+        self._slots = threading.BoundedSemaphore(max(self.max_workers, max_pending or config.EXPORT_MAX_PENDING))
+        self._lock = threading.Lock()
+        self._futures = []
+        self._results = {}  # index -> {"path", "ok", "error"}
+
+    def submit(self, index: int, save_function, text: str, output_path: str, status_callback=None, on_done=None):
+        """
+        Queues save_function(text, output_path, status_callback=...) for file `index`.
+        on_done(index, ok, output_path) is called on the writer thread once the file is written (or failed).
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(self._export, index, save_function, text, output_path,
+                                           status_callback, on_done)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._futures.append(future)
+        return future
+
+    def _export(self, index, save_function, text, output_path, status_callback, on_done):
+        error = None
+        try:
+            ok = bool(save_function(text, output_path, status_callback=status_callback))
+        except Exception as e: # The save functions report their own errors; this catches anything else
+            ok, error = False, str(e)
+            print(f"ExportPool - Error: Writing '{os.path.basename(output_path)}' failed: {e}")
+        finally:
+            self._slots.release()
+        with self._lock:
+            self._results[index] = {"path": output_path, "ok": ok, "error": error}
+        if on_done:
+            try:
+                on_done(index, ok, output_path)
+            except Exception as e:
+                print(f"ExportPool - Warning: Completion callback for file {index} failed: {e}")
+        return ok
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for future in self._futures if not future.done())
+
+    def wait(self) -> dict:
+        """Blocks until every submitted export has finished and returns {index: {"path", "ok", "error"}}."""
+        with self._lock:
+            futures = list(self._futures)
+        concurrent.futures.wait(futures)
+        with self._lock:
+            return dict(self._results)
+
+    def failed(self) -> list:
+        with self._lock:
+            return sorted(index for index, outcome in self._results.items() if not outcome["ok"])
+
+    def close(self):
+        """Waits for the queued exports and stops the writer threads."""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,7 +1,16 @@
 import os
-from docx import Document
-from fpdf import FPDF
+import copy
+import re
+import threading
 import app_config as config
+import docx_stream
+
+def _save_with_python_docx(text_content: str, output_filepath: str):
+    from docx import Document # Imported on first use to keep it off the startup path
+    document = Document()
+    for para_text in text_content.splitlines():
+        document.add_paragraph(para_text if para_text.strip() else "")
+    document.save(output_filepath)
 
 def save_text_to_word(text_content: str, output_filepath: str, status_callback=None) -> bool:
     if not output_filepath.lower().endswith(".docx"):
@@ -13,17 +22,21 @@ def save_text_to_word(text_content: str, output_filepath: str, status_callback=N
         if status_callback:
             status_callback(f"Creating Word document: {os.path.basename(output_filepath)}...")
 
-        document = Document()
-        for para_text in text_content.splitlines():
-            document.add_paragraph(para_text if para_text.strip() else "")
-
         output_dir = os.path.dirname(output_filepath)
         if output_dir and not os.path.exists(output_dir):
             os.makedirs(output_dir, exist_ok=True)
             if status_callback:
                 status_callback(f"Created output directory: {output_dir}")
 
-        document.save(output_filepath)
+        paragraphs = (para_text if para_text.strip() else "" for para_text in text_content.splitlines())
+        if config.STREAMING_DOCX_EXPORT:
+            try:
+                docx_stream.write_docx(paragraphs, output_filepath)
+            except (OSError, KeyError, ValueError) as e: # e.g. an unexpected python-docx template
+                print(f"FileExport - Warning: Streaming DOCX writer failed ({e}). Using python-docx.")
+                _save_with_python_docx(text_content, output_filepath)
+        else:
+            _save_with_python_docx(text_content, output_filepath)
         if status_callback:
             status_callback(f"Word document saved successfully: {output_filepath}")
         print(f"Word document saved successfully: {output_filepath}")
@@ -35,39 +48,201 @@ def save_text_to_word(text_content: str, output_filepath: str, status_callback=N
         print(error_msg)
         return False
 
-class PDF(FPDF):
-    def __init__(self, orientation='P', unit='mm', format='A4'):
-        super().__init__(orientation, unit, format)
-        self.font_path_regular = config.POPPINS_REGULAR_PATH
-        self.font_path_bold = config.POPPINS_BOLD_PATH
-        self.font_family_name = "CustomFont"
-        self.setup_fonts()
-
-    def setup_fonts(self):
-        try:
-            dejavu_font_path = os.path.join(config.FONTS_DIR, "DejaVuSans.ttf")
-            if os.path.exists(dejavu_font_path):
-                self.add_font("DejaVu", "", dejavu_font_path, uni=True)
-                self.font_family_name = "DejaVu"
-                return
-        except Exception as e:
-            print(f"Could not load DejaVuSans font: {e}. Trying Poppins.")
-
-        try:
-            if os.path.exists(self.font_path_regular):
-                self.add_font(self.font_family_name, "", self.font_path_regular, uni=True)
-                if os.path.exists(self.font_path_bold):
-                    self.add_font(self.font_family_name, "B", self.font_path_bold, uni=True)
-            else:
-                raise FileNotFoundError(f"{self.font_path_regular} not found.")
-        except Exception as e:
-            print(f"Could not load custom font ({self.font_path_regular}): {e}. Falling back to Arial.")
-            self.font_family_name = "Arial"
-
-    def chapter_body(self, text_content):
-        self.set_font(self.font_family_name, size=11)
-        for line in text_content.replace('\r\n', '\n').split('\n'):
-            self.multi_cell(0, 5, line)
+_PDF_CLASS = None
+
+# Parsed fonts shared by every PDF written in this process: (family, style, path, mtime) -> pristine font object
+_FONT_CACHE = {}
+_FONT_CACHE_LOCK = threading.Lock()
+_FONT_CACHE_DISABLED = False
+# _fresh_font_copy relies on fpdf2 internals checked against these releases (requirements.txt pins one)
+_FONT_CACHE_FPDF_VERSIONS = ("2.8.3",)
+
+# Whitespace other than a plain space, which fpdf2's line breaking treats specially
+_OTHER_SPACE = re.compile(r"[^\S ]")
+
+def clear_font_cache():
+    with _FONT_CACHE_LOCK:
+        _FONT_CACHE.clear()
+
+def _fresh_font_copy(font, pdf=None):
+    """
+    Copy of a parsed fpdf2 font object whose per-document state (glyph subset, missing glyphs) starts
+    out empty again. The glyph widths and metrics, which are the expensive part of add_font, are shared.
+    """
+    clone = copy.copy(font)
+    for name in getattr(type(font), "__slots__", ()) or list(vars(clone)):
+        value = getattr(clone, name, None)
+        if isinstance(value, (dict, list, set)):
+            setattr(clone, name, copy.copy(value))
+    subset = getattr(font, "subset", None)
+    if subset is not None:
+        clone.subset = copy.copy(subset)
+        for name, value in list(vars(clone.subset).items()):
+            if isinstance(value, (dict, list, set)):
+                setattr(clone.subset, name, copy.copy(value))
+            elif value is font:
+                setattr(clone.subset, name, clone)
+    if getattr(font, "ttfont", None) is not None:
+        # fpdf2 subsets the fontTools object in place when the document is written, so every document
+        # opens its own (lazily loaded) copy of the file
+        clone.ttfont = type(font.ttfont)(font.ttffile, recalcTimestamp=False, fontNumber=0, lazy=True)
+    if hasattr(clone, "hbfont"):
+        clone.hbfont = None
+    if pdf is not None and hasattr(clone, "i"):
+        clone.i = len(pdf.fonts) + 1
+    return clone
+
+def _pdf_class():
+    # fpdf2 pulls in Pillow, so it is only imported once a PDF is actually written
+    global _PDF_CLASS, _FONT_CACHE_DISABLED
+    if _PDF_CLASS is None:
+        from fpdf import FPDF, FPDF_VERSION
+        from fpdf.enums import XPos, YPos
+        if FPDF_VERSION not in _FONT_CACHE_FPDF_VERSIONS:
+            _FONT_CACHE_DISABLED = True  # add_font parses the font for every document instead
+            if config.PDF_FONT_CACHE_ENABLED:
+                print(f"FileExport - Warning: PDF font cache disabled (untested fpdf2 version {FPDF_VERSION}).")
+
+        class PDF(FPDF):
+            def __init__(self, orientation='P', unit='mm', format='A4'):
+                super().__init__(orientation, unit, format)
+                self.font_path_regular = config.POPPINS_REGULAR_PATH
+                self.font_path_bold = config.POPPINS_BOLD_PATH
+                self.font_family_name = "CustomFont"
+                self.fonts_from_cache = 0
+                self.setup_fonts()
+
+            def add_cached_font(self, family, style, font_path):
+                """add_font that parses each TTF once per process and reuses the result for later documents."""
+                global _FONT_CACHE_DISABLED
+                fontkey = f"{family.lower()}{style.upper()}"
+                cache_key = (family, style, font_path, os.path.getmtime(font_path))
+                use_cache = config.PDF_FONT_CACHE_ENABLED and not _FONT_CACHE_DISABLED
+                with _FONT_CACHE_LOCK:
+                    template = _FONT_CACHE.get(cache_key) if use_cache else None
+                if template is not None:
+                    try:
+                        self.fonts[fontkey] = _fresh_font_copy(template, self)
+                        self.fonts_from_cache += 1
+                        return
+                    except Exception as e: # Unknown fpdf2 internals: parse the font every time instead
+                        _FONT_CACHE_DISABLED = True
+                        print(f"FileExport - Warning: PDF font cache disabled ({e}).")
+                self.add_font(family, style, font_path, uni=True)
+                if use_cache and fontkey in self.fonts:
+                    try:
+                        pristine = _fresh_font_copy(self.fonts[fontkey])  # Taken before any text uses the font
+                    except Exception as e:
+                        _FONT_CACHE_DISABLED = True
+                        print(f"FileExport - Warning: PDF font cache disabled ({e}).")
+                        return
+                    with _FONT_CACHE_LOCK:
+                        _FONT_CACHE[cache_key] = pristine
+
+            def setup_fonts(self):
+                try:
+                    dejavu_font_path = os.path.join(config.FONTS_DIR, "DejaVuSans.ttf")
+                    if os.path.exists(dejavu_font_path):
+                        self.add_cached_font("DejaVu", "", dejavu_font_path)
+                        self.font_family_name = "DejaVu"
+                        return
+                except Exception as e:
+                    print(f"Could not load DejaVuSans font: {e}. Trying Poppins.")
+
+                try:
+                    if os.path.exists(self.font_path_regular):
+                        self.add_cached_font(self.font_family_name, "", self.font_path_regular)
+                        if os.path.exists(self.font_path_bold):
+                            self.add_cached_font(self.font_family_name, "B", self.font_path_bold)
+                    else:
+                        raise FileNotFoundError(f"{self.font_path_regular} not found.")
+                except Exception as e:
+                    print(f"Could not load custom font ({self.font_path_regular}): {e}. Falling back to Arial.")
+                    self.font_family_name = "Arial"
+
+            def wrap_line(self, line, max_width, char_widths):
+                """
+                Splits one transcript line into the lines multi_cell would print, or returns None when the
+                line needs multi_cell's full rules (leading, trailing or repeated spaces, other whitespace,
+                soft hyphens, or a word wider than the page). Each character is measured once per document
+                and the widths are added up in the same order as fpdf2 does, so the breaks are identical.
+                """
+                if not line or line != line.strip() or "  " in line or "\u00ad" in line or _OTHER_SPACE.search(line):
+                    return None
+                pieces = []
+                start = index = 0
+                width = 0.0
+                last_space = None
+                while index < len(line):
+                    character = line[index]
+                    character_width = char_widths.get(character)
+                    if character_width is None:
+                        character_width = char_widths[character] = self.get_string_width(character)
+                    if width + character_width > max_width:
+                        if character == " ":
+                            pieces.append(line[start:index])
+                            start = index + 1
+                        elif last_space is not None:
+                            pieces.append(line[start:last_space])
+                            start = last_space + 1
+                        else:
+                            return None
+                        index, width, last_space = start, 0.0, None
+                        continue
+                    if character == " ":
+                        last_space = index
+                    width += character_width
+                    index += 1
+                pieces.append(line[start:])
+                return pieces
+
+            def justified_cell(self, width, text, char_widths):
+                """
+                One justified line printed word by word with cell calls, placed where multi_cell's justified
+                rendering puts them: the spare width is shared out between the spaces.
+                """
+                words = text.split(" ")
+                word_widths = [sum(char_widths[character] for character in word) for word in words]
+                gap = char_widths[" "]
+                if len(words) > 1:
+                    gap += (width - 2 * self.c_margin - sum(word_widths) - char_widths[" "] * (len(words) - 1)) / (len(words) - 1)
+                x = self.x
+                for word_index, (word, word_width) in enumerate(zip(words, word_widths)):
+                    last = word_index == len(words) - 1
+                    self.cell(word_width + 2 * self.c_margin, 5, word, new_x=XPos.LMARGIN if last else XPos.RIGHT,
+                              new_y=YPos.NEXT if last else YPos.TOP)
+                    if word_index == 0:
+                        x = self.x - word_width - 2 * self.c_margin  # After a page break the line starts on the new page
+                    x += word_width + gap
+                    if not last:
+                        self.x = x
+
+            def chapter_body(self, text_content):
+                """
+                Lays the text out as 11 pt lines of 5 mm, justified like multi_cell. With PDF_MEASURED_LINE_WRAP
+                the lines are wrapped here from widths measured once per character, and printed with cell calls:
+                multi_cell re-measures the text it has gathered for every character it adds, which dominated
+                the time of long exports. Lines wrap_line can't handle go through multi_cell as before.
+                """
+                self.set_font(self.font_family_name, size=11)
+                char_widths = {}  # The font and size are fixed for the whole body
+                for line in text_content.replace('\r\n', '\n').split('\n'):
+                    width = self.w - self.r_margin - self.x
+                    pieces = self.wrap_line(line, width - 2 * self.c_margin, char_widths) if config.PDF_MEASURED_LINE_WRAP else None
+                    if pieces is None:
+                        self.multi_cell(0, 5, line, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+                        continue
+                    for piece in pieces[:-1]:
+                        self.justified_cell(width, piece, char_widths)
+                    self.cell(width, 5, pieces[-1], new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+        _PDF_CLASS = PDF
+    return _PDF_CLASS
+
+def __getattr__(name):
+    if name == "PDF":
+        return _pdf_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def save_text_to_pdf(text_content: str, output_filepath: str, status_callback=None) -> bool:
     if not output_filepath.lower().endswith(".pdf"):
@@ -79,7 +254,7 @@ def save_text_to_pdf(text_content: str, output_filepath: str, status_callback=No
         if status_callback:
             status_callback(f"Creating PDF document: {os.path.basename(output_filepath)}...")
 
-        pdf = PDF()
+        pdf = _pdf_class()()
         pdf.alias_nb_pages()
         pdf.add_page()
 
@@ -1,11 +1,13 @@
 # main.py
+from startup_profile import STARTUP_PROFILER # First, so the profile starts as early as possible
 
-import customtkinter as ctk
-import app_config as config
-from ui_manager import UIManager
-from PIL import Image 
-import tkinter as tk 
-import os # Import os
+with STARTUP_PROFILER.phase("imports: UI"):
+    import customtkinter as ctk
+    import app_config as config
+    from ui_manager import UIManager
+    import tkinter as tk 
+    import os # Import os
+    import multiprocessing
 
 class App(ctk.CTk):
     def __init__(self):
@@ -21,12 +23,21 @@ class App(ctk.CTk):
         self.center_window()
 
         # --- Set main window icon ---
+        with STARTUP_PROFILER.phase("app icon"):
+            self._load_app_icon()
+
+        self.ui_manager = UIManager(self)
+        self.ui_manager.show_loading_screen() 
+        self.after_idle(lambda: STARTUP_PROFILER.mark("first paint"))
+
+    def _load_app_icon(self):
         try:
             if os.path.exists(config.APP_ICON_PATH):
                 if config.APP_ICON_PATH.lower().endswith(".ico") and os.name == 'nt': # For .ico on Windows
                     self.iconbitmap(config.APP_ICON_PATH)
                     print(f"Attempted to load .ico: {config.APP_ICON_PATH}")
                 elif config.APP_ICON_PATH.lower().endswith((".png", ".gif")): # For PNG/GIF with PhotoImage
+                    from PIL import Image # Only needed for this icon format
                     pil_app_icon_image = Image.open(config.APP_ICON_PATH)
                     if pil_app_icon_image.mode != 'RGBA' and pil_app_icon_image.mode != 'RGB':
                         pil_app_icon_image = pil_app_icon_image.convert('RGBA')
@@ -44,10 +55,6 @@ class App(ctk.CTk):
         except Exception as e:
             print(f"General error loading main app icon (path: {config.APP_ICON_PATH}): Type: {type(e).__name__}, Message: {str(e)}")
 
-
-        self.ui_manager = UIManager(self)
-        self.ui_manager.show_loading_screen() 
-
     def center_window(self):
         self.update_idletasks() 
         width = self.winfo_width()
@@ -60,5 +67,7 @@ class App(ctk.CTk):
         self.geometry(f'{width}x{height}+{x}+{y}')
 
 if __name__ == "__main__":
-    app = App()
+    multiprocessing.freeze_support() # Batch worker processes re-import this module on Windows
+    with STARTUP_PROFILER.phase("main window"):
+        app = App()
     app.mainloop()
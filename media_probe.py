@@ -0,0 +1,147 @@
+# media_probe.py
+import concurrent.futures
+import json
+import os
+import threading
+import time
+
+import app_config as config
+import utils
+
+def _file_stamp(path: str):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+class ProbeCache:
+    """
+    Media durations remembered across runs in a small JSON file, keyed by absolute path and
+    invalidated when the file's size or modification time changes.
+    """
+    def __init__(self, path: str = None):
+        self.path = path or config.MEDIA_PROBE_CACHE_PATH
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._dirty = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"MediaProbe - Warning: Ignoring unreadable probe cache '{self.path}': {e}")
+
+    def get(self, file_path: str):
+        try:
+            size, mtime_ns = _file_stamp(file_path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._entries.get(os.path.abspath(file_path))
+        if entry and entry["size"] == size and entry["mtime_ns"] == mtime_ns:
+            return entry["duration"]
+        return None
+
+    def put(self, file_path: str, duration: float):
+        try:
+            size, mtime_ns = _file_stamp(file_path)
+        except OSError:
+            return
+        with self._lock:
+            self._entries[os.path.abspath(file_path)] = {"size": size, "mtime_ns": mtime_ns, "duration": duration}
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = dict(self._entries)
+            self._dirty = False
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"MediaProbe - Warning: Could not save the probe cache: {e}")
+
+class MediaProber:
+    """
+    Determines media durations on a pool of MEDIA_PROBE_WORKERS threads (each probe is an ffprobe
+    subprocess or a WAV/FLAC header read, so threads overlap them fine) with results served from
+    ProbeCache when possible.
+
+    probe() never blocks: cached files are reported at once, the rest as their probe finishes.
+    `durations` fills in as results arrive (0.0 when a duration couldn't be determined), so callers
+    can start working before every file has been probed.
+    """
+    def __init__(self, workers: int = None, cache: ProbeCache = None):
+        self.cache = cache or ProbeCache()
+        self.durations = {}
+        self.probe_seconds = {}  # Time spent probing each file this session (absent for cache hits)
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._in_flight = 0
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, workers or config.MEDIA_PROBE_WORKERS),
+                                                               thread_name_prefix="probe")
+
+    def _probe_one(self, file_path: str) -> float:
+        duration = 0.0
+        start = time.perf_counter()
+        try:
+            duration = utils.get_media_duration(file_path)
+            if duration > 0:
+                self.cache.put(file_path, duration)
+        finally:
+            with self._lock:
+                self.durations[file_path] = duration
+                self.probe_seconds[file_path] = time.perf_counter() - start
+                self._in_flight -= 1
+                idle = self._in_flight == 0
+            if idle:
+                self.cache.save()  # Once per burst of probes rather than per file
+        return duration
+
+    def probe(self, file_paths, callback=None):
+        """Starts probing `file_paths`; callback(file_path, duration) is called once for each of them."""
+        for file_path in file_paths:
+            with self._lock:
+                known = self.durations.get(file_path)
+                future = self._futures.get(file_path)
+            cached = self.cache.get(file_path) if known is None and future is None else None
+            with self._lock:  # Check again and claim the path in one step, so each file is probed once
+                known = self.durations.get(file_path)
+                future = self._futures.get(file_path)
+                if known is None and future is None:
+                    if cached is not None:
+                        self.durations[file_path] = known = cached
+                    else:
+                        self._in_flight += 1
+                        future = self._futures[file_path] = self._executor.submit(self._probe_one, file_path)
+            if not callback:
+                continue
+            if future is not None:
+                future.add_done_callback(lambda f, path=file_path: callback(path, 0.0 if f.cancelled() else f.result()))
+            else:
+                callback(file_path, known)
+
+    def duration(self, file_path: str, default: float = None):
+        with self._lock:
+            return self.durations.get(file_path, default)
+
+    def pending_count(self, file_paths) -> int:
+        with self._lock:
+            return sum(1 for path in file_paths if path not in self.durations)
+
+    def wait(self, file_paths) -> dict:
+        """Blocks until every file in `file_paths` has been probed; returns {file_path: duration}."""
+        self.probe(file_paths)
+        with self._lock:
+            futures = [self._futures[path] for path in file_paths if path in self._futures]
+        concurrent.futures.wait(futures)
+        with self._lock:
+            return {path: self.durations.get(path, 0.0) for path in file_paths}
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.cache.save()
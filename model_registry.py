@@ -0,0 +1,209 @@
+# model_registry.py
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+def estimate_model_bytes(model) -> int:
+    """
+    Approximates the memory held by a model from its state dict.
+    Dynamically quantized layers store packed (tensor, bias) tuples, so nested containers are walked too.
+    """
+    def tensor_bytes(value):
+        if hasattr(value, "numel") and hasattr(value, "element_size"):
+            return value.numel() * value.element_size()
+        if isinstance(value, (tuple, list)):
+            return sum(tensor_bytes(v) for v in value)
+        return 0
+    try:
+        return sum(tensor_bytes(v) for v in model.state_dict().values())
+    except Exception as e:
+        print(f"ModelRegistry - Warning: Could not estimate model size: {e}")
+        return 0
+
+class _RegistryEntry:
+    def __init__(self, model, size_bytes):
+        self.model = model
+        self.size_bytes = size_bytes
+        self.ref_count = 0
+        self.last_used = time.monotonic()
+        self.awaiting_first_use = False  # Preloaded and not acquired since: exempt from the idle timeout
+
+class ModelRegistry:
+    """
+    Keeps loaded Whisper models keyed by (model name, device, precision).
+
+    Models are handed out under a reference count and are only ever evicted while unused:
+    least-recently-used first when the total exceeds the RAM budget, and after sitting idle
+    longer than the idle timeout. A budget or timeout of 0 disables that limit. A preloaded model's
+    idle clock only starts once it has been used.
+
+    A model is not safe to run from several threads at once (whisper's decoder installs its
+    key/value cache hooks on the shared modules), so callers running inference hold exclusive(key).
+    """
+    def __init__(self, loader, ram_budget_mb: float = 0, idle_timeout_seconds: float = 0,
+                 after_unload=None, size_estimator=estimate_model_bytes):
+        self._loader = loader
+        self._after_unload = after_unload
+        self._size_estimator = size_estimator
+        self.ram_budget_bytes = int(ram_budget_mb * 1024 * 1024) if ram_budget_mb else 0
+        self.idle_timeout_seconds = idle_timeout_seconds or 0
+
+        self._entries = OrderedDict()  # key -> _RegistryEntry, least recently used first
+        self._known_sizes = {}  # key -> bytes, remembered after unloading for pre-eviction
+        self._lock = threading.RLock()
+        self._key_locks = {}  # Serialises loading of the same key
+        self._inference_locks = {}  # Serialises inference on the same key, see exclusive()
+        self._janitor_thread = None
+        self._janitor_stop = threading.Event()
+
+    def acquire(self, key):
+        """Returns the model for `key`, loading it if needed, and increments its reference count."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.ref_count += 1
+                entry.last_used = time.monotonic()
+                entry.awaiting_first_use = False
+                self._entries.move_to_end(key)
+                return entry.model
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)  # Another thread may have loaded it meanwhile
+                if entry is not None:
+                    entry.ref_count += 1
+                    entry.last_used = time.monotonic()
+                    entry.awaiting_first_use = False
+                    self._entries.move_to_end(key)
+                    return entry.model
+                if self.ram_budget_bytes:
+                    self._evict_until(self.ram_budget_bytes - self._known_sizes.get(key, 0))
+
+            model = self._loader(*key)
+            size_bytes = self._size_estimator(model)
+
+            with self._lock:
+                entry = _RegistryEntry(model, size_bytes)
+                entry.ref_count = 1
+                self._entries[key] = entry
+                self._known_sizes[key] = size_bytes
+                if self.ram_budget_bytes:
+                    self._evict_until(self.ram_budget_bytes)
+            self._ensure_janitor()
+            return model
+
+    def release(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            entry.ref_count = max(0, entry.ref_count - 1)
+            entry.last_used = time.monotonic()
+            if self.ram_budget_bytes:
+                self._evict_until(self.ram_budget_bytes)
+
+    @contextmanager
+    def use(self, key):
+        model = self.acquire(key)
+        try:
+            yield model
+        finally:
+            self.release(key)
+
+    @contextmanager
+    def exclusive(self, key):
+        """Holds the inference lock of `key`: one thread at a time runs the model, others wait their turn."""
+        with self._lock:
+            inference_lock = self._inference_locks.setdefault(key, threading.RLock())
+        with inference_lock:
+            yield
+
+    def preload(self, key):
+        """
+        Loads a model into the cache without holding a reference to it. The idle timeout doesn't apply
+        until it is first acquired, so a model loaded at startup is still there for the first job.
+        """
+        self.acquire(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.awaiting_first_use = True
+        self.release(key)
+
+    def is_loaded(self, key) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def loaded_keys(self):
+        with self._lock:
+            return list(self._entries.keys())
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.size_bytes for entry in self._entries.values())
+
+    def unload(self, key) -> bool:
+        """Unloads `key` if it is not in use. Returns True if the model was removed."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.ref_count > 0:
+                return False
+            del self._entries[key]
+        self._dispose(key, entry)
+        return True
+
+    def unload_idle(self, now: float = None):
+        if not self.idle_timeout_seconds:
+            return []
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle_keys = [key for key, entry in self._entries.items()
+                         if entry.ref_count == 0 and not entry.awaiting_first_use
+                         and now - entry.last_used >= self.idle_timeout_seconds]
+        return [key for key in idle_keys if self.unload(key)]
+
+    def clear(self):
+        for key in self.loaded_keys():
+            self.unload(key)
+
+    def _evict_until(self, limit_bytes):
+        # Caller holds self._lock. Only unreferenced models are candidates, oldest first.
+        evicted = []
+        total = sum(entry.size_bytes for entry in self._entries.values())
+        for key in list(self._entries.keys()):
+            if total <= limit_bytes:
+                break
+            entry = self._entries[key]
+            if entry.ref_count > 0:
+                continue
+            del self._entries[key]
+            total -= entry.size_bytes
+            evicted.append((key, entry))
+        for key, entry in evicted:
+            self._dispose(key, entry)
+
+    def _dispose(self, key, entry):
+        print(f"ModelRegistry: Unloading model {key} ({entry.size_bytes / (1024 ** 2):.0f} MB).")
+        entry.model = None  # Drop the last registry reference before reclaiming memory
+        if self._after_unload:
+            try:
+                self._after_unload()
+            except Exception as e:
+                print(f"ModelRegistry - Warning: Error while unloading {key}: {e}")
+
+    def _ensure_janitor(self):
+        if not self.idle_timeout_seconds:
+            return
+        interval = max(1.0, min(self.idle_timeout_seconds / 2, 30.0))
+
+        def janitor():
+            while not self._janitor_stop.wait(interval):
+                self.unload_idle()
+
+        with self._lock:  # Checked and started together, so concurrent loads start only one janitor
+            if self._janitor_thread and self._janitor_thread.is_alive():
+                return
+            self._janitor_thread = threading.Thread(target=janitor, daemon=True)
+            self._janitor_thread.start()
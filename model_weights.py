@@ -0,0 +1,131 @@
+# model_weights.py
+import hashlib
+import json
+import os
+
+import torch
+import whisper
+from whisper.model import ModelDimensions, Whisper
+
+import app_config as config
+
+FORMAT_VERSION = 1
+
+def _whisper_download_root() -> str:
+    # Same default location as whisper.load_model
+    default = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(os.getenv("XDG_CACHE_HOME", default), "whisper")
+
+def _file_stamp(path: str) -> dict:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def _sha256_of_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class WeightCache:
+    """
+    One-time conversion of Whisper checkpoints into memory-mappable fp32 state dicts.
+
+    The official checkpoint is downloaded and SHA-256 verified by whisper once. Its converted copy is
+    stored in `cache_dir` next to a small JSON fingerprint recording the size/mtime of both files, so
+    later launches trust the files without re-hashing them and map the weights lazily with
+    torch.load(mmap=True) instead of deserializing the whole checkpoint.
+    """
+    def __init__(self, cache_dir: str = None, download_root: str = None):
+        self.cache_dir = cache_dir or config.MODEL_WEIGHT_CACHE_DIR
+        self.download_root = download_root or _whisper_download_root()
+
+    def _paths(self, model_name: str):
+        url = whisper._MODELS[model_name]
+        expected_sha256 = url.split("/")[-2]
+        checkpoint_path = os.path.join(self.download_root, os.path.basename(url))
+        converted_path = os.path.join(self.cache_dir, f"{model_name}-{expected_sha256[:12]}.pt")
+        return url, expected_sha256, checkpoint_path, converted_path
+
+    def _read_fingerprint(self, converted_path: str):
+        try:
+            with open(converted_path + ".json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_converted(self, model_name: str) -> bool:
+        """True when the converted weights exist and match their recorded fingerprint."""
+        _, expected_sha256, _, converted_path = self._paths(model_name)
+        fingerprint = self._read_fingerprint(converted_path)
+        if not fingerprint or not os.path.exists(converted_path):
+            return False
+        return (fingerprint.get("format_version") == FORMAT_VERSION
+                and fingerprint.get("source_sha256") == expected_sha256
+                and fingerprint.get("converted") == _file_stamp(converted_path))
+
+    def convert(self, model_name: str) -> str:
+        """Downloads (if needed), verifies and converts a checkpoint. Returns the converted file path."""
+        url, expected_sha256, checkpoint_path, converted_path = self._paths(model_name)
+        if os.path.exists(checkpoint_path) and _sha256_of_file(checkpoint_path) == expected_sha256:
+            print(f"WeightCache: Verified checkpoint '{os.path.basename(checkpoint_path)}'.")
+        else:
+            checkpoint_path = whisper._download(url, self.download_root, False)  # Downloads and verifies
+
+        checkpoint = torch.load(checkpoint_path, map_location="cpu")
+        state_dict = {name: tensor.float() if tensor.is_floating_point() else tensor
+                      for name, tensor in checkpoint["model_state_dict"].items()}
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = converted_path + ".tmp"
+        torch.save({"dims": checkpoint["dims"], "model_state_dict": state_dict}, temp_path)
+        os.replace(temp_path, converted_path)
+
+        fingerprint = {"format_version": FORMAT_VERSION, "model": model_name, "source_sha256": expected_sha256,
+                       "source": {"path": checkpoint_path, **_file_stamp(checkpoint_path)},
+                       "converted": _file_stamp(converted_path)}
+        with open(converted_path + ".json", "w", encoding="utf-8") as f:
+            json.dump(fingerprint, f, indent=2)
+        print(f"WeightCache: Converted '{model_name}' to {converted_path}.")
+        return converted_path
+
+    def load(self, model_name: str, device: str):
+        """Returns a Whisper model whose CPU weights are memory-mapped from the converted file."""
+        converted_path = self._paths(model_name)[3]
+        if not self.is_converted(model_name):
+            converted_path = self.convert(model_name)
+        checkpoint = torch.load(converted_path, map_location="cpu", mmap=True, weights_only=True)
+        dims = ModelDimensions(**checkpoint["dims"])
+        try:
+            with torch.device("meta"):
+                model = Whisper(dims)  # No memory or random init for weights that are replaced right away
+        except (RuntimeError, NotImplementedError):
+            model = Whisper(dims)  # Some builds can't create every buffer on the meta device
+        model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+
+        # Non-persistent buffers are not in the state dict and have to be rebuilt off the meta device
+        model.decoder.mask = torch.empty(dims.n_text_ctx, dims.n_text_ctx).fill_(-float("inf")).triu_(1)
+        all_heads = torch.zeros(dims.n_text_layer, dims.n_text_head, dtype=torch.bool)
+        all_heads[dims.n_text_layer // 2:] = True
+        model.alignment_heads = all_heads.to_sparse()
+        if model_name in whisper._ALIGNMENT_HEADS:
+            model.set_alignment_heads(whisper._ALIGNMENT_HEADS[model_name])
+        if any(t.is_meta for t in list(model.parameters()) + list(model.buffers())):
+            raise RuntimeError(f"Converted weights for '{model_name}' did not cover every tensor.")
+        return model.to(device)
+
+WEIGHT_CACHE = WeightCache()
+
+def load_whisper_model(model_name: str, device: str):
+    """
+    Loads a Whisper model through WEIGHT_CACHE when possible. Custom checkpoint paths, unknown model
+    names and PyTorch builds without mmap loading (< 2.1) use whisper.load_model as before.
+    """
+    if not config.FAST_MODEL_LOADING or model_name not in whisper._MODELS:
+        return whisper.load_model(model_name, device=device)
+    try:
+        return WEIGHT_CACHE.load(model_name, device)
+    except TypeError as e:  # torch.load(mmap=...) / load_state_dict(assign=...) not supported
+        print(f"WeightCache - Warning: Fast loading unavailable ({e}). Using whisper.load_model.")
+    except Exception as e:
+        print(f"WeightCache - Warning: Could not use converted weights for '{model_name}': {e}")
+    return whisper.load_model(model_name, device=device)
@@ -0,0 +1,202 @@
+# native_audio.py
+import math
+import os
+import struct
+from typing import NamedTuple
+
+import numpy as np
+
+import app_config as config
+
+SAMPLE_RATE = 16000  # whisper.audio.SAMPLE_RATE, repeated here so probing doesn't import whisper
+BLOCK_FRAMES = 1 << 20  # Frames converted per step, bounding temporary memory
+RESAMPLE_BLOCK = 1 << 16  # Output samples per resampling step (each gathers a window of taps per sample)
+FILTER_HALF_TAPS = 16  # Half-length of the resampling filter, in output samples
+FILTER_ROLLOFF = 0.95  # Low-pass cutoff as a share of the output Nyquist frequency
+KAISER_BETA = 8.0
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+class WavInfo(NamedTuple):
+    sample_rate: int
+    channels: int
+    bits: int
+    is_float: bool
+    data_offset: int
+    frames: int
+
+class FlacInfo(NamedTuple):
+    sample_rate: int
+    channels: int
+    bits: int
+    total_samples: int  # Per channel; 0 when the encoder didn't know it
+
+def read_wav_header(file_path: str):
+    """Format and data location of a PCM or IEEE-float WAV file, or None for anything else (RF64, ADPCM, ...)."""
+    try:
+        file_size = os.path.getsize(file_path)
+        with open(file_path, "rb") as f:
+            riff = f.read(12)
+            if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+                return None
+            fmt = None
+            while True:
+                chunk_header = f.read(8)
+                if len(chunk_header) < 8:
+                    return None
+                chunk_id, chunk_size = struct.unpack("<4sI", chunk_header)
+                if chunk_id == b"fmt ":
+                    fmt = f.read(chunk_size)
+                    if chunk_size % 2:
+                        f.seek(1, os.SEEK_CUR)
+                elif chunk_id == b"data":
+                    data_offset = f.tell()
+                    break
+                else:
+                    f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+    except OSError:
+        return None
+    if fmt is None or len(fmt) < 16:
+        return None
+    format_tag, channels, sample_rate, _, block_align, bits = struct.unpack("<HHIIHH", fmt[:16])
+    if format_tag == _WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+        format_tag = struct.unpack("<H", fmt[24:26])[0]  # First two bytes of the sub-format GUID
+    is_float = format_tag == _WAVE_FORMAT_IEEE_FLOAT
+    if not ((format_tag == _WAVE_FORMAT_PCM and bits in (8, 16, 24, 32)) or (is_float and bits in (32, 64))):
+        return None
+    if channels < 1 or sample_rate < 1 or block_align != channels * bits // 8:
+        return None
+    # Streamed WAVs (e.g. written to a pipe) leave the size at 0 or 0xFFFFFFFF; the data runs to the end
+    data_size = chunk_size
+    if data_size in (0, 0xFFFFFFFF) or data_offset + data_size > file_size:
+        data_size = file_size - data_offset
+    return WavInfo(sample_rate, channels, bits, is_float, data_offset, data_size // block_align)
+
+def read_flac_streaminfo(file_path: str):
+    """STREAMINFO of a FLAC file (skipping a leading ID3v2 tag), or None if it isn't one."""
+    try:
+        with open(file_path, "rb") as f:
+            header = f.read(10)
+            if header[:3] == b"ID3" and len(header) == 10:
+                tag_size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+                f.seek(10 + tag_size + (10 if header[5] & 0x10 else 0))  # Footer flag adds 10 bytes
+                header = f.read(4)
+            else:
+                f.seek(4)
+            if header[:4] != b"fLaC":
+                return None
+            block_header = f.read(4)
+            block = f.read(34)
+    except OSError:
+        return None
+    if len(block_header) < 4 or block_header[0] & 0x7F != 0 or len(block) < 34:
+        return None  # STREAMINFO must be the first metadata block
+    packed = int.from_bytes(block[10:18], "big")
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    bits = ((packed >> 36) & 0x1F) + 1
+    total_samples = packed & 0xFFFFFFFFF
+    if sample_rate == 0:
+        return None
+    return FlacInfo(sample_rate, channels, bits, total_samples)
+
+def media_duration(file_path: str):
+    """Duration in seconds read from a WAV or FLAC header, or None when ffprobe is needed."""
+    if not config.NATIVE_AUDIO_ENABLED:
+        return None
+    wav = read_wav_header(file_path)
+    if wav is not None:
+        return wav.frames / wav.sample_rate
+    flac = read_flac_streaminfo(file_path)
+    if flac is not None and flac.total_samples > 0:
+        return flac.total_samples / flac.sample_rate
+    return None
+
+def _sample_reader(file_path: str, info: WavInfo):
+    """read(start, stop) -> frames start..stop mixed down to mono float32."""
+    if info.is_float:
+        dtype, shape = np.dtype(f"<f{info.bits // 8}"), (info.frames, info.channels)
+    elif info.bits == 24:
+        dtype, shape = np.dtype(np.uint8), (info.frames, info.channels, 3)
+    else:
+        dtype, shape = np.dtype({8: "u1", 16: "<i2", 32: "<i4"}[info.bits]), (info.frames, info.channels)
+    data = np.memmap(file_path, dtype=dtype, mode="r", offset=info.data_offset, shape=shape)
+
+    def read(start, stop):
+        raw = data[start:stop]
+        if info.is_float:
+            samples = np.clip(raw, -1.0, 1.0).astype(np.float32)
+        elif info.bits == 24:
+            wide = raw.astype(np.int32)
+            samples = ((wide[..., 0] << 8) | (wide[..., 1] << 16) | (wide[..., 2] << 24)) >> 8  # Sign-extended
+            samples = samples.astype(np.float32) / 8388608.0
+        elif info.bits == 8:
+            samples = (raw.astype(np.float32) - 128.0) / 128.0  # 8-bit WAV is unsigned
+        else:
+            samples = raw.astype(np.float32) / float(1 << (info.bits - 1))
+        return samples[:, 0] if info.channels == 1 else samples.mean(axis=1, dtype=np.float32)
+
+    return read
+
+def _resampling_filter(up: int, down: int):
+    # One row of taps per fractional input position (polyphase windowed-sinc low-pass)
+    ratio = min(1.0, up / down)
+    half = math.ceil(FILTER_HALF_TAPS / ratio)
+    offsets = np.arange(-half + 1, half + 1)
+    distance = np.arange(up)[:, None] / up - offsets[None, :]
+    cutoff = ratio * FILTER_ROLLOFF
+    window = np.i0(KAISER_BETA * np.sqrt(np.clip(1.0 - (distance / half) ** 2, 0.0, 1.0))) / np.i0(KAISER_BETA)
+    taps = cutoff * np.sinc(cutoff * distance) * window
+    taps /= taps.sum(axis=1, keepdims=True)  # Unity gain at DC for every phase
+    return offsets, taps.astype(np.float32)
+
+def _resample(read, frames: int, source_rate: int, target_rate: int) -> np.ndarray:
+    divisor = math.gcd(source_rate, target_rate)
+    up, down = target_rate // divisor, source_rate // divisor
+    offsets, taps = _resampling_filter(up, down)
+    output = np.empty(-(-frames * up // down), dtype=np.float32)
+    block = up * max(1, RESAMPLE_BLOCK // up)  # Whole periods of the phase pattern
+    for start in range(0, output.size, block):
+        stop = min(start + block, output.size)
+        # Output start + r + up*m sits at input start*down/up + (r*down)//up + down*m, always with phase (r*down) % up
+        origin = start * down // up
+        first, last = origin + int(offsets[0]), (stop - 1) * down // up + int(offsets[-1]) + 1
+        window = np.zeros(last - first, dtype=np.float32)  # Zero beyond either end of the recording
+        window[max(0, -first):min(frames, last) - first] = read(max(0, first), min(frames, last))
+        for residue in range(min(up, stop - start)):
+            count = -(-(stop - start - residue) // up)
+            rows = np.lib.stride_tricks.as_strided(window[origin + residue * down // up + int(offsets[0]) - first:],
+                                                   shape=(count, offsets.size), strides=(down * window.itemsize, window.itemsize), writeable=False)
+            output[start + residue:stop:up] = rows @ taps[residue * down % up]
+    return output
+
+def read_audio(file_path: str, sr: int = SAMPLE_RATE):
+    """
+    Mono float32 PCM at `sr` for WAV files, read through a memory map and resampled in-process, or None
+    when the file needs ffmpeg (compressed formats, FLAC, unusual WAV variants). 16-bit mono files at the
+    target rate come out exactly as whisper.audio.load_audio decodes them.
+    """
+    if not config.NATIVE_AUDIO_ENABLED:
+        return None
+    info = read_wav_header(file_path)
+    if info is None:
+        return None
+    if info.frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    read = _sample_reader(file_path, info)  # The memory map is released with it
+    if info.sample_rate != sr:
+        return _resample(read, info.frames, info.sample_rate, sr)
+    audio = np.empty(info.frames, dtype=np.float32)
+    for start in range(0, info.frames, BLOCK_FRAMES):
+        audio[start:start + BLOCK_FRAMES] = read(start, min(start + BLOCK_FRAMES, info.frames))
+    return audio
+
+def load_audio(file_path: str, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Drop-in for whisper.audio.load_audio that only spawns ffmpeg for files read_audio can't handle."""
+    audio = read_audio(file_path, sr)
+    if audio is not None:
+        return audio
+    from whisper.audio import load_audio as ffmpeg_load_audio
+    return ffmpeg_load_audio(file_path, sr=sr)
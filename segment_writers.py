@@ -0,0 +1,153 @@
+# segment_writers.py
+import json
+import os
+import time
+
+import app_config as config
+
+def format_srt_timestamp(seconds: float) -> str:
+    milliseconds = max(0, int(round(seconds * 1000)))
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+
+def format_vtt_timestamp(seconds: float) -> str:
+    return format_srt_timestamp(seconds).replace(",", ".")
+
+class SegmentWriter:
+    """
+    Appends segments to a transcript file as they are decoded instead of after the whole file.
+
+    Records are collected in memory and written to the unbuffered file as whole records, at most every
+    SEGMENT_WRITER_FLUSH_SECONDS, so a file left by a crashed or killed run ends with the last complete
+    record. The file is not fsynced, so after a power loss the last flush may be cut short. Times come straight from the segments' start/end (in seconds);
+    `time_offset` shifts them, e.g. when several recordings share one file.
+    """
+    extension = ""
+
+    def __init__(self, output_path: str, flush_seconds: float = None):
+        if not output_path.lower().endswith(self.extension):
+            output_path += self.extension
+        self.output_path = output_path
+        self.flush_seconds = config.SEGMENT_WRITER_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self.count = 0
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        self._file = open(output_path, "wb", buffering=0)
+        self._pending = []  # Whole records not yet written
+        self._last_flush = time.monotonic()
+        self._write(self._header())
+        self.flush()
+
+    def _header(self) -> str:
+        return ""
+
+    def _record(self, number: int, segment: dict, start: float, end: float, source: str) -> str:
+        raise NotImplementedError
+
+    def _write(self, text: str):
+        if text:
+            self._pending.append(text)
+
+    def write(self, segment: dict, time_offset: float = 0.0, source: str = None):
+        self.count += 1
+        self._write(self._record(self.count, segment, segment["start"] + time_offset,
+                                 segment["end"] + time_offset, source))
+        if time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            data = memoryview("".join(self._pending).encode("utf-8"))
+            self._pending.clear()
+            while data:  # An unbuffered write may take only part of the data
+                data = data[self._file.write(data):]
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class SrtWriter(SegmentWriter):
+    extension = ".srt"
+
+    def _record(self, number, segment, start, end, source):
+        text = segment["text"].strip().replace("-->", "->")  # Would be read as a timing line
+        return f"{number}\n{format_srt_timestamp(start)} --> {format_srt_timestamp(end)}\n{text}\n\n"
+
+class WebVttWriter(SegmentWriter):
+    extension = ".vtt"
+
+    def _header(self):
+        return "WEBVTT\n\n"
+
+    def _record(self, number, segment, start, end, source):
+        # "-->" may not appear in cue text
+        text = segment["text"].strip().replace("-->", "->")
+        return f"{format_vtt_timestamp(start)} --> {format_vtt_timestamp(end)}\n{text}\n\n"
+
+class JsonlWriter(SegmentWriter):
+    extension = ".jsonl"
+
+    def _record(self, number, segment, start, end, source):
+        record = {"id": number - 1, "start": round(start, 3), "end": round(end, 3), "text": segment["text"].strip(),
+                  "language": segment.get("language"), "avg_logprob": segment.get("avg_logprob"),
+                  "no_speech_prob": segment.get("no_speech_prob")}
+        if source is not None:
+            record["file"] = source
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+SEGMENT_WRITERS = {"srt": SrtWriter, "vtt": WebVttWriter, "jsonl": JsonlWriter}
+
+def create_writer(output_format: str, output_path: str) -> SegmentWriter:
+    return SEGMENT_WRITERS[output_format](output_path)
+
+class OrderedBatchWriter:
+    """
+    Streams the segments of several files into one writer in input order. Files transcribed in parallel
+    report out of order: segments of the earliest unfinished file are written at once, those of later
+    files are held until every file before them is finished. Each file's times are shifted by its
+    `time_offsets` entry, so a combined subtitle file plays the recordings back to back.
+    """
+    def __init__(self, writer: SegmentWriter, sources, time_offsets=None):
+        self.writer = writer
+        self.sources = list(sources)
+        self.time_offsets = list(time_offsets) if time_offsets is not None else [0.0] * len(self.sources)
+        self._held = {index: [] for index in range(len(self.sources))}
+        self._finished = set()
+        self._head = 0
+
+    def write(self, file_index: int, segment: dict):
+        if file_index == self._head:
+            self._write(file_index, segment)
+        else:
+            self._held.setdefault(file_index, []).append(segment)
+
+    def _write(self, file_index, segment):
+        self.writer.write(segment, time_offset=self.time_offsets[file_index],
+                          source=os.path.basename(self.sources[file_index]))
+
+    def finish_file(self, file_index: int):
+        self._finished.add(file_index)
+        while self._head in self._finished:
+            self._head += 1
+            if self._head < len(self.sources):
+                for segment in self._held.pop(self._head, []):
+                    self._write(self._head, segment)
+
+    def close(self):
+        # Files that never finished (failed or cancelled) still get what they decoded
+        for file_index in sorted(self._held):
+            for segment in self._held[file_index]:
+                self._write(file_index, segment)
+        self._held.clear()
+        self.writer.close()
@@ -0,0 +1,69 @@
+# startup_profile.py
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+import app_config as config
+
+PROCESS_START = time.perf_counter() # main.py imports this module first, so this is (almost) process start
+
+class StartupProfiler:
+    """
+    Records how long each startup phase took (imports, icon loading, system checks, model load, ...),
+    relative to PROCESS_START. Phases may be recorded from any thread.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._phases = []  # (name, start offset, duration), both in seconds
+        self._reported_count = 0  # Phases already printed by report()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.perf_counter() - start)
+
+    def mark(self, name: str):
+        """Records a point in time (a phase of zero duration), e.g. the first paint."""
+        self._record(name, time.perf_counter(), 0.0)
+
+    def _record(self, name, start, duration):
+        with self._lock:
+            self._phases.append((name, start - PROCESS_START, duration))
+
+    def phases(self):
+        with self._lock:
+            return sorted(self._phases, key=lambda p: p[1])
+
+    def format_report(self, phases=None) -> str:
+        lines = ["Startup profile (seconds since process start):"]
+        for name, start, duration in self.phases() if phases is None else phases:
+            took = f"took {duration:7.3f}s" if duration else "(mark)"
+            lines.append(f"  {name:<28} at {start:7.3f}s  {took}")
+        return "\n".join(lines)
+
+    def report(self):
+        """
+        Prints the profile and writes it to STARTUP_PROFILE_PATH (JSON) if set. A later call (e.g. once the
+        home screen is built) prints only the phases recorded since and rewrites the JSON with all of them.
+        """
+        if not config.STARTUP_PROFILE_ENABLED:
+            return
+        with self._lock:
+            new_phases = sorted(self._phases[self._reported_count:], key=lambda p: p[1])
+            self._reported_count = len(self._phases)
+        if not new_phases:
+            return
+        print(self.format_report(new_phases))
+        if config.STARTUP_PROFILE_PATH:
+            try:
+                with open(config.STARTUP_PROFILE_PATH, "w", encoding="utf-8") as f:
+                    json.dump([{"phase": name, "start_seconds": start, "duration_seconds": duration}
+                               for name, start, duration in self.phases()], f, indent=2)
+            except OSError as e:
+                print(f"StartupProfiler - Warning: Could not write '{config.STARTUP_PROFILE_PATH}': {e}")
+
+STARTUP_PROFILER = StartupProfiler()
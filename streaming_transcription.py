@@ -0,0 +1,279 @@
+# streaming_transcription.py
+"""
+Live transcription of a PCM stream with incremental results.
+
+Usage (from the repository root):
+    python -m streaming_transcription path/to/recording.wav --realtime   # Replay a file at real-time pace
+    ffmpeg -i input -f s16le -ac 1 -ar 16000 - | python -m streaming_transcription -   # 16 kHz s16le on stdin
+"""
+import argparse
+import bisect
+import sys
+import time
+
+import numpy as np
+import torch
+from whisper.audio import SAMPLE_RATE, N_FRAMES, N_SAMPLES, HOP_LENGTH, log_mel_spectrogram, pad_or_trim
+from whisper.tokenizer import get_tokenizer
+
+import app_config as config
+from native_audio import load_audio
+import transcription_handler
+import window_decoding
+
+MAX_PROMPT_TOKENS = 223 # Whisper's n_text_ctx // 2 - 1: the most previous text a decode may be conditioned on
+
+def pcm16_to_float32(data: bytes) -> np.ndarray:
+    """Converts 16-bit little-endian mono PCM bytes to float32 samples in [-1, 1]."""
+    return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+
+class StreamingSession:
+    """
+    Transcribes 16 kHz mono audio that arrives in chunks.
+
+    Every STREAM_STEP_SECONDS of new audio the unconfirmed part of the stream (at most 30 seconds) is
+    decoded again as one window. The text of that window is reported as a 'partial' event and may still
+    change. A segment becomes 'final' once two consecutive passes agree on it and a later segment has
+    started, or unconditionally once the unconfirmed audio grows past STREAM_MAX_LATENCY_SECONDS, which
+    bounds the delay between speech and its final text. Finalized audio is dropped from the window and
+    the finalized text is used as the prompt for the following passes.
+
+    Events are dicts passed to `event_callback` and also returned by feed() and finish():
+    {'type': 'partial', 'text', 'start_seconds', 'end_seconds'} and
+    {'type': 'final', 'segment', 'latency_seconds', ...the fields of a transcription 'segment' event}.
+    """
+    def __init__(self, language: str = None, task: str = "transcribe", model=None, model_name: str = None,
+                 device: str = None, precision: str = None, step_seconds: float = None,
+                 max_latency_seconds: float = None, event_callback=None, **decode_options):
+        self._model_key = None
+        if model is None:
+            self._model_key = transcription_handler.resolve_model_key(model_name, device, precision)
+            if self._model_key is None:
+                raise RuntimeError("The requested device is not available.")
+            model = transcription_handler.MODEL_REGISTRY.acquire(self._model_key)
+        self.model = model
+        self.language = language
+        self.task = task
+        self.step_seconds = config.STREAM_STEP_SECONDS if step_seconds is None else step_seconds
+        max_latency = config.STREAM_MAX_LATENCY_SECONDS if max_latency_seconds is None else max_latency_seconds
+        self.max_latency_seconds = min(max_latency, N_SAMPLES / SAMPLE_RATE - self.step_seconds)
+        self.event_callback = event_callback
+
+        self._fp16 = decode_options.pop("fp16", True) and model.device.type != "cpu"
+        self._dtype = torch.float16 if self._fp16 else torch.float32
+        temperature = decode_options.pop("temperature", 0.0)  # No fallback by default, it multiplies latency
+        self._temperatures = (temperature,) if isinstance(temperature, (int, float)) else tuple(temperature)
+        self._compression_ratio_threshold = decode_options.pop("compression_ratio_threshold", 2.4)
+        self._logprob_threshold = decode_options.pop("logprob_threshold", -1.0)
+        self._no_speech_threshold = decode_options.pop("no_speech_threshold", 0.6)
+        self._decode_options = decode_options
+        self._tokenizer = None
+
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._buffer_start = 0.0  # Stream time of the first buffered sample (seconds)
+        self._samples_since_decode = 0
+        self._samples_fed = 0
+        self._feed_clock = ([], [])  # (stream seconds fed, wall-clock time) for every chunk
+        self._committed_tokens = []
+        self._previous_texts = []
+        self._partial_text = ""
+        self._segment_id = 0
+        self.latencies = []  # Seconds between audio arriving and its text being finalized
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def stream_seconds(self) -> float:
+        return self._samples_fed / SAMPLE_RATE
+
+    def feed(self, pcm) -> list:
+        """
+        Appends a chunk of audio (float32 samples or 16-bit little-endian PCM bytes) and decodes the
+        window again when enough new audio has arrived. Returns the events produced by this chunk.
+        """
+        if self._closed:
+            raise RuntimeError("The streaming session is closed.")
+        samples = pcm16_to_float32(pcm) if isinstance(pcm, (bytes, bytearray, memoryview)) else np.asarray(pcm, dtype=np.float32)
+        if samples.size == 0:
+            return []
+        self._buffer = np.concatenate([self._buffer, samples])
+        self._samples_fed += samples.size
+        self._samples_since_decode += samples.size
+        self._feed_clock[0].append(self.stream_seconds)
+        self._feed_clock[1].append(time.perf_counter())
+        if self._samples_since_decode < self.step_seconds * SAMPLE_RATE:
+            return []
+        return self._decode_pass(final=False)
+
+    def finish(self) -> list:
+        """Decodes whatever audio is left and finalizes all of it. The session can't be fed afterwards."""
+        events = self._decode_pass(final=True) if self._buffer.size else []
+        self.close()
+        return events
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._model_key is not None:
+            transcription_handler.MODEL_REGISTRY.release(self._model_key)
+        self.model = None
+
+    def _emit(self, events):
+        if self.event_callback:
+            for event in events:
+                self.event_callback(event)
+        return events
+
+    def _arrival_time(self, stream_seconds: float) -> float:
+        # Wall-clock time at which the audio up to `stream_seconds` had been fed
+        fed_seconds, wall_times = self._feed_clock
+        index = min(bisect.bisect_left(fed_seconds, stream_seconds - 1e-6), len(wall_times) - 1)
+        return wall_times[index]
+
+    def _decode_pass(self, final: bool) -> list:
+        self._samples_since_decode = 0
+        buffer_audio = self._buffer[-N_SAMPLES:]
+        self._buffer_start += (self._buffer.size - buffer_audio.size) / SAMPLE_RATE  # Only when decoding fell behind
+        self._buffer = buffer_audio
+        mel = log_mel_spectrogram(torch.from_numpy(buffer_audio), self.model.dims.n_mels, padding=N_SAMPLES)
+        segment_size = min(N_FRAMES, mel.shape[-1] - N_FRAMES)
+        mel_segment = pad_or_trim(mel[:, :segment_size], N_FRAMES).to(self.model.device).to(self._dtype)
+
+        if self._tokenizer is None:
+            if self.language is None:
+                if self.model.is_multilingual:
+                    _, probs = self.model.detect_language(mel_segment)
+                    self.language = max(probs, key=probs.get)
+                else:
+                    self.language = "en"
+            self._tokenizer = get_tokenizer(self.model.is_multilingual, num_languages=self.model.num_languages,
+                                            language=self.language, task=self.task)
+
+        options = {**self._decode_options, "language": self.language, "task": self.task, "fp16": self._fp16,
+                   "prompt": self._committed_tokens[-MAX_PROMPT_TOKENS:]}
+        result = transcription_handler._decode_with_fallback(
+            self.model, mel_segment, options, self._temperatures,
+            self._compression_ratio_threshold, self._logprob_threshold, self._no_speech_threshold)
+
+        if window_decoding.is_silent_window(result, self._logprob_threshold, self._no_speech_threshold):
+            segments, partial_text = [], ""
+        else:
+            segments, _ = window_decoding.split_window_segments(
+                torch.tensor(result.tokens), self._tokenizer, self._buffer_start, segment_size)
+            partial_text = self._tokenizer.decode([t for t in result.tokens if t < self._tokenizer.eot]).strip()
+
+        texts = [segment["text"].strip() for segment in segments]
+        unconfirmed_seconds = self._buffer.size / SAMPLE_RATE
+        if final:
+            finalize_count = len(segments)
+        elif unconfirmed_seconds > self.max_latency_seconds:
+            finalize_count = max(1, len(segments) - 1) if segments else 0
+        else:
+            finalize_count = 0
+            while (finalize_count < len(segments) - 1 and finalize_count < len(self._previous_texts)
+                   and texts[finalize_count] == self._previous_texts[finalize_count]):
+                finalize_count += 1
+
+        events = []
+        now = time.perf_counter()
+        for segment in segments[:finalize_count]:
+            segment = {"id": self._segment_id, "seek": int(segment["start"] * SAMPLE_RATE / HOP_LENGTH), **segment,
+                       "temperature": result.temperature, "avg_logprob": result.avg_logprob,
+                       "compression_ratio": result.compression_ratio, "no_speech_prob": result.no_speech_prob,
+                       "language": self.language}
+            self._segment_id += 1
+            self._committed_tokens.extend(segment["tokens"])
+            latency = now - self._arrival_time(min(segment["end"], self.stream_seconds))
+            self.latencies.append(latency)
+            events.append({**transcription_handler._segment_event(segment), "type": "final", "latency_seconds": latency})
+
+        if finalize_count:
+            self._trim_buffer(segments[finalize_count - 1]["end"])
+        elif not segments and unconfirmed_seconds > self.max_latency_seconds:
+            self._trim_buffer(self._buffer_start + unconfirmed_seconds - self.step_seconds)  # Silence: keep a word onset
+        self._previous_texts = texts[finalize_count:]
+
+        finalized_text = "".join(segment["text"] for segment in segments[:finalize_count]).strip()
+        if finalize_count and partial_text.startswith(finalized_text):
+            partial_text = partial_text[len(finalized_text):].strip()
+        if final:
+            partial_text = ""
+        if partial_text != self._partial_text or finalize_count:
+            self._partial_text = partial_text
+            events.append({"type": "partial", "text": partial_text, "start_seconds": self._buffer_start,
+                           "end_seconds": self.stream_seconds})
+        return self._emit(events)
+
+    def _trim_buffer(self, until_seconds: float):
+        drop = int(round((until_seconds - self._buffer_start) * SAMPLE_RATE))
+        drop = max(0, min(drop, self._buffer.size))
+        self._buffer = self._buffer[drop:]
+        self._buffer_start += drop / SAMPLE_RATE
+        fed_seconds, wall_times = self._feed_clock
+        stale = max(0, bisect.bisect_left(fed_seconds, self._buffer_start) - 1)
+        del fed_seconds[:stale], wall_times[:stale]
+
+def iter_stream_chunks(stream, chunk_seconds: float = None):
+    """Reads 16 kHz mono 16-bit little-endian PCM from a binary stream (pipe, stdin) in chunks."""
+    chunk_seconds = config.STREAM_CHUNK_SECONDS if chunk_seconds is None else chunk_seconds
+    chunk_bytes = max(2, int(chunk_seconds * SAMPLE_RATE) * 2)
+    pending = b""
+    while True:
+        data = stream.read(chunk_bytes)
+        if not data:
+            break
+        data = pending + data
+        usable = len(data) - len(data) % 2  # Never split a sample
+        pending = data[usable:]
+        if usable:
+            yield data[:usable]
+
+def iter_file_chunks(file_path: str, chunk_seconds: float = None, realtime: bool = True):
+    """Decodes a media file and yields it as float32 chunks, paced like a live source when `realtime`."""
+    chunk_seconds = config.STREAM_CHUNK_SECONDS if chunk_seconds is None else chunk_seconds
+    audio = load_audio(file_path)
+    chunk_samples = max(1, int(chunk_seconds * SAMPLE_RATE))
+    started = time.perf_counter()
+    for offset in range(0, audio.size, chunk_samples):
+        if realtime:
+            delay = started + offset / SAMPLE_RATE - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        yield audio[offset:offset + chunk_samples]
+
+def main():
+    parser = argparse.ArgumentParser(description="Live transcription of a 16 kHz PCM stream or a replayed media file.")
+    parser.add_argument("source", help='Media file to replay, or "-" for 16 kHz mono s16le PCM on stdin.')
+    parser.add_argument("--realtime", action="store_true", help="Replay the file at real-time pace.")
+    parser.add_argument("--model", default=config.DEFAULT_WHISPER_MODEL, help="Whisper model name.")
+    parser.add_argument("--device", default=config.WHISPER_DEVICE, help='"auto", "cuda" or "cpu".')
+    parser.add_argument("--precision", default=config.WHISPER_CPU_PRECISION, help="CPU precision (fp32 or int8).")
+    parser.add_argument("--language", default=None, help="Language code; detected from the first pass if omitted.")
+    parser.add_argument("--max-latency", type=float, default=config.STREAM_MAX_LATENCY_SECONDS,
+                        help="Unconfirmed audio (seconds) after which text is finalized regardless.")
+    args = parser.parse_args()
+
+    def print_event(event):
+        if event["type"] == "final":
+            print(f"{event['full_line']}  (latency {event['latency_seconds']:.2f}s)", flush=True)
+        elif event["text"]:
+            print(f"  ... {event['text']}", file=sys.stderr, flush=True)
+
+    chunks = iter_stream_chunks(sys.stdin.buffer) if args.source == "-" else iter_file_chunks(args.source, realtime=args.realtime)
+    with StreamingSession(language=args.language, model_name=args.model, device=args.device, precision=args.precision,
+                          max_latency_seconds=args.max_latency, event_callback=print_event) as session:
+        for chunk in chunks:
+            session.feed(chunk)
+        session.finish()
+        if session.latencies:
+            print(f"\nFinal segments: {len(session.latencies)} | Latency mean {np.mean(session.latencies):.2f}s, "
+                  f"max {max(session.latencies):.2f}s (target {session.max_latency_seconds:.1f}s + decode time)")
+
+if __name__ == "__main__":
+    main()
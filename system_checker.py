@@ -1,3 +1,4 @@
+import os
 import sys
 import platform
 import subprocess
@@ -33,6 +34,15 @@ def get_python_info():
         "operating_system": f"{platform.system()} {platform.release()} ({platform.machine()})"
     }
 
+def get_cpu_info():
+    """Gathers CPU core counts used to size CPU inference threads."""
+    info = {"logical_cores": os.cpu_count() or 1, "processor": platform.processor() or platform.machine()}
+    try:
+        info["usable_cores"] = len(os.sched_getaffinity(0))
+    except AttributeError: # Not available on Windows/macOS
+        info["usable_cores"] = info["logical_cores"]
+    return info
+
 def get_pytorch_info():
     """Gathers PyTorch and CUDA (via PyTorch) information."""
     info = {"installed": False, "error_message": None}
@@ -103,15 +113,20 @@ def check_ffprobe_availability():
     return info
 
 
-def get_system_summary():
-    """Consolidates all system checks into a single dictionary."""
+def get_system_summary(include_pytorch: bool = True):
+    """
+    Consolidates all system checks into a single dictionary. The PyTorch check imports torch, which
+    takes seconds; the loading screen runs it on its model-loading thread instead (include_pytorch=False).
+    """
     summary = {
         "python": get_python_info(),
-        "pytorch": get_pytorch_info(),
+        "cpu": get_cpu_info(),
         "nvidia_driver": get_nvidia_driver_info(),
         "ffprobe": check_ffprobe_availability()
         # Add other checks here if needed, e.g., nvcc for system-wide CUDA toolkit (developer info)
     }
+    if include_pytorch:
+        summary["pytorch"] = get_pytorch_info()
     return summary
 
 if __name__ == "__main__":
@@ -122,6 +137,10 @@ if __name__ == "__main__":
     print(f"  Python Version: {report['python']['python_version']}")
     print(f"  OS: {report['python']['operating_system']}")
 
+    print("\n[CPU]")
+    print(f"  Processor: {report['cpu']['processor']}")
+    print(f"  Logical Cores: {report['cpu']['logical_cores']} (usable: {report['cpu']['usable_cores']})")
+
     print("\n[PyTorch & CUDA]")
     if report['pytorch']['error_message']:
         print(f"  Error: {report['pytorch']['error_message']}")
@@ -160,7 +179,7 @@ if __name__ == "__main__":
         can_run_gpu = True
         print("Primary Check: PyTorch with CUDA is available. GPU mode enabled.")
     else:
-        print("Primary Check: PyTorch with CUDA NOT available. Application cannot use GPU.")
+        print("Primary Check: PyTorch with CUDA NOT available. Application will run on the CPU.")
         if not report['pytorch']['installed']:
             print("  Reason: PyTorch not installed.")
         elif not report['pytorch']['cuda_available']:
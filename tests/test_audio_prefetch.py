@@ -0,0 +1,114 @@
+# tests/test_audio_prefetch.py
+import threading
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import audio_prefetch
+from audio_prefetch import BYTES_PER_SECOND_PCM, AudioPrefetcher
+
+MB = 1024 * 1024
+
+@pytest.fixture
+def decoder(monkeypatch):
+    """load_audio stand-in: each file decodes to `seconds[path]` of silence once `release(path)` is called."""
+    class Decoder:
+        def __init__(self):
+            self.seconds = {}
+            self.started = []
+            self.gates = {}
+            self.lock = threading.Lock()
+
+        def load_audio(self, path, sr):
+            with self.lock:
+                self.started.append(path)
+                gate = self.gates.setdefault(path, threading.Event())
+            gate.wait(5)
+            return np.zeros(int(self.seconds[path] * sr), dtype=np.float32)
+
+        def release(self, path):
+            with self.lock:
+                self.gates.setdefault(path, threading.Event()).set()
+
+    decoder = Decoder()
+    monkeypatch.setattr(audio_prefetch, "load_audio", decoder.load_audio)
+    monkeypatch.setattr(audio_prefetch, "media_duration", lambda path: None)
+    return decoder
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+def make_files(tmp_path, sizes):
+    paths = []
+    for index, size in enumerate(sizes):
+        path = tmp_path / f"{index}.mp3"
+        path.write_bytes(bytes(size))
+        paths.append(str(path))
+    return paths
+
+def test_unknown_durations_are_budgeted_from_the_file_size(tmp_path, decoder):
+    small, large = make_files(tmp_path, [1000, 3 * MB])
+    prefetcher = AudioPrefetcher([small, large], lookahead=0, max_buffer_mb=1024, decode_threads=1)
+    try:
+        assert prefetcher._estimated_bytes(small) == (int(30 * BYTES_PER_SECOND_PCM), False)
+        assert prefetcher._estimated_bytes(large) == (3 * MB * 16, False)
+        prefetcher.file_durations[small] = 2.0
+        assert prefetcher._estimated_bytes(small) == (2 * BYTES_PER_SECOND_PCM, True)
+    finally:
+        for path in (small, large):
+            decoder.release(path)
+        prefetcher.close()
+
+def test_only_one_file_of_unknown_duration_is_decoded_ahead(tmp_path, decoder):
+    paths = make_files(tmp_path, [1000] * 4)
+    for path in paths:
+        decoder.seconds[path] = 10.0
+    prefetcher = AudioPrefetcher(paths, lookahead=3, max_buffer_mb=1024, decode_threads=4)
+    try:
+        assert wait_for(lambda: decoder.started)
+        time.sleep(0.05)  # Time for any wrongly submitted decode to start too
+        assert decoder.started == [paths[0]]
+        assert prefetcher.buffered_bytes() == int(30 * BYTES_PER_SECOND_PCM)
+        decoder.release(paths[0])
+        assert prefetcher.get(0).size == 10 * 16000
+        assert wait_for(lambda: decoder.started[:2] == paths[:2])
+    finally:
+        for path in paths:
+            decoder.release(path)
+        prefetcher.close()
+
+def test_known_durations_fill_the_lookahead_within_the_cap(tmp_path, decoder):
+    paths = make_files(tmp_path, [1000] * 4)
+    durations = {path: 60.0 for path in paths}
+    cap_mb = 3 * 60 * BYTES_PER_SECOND_PCM / MB  # Room for three files
+    prefetcher = AudioPrefetcher(paths, file_durations=durations, lookahead=3, max_buffer_mb=cap_mb, decode_threads=4)
+    try:
+        assert wait_for(lambda: len(decoder.started) >= 3)
+        time.sleep(0.05)
+        assert sorted(decoder.started) == paths[:3]
+        assert prefetcher.buffered_bytes() <= prefetcher.max_buffer_bytes
+    finally:
+        for path in paths:
+            decoder.release(path)
+        prefetcher.close()
+
+def test_oversized_decode_is_kept_only_for_the_file_being_consumed(tmp_path, decoder):
+    first, second = make_files(tmp_path, [1000, 1000])
+    decoder.seconds = {first: 60.0, second: 60.0}  # Each decodes to twice the cap
+    cap_mb = 30 * BYTES_PER_SECOND_PCM / MB
+    durations = {first: 1.0, second: 1.0}  # Wrong, as ffprobe estimates can be
+    prefetcher = AudioPrefetcher([first, second], file_durations=durations, lookahead=1, max_buffer_mb=cap_mb,
+                                 decode_threads=2)
+    try:
+        decoder.release(second)
+        assert prefetcher._futures[1].result() is None  # Decoded ahead but too large to hold: left to the caller
+        decoder.release(first)
+        assert prefetcher.get(0).size == 60 * 16000  # Needed now: handed over instead of decoded twice
+        assert prefetcher.get(1) is None
+    finally:
+        prefetcher.close()
@@ -0,0 +1,89 @@
+# tests/test_batch_manifest.py
+import json
+
+import pytest
+
+import app_config as config
+from batch_manifest import BatchManifest
+
+SETTINGS = {"model": "base", "format": "docx"}
+
+def segment(index, start, end, text):
+    return {"id": index, "start": start, "end": end, "text": text, "language": "en"}
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for name in ("a.wav", "b.wav", "c.wav"):
+        path = tmp_path / name
+        path.write_bytes(b"")
+        paths.append(str(path))
+    return paths
+
+def test_journal_round_trip(files, tmp_path):
+    manifest = BatchManifest(files, SETTINGS, manifest_dir=str(tmp_path / "m"))
+    committed = [segment(0, 0.0, 2.0, " Hello"), segment(1, 2.0, 4.5, " world")]
+    for item in committed:
+        manifest.commit_segment(1, item)
+    manifest.close()
+
+    reopened = BatchManifest(files, SETTINGS, manifest_dir=str(tmp_path / "m"))
+    assert reopened.committed_segments(1) == committed
+    assert reopened.committed_segments(0) == []
+    assert reopened.has_progress()
+
+def test_torn_last_line_is_ignored(files, tmp_path):
+    manifest = BatchManifest(files, SETTINGS, manifest_dir=str(tmp_path / "m"))
+    manifest.commit_segment(0, segment(0, 0.0, 2.0, " Kept"))
+    manifest.close()
+    with open(manifest._journal_path(0), "a", encoding="utf-8") as f:
+        f.write(json.dumps(segment(1, 2.0, 3.0, " Torn"))[:20])  # The process died mid-write
+
+    reopened = BatchManifest(files, SETTINGS, manifest_dir=str(tmp_path / "m"))
+    assert [s["text"] for s in reopened.committed_segments(0)] == [" Kept"]
+
+def test_finished_files_survive_a_restart(files, tmp_path):
+    manifest = BatchManifest(files, SETTINGS, manifest_dir=str(tmp_path / "m"), keep_segments=True)
+    manifest.commit_segment(0, segment(0, 0.0, 1.0, " Hi"))
+    manifest.mark_done(0, {"text": "Hi", "segments": [segment(0, 0.0, 1.0, " Hi")], "language": "en"}, "out/a.docx")
+    manifest.close()
+
+    reopened = BatchManifest(files, SETTINGS, manifest_dir=str(tmp_path / "m"), keep_segments=True)
+    assert reopened.is_done(0) and not reopened.is_done(1)
+    assert reopened.done_count() == 1
+    assert reopened.committed_segments(0) == []  # The journal goes once the file is done
+    result = reopened.result(0)
+    assert result["text"] == "Hi" and result["from_manifest"] and len(result["segments"]) == 1
+
+def test_other_batches_and_settings_start_fresh(files, tmp_path):
+    manifest = BatchManifest(files, SETTINGS, manifest_dir=str(tmp_path / "m"))
+    manifest.mark_done(0, {"text": "x"})
+    assert not BatchManifest(files, {**SETTINGS, "model": "small"}, manifest_dir=str(tmp_path / "m")).has_progress()
+    assert not BatchManifest(files[:2], SETTINGS, manifest_dir=str(tmp_path / "m")).has_progress()
+    manifest.delete()
+    assert not BatchManifest(files, SETTINGS, manifest_dir=str(tmp_path / "m")).has_progress()
+
+def test_run_batch_resumes_only_unfinished_files(files, tmp_path, monkeypatch):
+    pytest.importorskip("whisper")
+    import batch_engine
+    import transcription_handler
+
+    manifest = BatchManifest(files, SETTINGS, manifest_dir=str(tmp_path / "m"))
+    manifest.mark_done(0, {"text": "first"})
+    manifest.commit_segment(2, segment(0, 0.0, 3.0, " Partial"))
+    calls = []
+
+    def fake_transcribe(file_path, progress_callback=None, resume_segments=None, **options):
+        calls.append((file_path, resume_segments))
+        new_segment = segment(len(resume_segments or []), 3.0, 5.0, " new")
+        progress_callback({"type": "segment", "segment": new_segment})
+        return {"text": "done", "segments": list(resume_segments or []) + [new_segment], "language": "en"}
+
+    monkeypatch.setattr(config, "TRANSCRIPTION_DAEMON_ENABLED", False)
+    monkeypatch.setattr(transcription_handler, "transcribe_media", fake_transcribe)
+    results = list(batch_engine.run_batch(files, manifest=manifest, worker_count=1, device="cpu"))
+
+    assert [index for index, _, _ in results] == [0, 1, 2]
+    assert results[0][2]["from_manifest"]
+    assert calls == [(files[1], None), (files[2], [segment(0, 0.0, 3.0, " Partial")])]
+    assert [s["text"] for s in manifest.committed_segments(2)] == [" Partial", " new"]
@@ -0,0 +1,82 @@
+# tests/test_chunked_transcription.py
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from chunked_transcription import SAMPLE_RATE, ChunkStitcher, _is_boundary_duplicate, plan_chunks
+
+def segment(start, end, text):
+    return {"start": start, "end": end, "text": text}
+
+def speech_with_pauses(seconds, pauses):
+    """Loud noise with silent 0.3 s gaps starting at `pauses` (seconds)."""
+    audio = 0.3 * np.random.default_rng(0).standard_normal(int(seconds * SAMPLE_RATE)).astype(np.float32)
+    for pause in pauses:
+        audio[int(pause * SAMPLE_RATE):int((pause + 0.3) * SAMPLE_RATE)] = 0.0
+    return audio
+
+def test_plan_chunks_cuts_at_the_quietest_point_near_each_target():
+    audio = speech_with_pauses(100, pauses=[27.0, 58.0, 92.0])
+    chunks = plan_chunks(audio, target_seconds=30, overlap_seconds=1.0, search_seconds=5)
+    cuts = [chunk["own_start"] for chunk in chunks[1:]]
+    assert len(chunks) == 3
+    assert 27.0 <= cuts[0] <= 27.3 and 58.0 <= cuts[1] <= 58.3
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert previous["own_end"] == chunk["own_start"]  # The owned ranges tile the timeline
+        assert chunk["start"] == int(chunk["own_start"] * SAMPLE_RATE) - SAMPLE_RATE  # 1 s of overlap before
+        assert previous["end"] == int(chunk["own_start"] * SAMPLE_RATE) + SAMPLE_RATE  # and after each cut
+    assert chunks[0]["start"] == 0 and chunks[0]["own_start"] == 0.0
+    assert chunks[-1]["end"] == len(audio) and chunks[-1]["own_end"] == float("inf")
+
+def test_plan_chunks_keeps_short_audio_whole():
+    audio = speech_with_pauses(40, pauses=[])
+    assert plan_chunks(audio, target_seconds=30, overlap_seconds=1.0, search_seconds=5) == [
+        {"start": 0, "end": len(audio), "own_start": 0.0, "own_end": float("inf")}]
+
+@pytest.mark.parametrize("current, previous, duplicate", [
+    (segment(29.5, 31.0, " and then we left"), segment(27.0, 30.5, "So, and then we left."), True),
+    (segment(30.5, 32.0, " and then we left"), segment(27.0, 30.5, "And then we left."), False),  # No overlap
+    (segment(29.5, 31.0, " something new"), segment(27.0, 30.5, "And then we left."), False),
+    (segment(29.5, 31.0, " ..."), segment(27.0, 30.5, "And then we left."), False),  # Nothing but punctuation
+    (segment(0.0, 1.0, " hello"), None, False),
+])
+def test_is_boundary_duplicate(current, previous, duplicate):
+    assert _is_boundary_duplicate(current, previous) is duplicate
+
+CHUNKS = [{"start": 0, "end": 0, "own_start": 0.0, "own_end": 30.0},
+          {"start": 0, "end": 0, "own_start": 30.0, "own_end": 60.0},
+          {"start": 0, "end": 0, "own_start": 60.0, "own_end": float("inf")}]
+
+def test_stitcher_keeps_each_segment_in_the_chunk_owning_its_midpoint():
+    stitcher = ChunkStitcher(CHUNKS)
+    ready = []
+    ready += stitcher.add(0, segment(0.0, 10.0, " one"))
+    ready += stitcher.add(0, segment(28.0, 31.0, " two"))  # Midpoint 29.5: chunk 0's
+    ready += stitcher.add(0, segment(30.5, 33.0, " three"))  # Decoded in chunk 0's overlap, owned by chunk 1
+    ready += stitcher.finish(0)
+    ready += stitcher.add(1, segment(29.0, 30.5, " two"))  # Midpoint 29.75: chunk 0's
+    ready += stitcher.add(1, segment(30.5, 33.0, " three"))
+    ready += stitcher.finish(1)
+    ready += stitcher.add(2, segment(60.0, 61.0, " four"))
+    ready += stitcher.finish(2)
+    assert [s["text"] for s in ready] == [" one", " two", " three", " four"]
+    assert [s["id"] for s in ready] == [0, 1, 2, 3]
+    assert stitcher.done
+
+def test_stitcher_drops_a_repeat_straddling_the_cut():
+    stitcher = ChunkStitcher(CHUNKS[:2] + [{**CHUNKS[2], "own_end": 90.0}])
+    ready = stitcher.add(0, segment(25.0, 30.4, " We went home and then we left."))
+    ready += stitcher.finish(0)
+    ready += stitcher.add(1, segment(29.8, 31.0, " and then we left"))  # Midpoint 30.4: owned, but a repeat
+    ready += stitcher.add(1, segment(31.0, 33.0, " Next."))
+    assert [s["text"] for s in ready] == [" We went home and then we left.", " Next."]
+
+def test_stitcher_holds_later_chunks_until_earlier_ones_finish():
+    stitcher = ChunkStitcher(CHUNKS)
+    assert stitcher.add(2, segment(61.0, 62.0, " late")) == []
+    assert stitcher.add(1, segment(31.0, 32.0, " middle")) == []
+    assert stitcher.finish(1) == []
+    assert [s["text"] for s in stitcher.add(0, segment(1.0, 2.0, " early"))] == [" early"]  # Head chunk: at once
+    assert [s["text"] for s in stitcher.finish(0)] == [" middle", " late"]
+    assert not stitcher.done
+    assert stitcher.finish(2) == [] and stitcher.done
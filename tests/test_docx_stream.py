@@ -0,0 +1,57 @@
+# tests/test_docx_stream.py
+import pytest
+
+docx = pytest.importorskip("docx")
+
+import docx_stream
+import file_export_handler
+
+LINES = ["Plain line.", "", "  Leading and trailing spaces  ", "Tabs\tbetween\t\tcolumns\t", "\tLeading tab",
+         "Markup <w:p> & \"quotes\" 'apostrophes' > done", "Ünïcödé — 日本語 — emoji 🎙", "x" * 5000, "   "]
+
+def paragraphs(path):
+    document = docx.Document(path)
+    return [(p.text, p.style.name, [run.text for run in p.runs]) for p in document.paragraphs], document
+
+def test_streamed_document_matches_python_docx(tmp_path, monkeypatch):
+    monkeypatch.setattr(docx_stream, "FLUSH_PARAGRAPHS", 7)  # Several flushes, one of them partial
+    streamed_path, reference_path = str(tmp_path / "streamed.docx"), str(tmp_path / "reference.docx")
+    docx_stream.write_docx(iter(LINES * 50), streamed_path)
+    reference = docx.Document()
+    for line in LINES * 50:
+        reference.add_paragraph(line)
+    reference.save(reference_path)
+
+    streamed, streamed_document = paragraphs(streamed_path)
+    expected, reference_document = paragraphs(reference_path)
+    assert len(streamed) == len(LINES) * 50
+    assert streamed == expected
+    streamed_section, reference_section = streamed_document.sections[0], reference_document.sections[0]
+    assert (streamed_section.page_width, streamed_section.page_height, streamed_section.left_margin) == \
+        (reference_section.page_width, reference_section.page_height, reference_section.left_margin)
+    assert [style.name for style in streamed_document.styles] == [style.name for style in reference_document.styles]
+
+def test_characters_xml_cannot_hold_are_dropped(tmp_path):
+    path = str(tmp_path / "out.docx")
+    docx_stream.write_docx(["bell\x07 and form\x0cfeed"], path)
+    assert paragraphs(path)[0] == [("bell and formfeed", "Normal", ["bell and formfeed"])]
+
+def test_save_text_to_word_blanks_whitespace_only_lines(tmp_path, monkeypatch):
+    results = []
+    for streaming in (True, False):
+        monkeypatch.setattr(file_export_handler.config, "STREAMING_DOCX_EXPORT", streaming)
+        path = str(tmp_path / f"{streaming}.docx")
+        assert file_export_handler.save_text_to_word("First\r\n   \nSecond\tcolumn\n", path)
+        results.append(paragraphs(path)[0])
+    assert results[0] == results[1]
+    assert [text for text, _, _ in results[0]] == ["First", "", "Second\tcolumn"]
+
+def test_failed_write_leaves_no_file(tmp_path):
+    def lines():
+        yield "one"
+        raise RuntimeError("transcript source failed")
+
+    path = tmp_path / "out.docx"
+    with pytest.raises(RuntimeError):
+        docx_stream.write_docx(lines(), str(path))
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,118 @@
+# tests/test_model_registry.py
+import threading
+import time
+
+from model_registry import ModelRegistry
+
+MB = 1024 * 1024
+
+class FakeModel:
+    def __init__(self, key):
+        self.key = key
+
+def make_registry(ram_budget_mb=0, idle_timeout_seconds=0, sizes=None):
+    loads = []
+
+    def loader(*key):
+        loads.append(key)
+        return FakeModel(key)
+
+    sizes = sizes or {}
+    registry = ModelRegistry(loader, ram_budget_mb=ram_budget_mb, idle_timeout_seconds=idle_timeout_seconds,
+                             size_estimator=lambda model: sizes.get(model.key, 100 * MB))
+    return registry, loads
+
+A, B, C = ("tiny", "cpu", "fp32"), ("base", "cpu", "fp32"), ("small", "cpu", "fp32")
+
+def test_models_are_loaded_once_and_shared():
+    registry, loads = make_registry()
+    with registry.use(A) as first, registry.use(A) as second:
+        assert first is second
+    assert loads == [A]
+
+def test_least_recently_used_model_is_evicted_first():
+    registry, _ = make_registry(ram_budget_mb=250)
+    for key in (A, B):
+        with registry.use(key):
+            pass
+    with registry.use(A):  # A becomes the most recently used
+        pass
+    with registry.use(C):
+        pass
+    assert registry.loaded_keys() == [A, C]
+
+def test_models_in_use_are_never_evicted():
+    registry, _ = make_registry(ram_budget_mb=150)
+    model_a = registry.acquire(A)
+    with registry.use(B):
+        assert registry.is_loaded(A) and registry.is_loaded(B)  # Over budget, but both are referenced
+    assert registry.loaded_keys() == [A]
+    assert not registry.unload(A)
+    registry.release(A)
+    assert model_a is not None and registry.unload(A)
+    assert registry.loaded_keys() == []
+
+def test_unload_idle_only_removes_models_idle_past_the_timeout():
+    registry, _ = make_registry(idle_timeout_seconds=60)
+    with registry.use(A):
+        pass
+    held = registry.acquire(B)
+    now = time.monotonic()
+    assert registry.unload_idle(now + 30) == []
+    assert registry.unload_idle(now + 61) == [A]
+    assert registry.loaded_keys() == [B] and held is not None
+    registry.release(B)
+
+def test_preloaded_model_waits_for_its_first_use():
+    registry, loads = make_registry(idle_timeout_seconds=60)
+    registry.preload(A)
+    assert registry.unload_idle(time.monotonic() + 3600) == []
+    with registry.use(A):
+        pass
+    assert loads == [A]
+    assert registry.unload_idle(time.monotonic() + 61) == [A]
+
+def test_exclusive_serialises_inference_on_one_key():
+    registry, _ = make_registry()
+    active, peak = [0], [0]
+    counter_lock = threading.Lock()
+
+    def run():
+        with registry.exclusive(A):
+            with counter_lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.01)
+            with counter_lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=run) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 1
+
+def test_concurrent_loads_start_one_janitor(monkeypatch):
+    registry, _ = make_registry(idle_timeout_seconds=600)
+    barrier = threading.Barrier(8)
+
+    def load(index):
+        barrier.wait()
+        registry.preload(("model", "cpu", str(index)))
+
+    threads = [threading.Thread(target=load, args=(index,)) for index in range(8)]
+    started = []
+
+    class CountingThread(threading.Thread):
+        def start(self):
+            started.append(self)
+            super().start()
+
+    monkeypatch.setattr(threading, "Thread", CountingThread)  # Only the registry creates threads from here on
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    registry._janitor_stop.set()
+    assert len(started) == 1
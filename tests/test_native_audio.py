@@ -0,0 +1,110 @@
+# tests/test_native_audio.py
+import struct
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import native_audio
+
+def write_wav(path, samples, sample_rate, bits, is_float=False, extensible=False, streamed=False, extra_chunk=False):
+    """Writes `samples` (frames x channels, floats in [-1, 1]) with the given sample format."""
+    samples = np.asarray(samples, dtype=np.float64)
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    channels = samples.shape[1]
+    if is_float:
+        data = samples.astype(f"<f{bits // 8}").tobytes()
+    elif bits == 8:
+        data = np.clip(np.round(samples * 128 + 128), 0, 255).astype("u1").tobytes()
+    elif bits == 24:
+        ints = np.clip(np.round(samples * 8388608), -8388608, 8388607).astype("<i4")
+        data = ints.view("u1").reshape(-1, 4)[:, :3].tobytes()
+    else:
+        scale = float(1 << (bits - 1))
+        ints = np.clip(np.round(samples * scale), -scale, scale - 1).astype({16: "<i2", 32: "<i4"}[bits])
+        data = ints.tobytes()
+    format_tag = 3 if is_float else 1
+    block_align = channels * bits // 8
+    fmt = struct.pack("<HHIIHH", 0xFFFE if extensible else format_tag, channels, sample_rate,
+                      sample_rate * block_align, block_align, bits)
+    if extensible:
+        fmt += struct.pack("<HHI", 22, bits, 0) + struct.pack("<H", format_tag) + bytes(14)
+    chunks = b"fmt " + struct.pack("<I", len(fmt)) + fmt
+    if extra_chunk:
+        chunks += b"LIST" + struct.pack("<I", 5) + b"abcde" + b"\0"  # Odd size, padded
+    chunks += b"data" + struct.pack("<I", 0 if streamed else len(data)) + data
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks)
+
+def ramp(frames=1000):
+    return np.linspace(-0.9, 0.9, frames)
+
+@pytest.mark.parametrize("bits, is_float, tolerance", [
+    (8, False, 1 / 128), (16, False, 1 / 32768), (24, False, 1 / 8388608),
+    (32, False, 1e-7), (32, True, 1e-7), (64, True, 1e-7),  # Limited by the float32 output
+])
+def test_sample_formats_are_read_and_scaled(tmp_path, bits, is_float, tolerance):
+    path = str(tmp_path / "a.wav")
+    write_wav(path, ramp(), 16000, bits, is_float)
+    info = native_audio.read_wav_header(path)
+    assert info == native_audio.WavInfo(16000, 1, bits, is_float, 44, 1000)
+    audio = native_audio.read_audio(path)
+    assert audio.dtype == np.float32 and audio.shape == (1000,)
+    assert np.max(np.abs(audio - ramp())) <= tolerance * 1.01
+
+def test_extensible_header_odd_chunks_and_stereo_mixdown(tmp_path):
+    path = str(tmp_path / "a.wav")
+    stereo = np.stack([ramp(), -0.5 * ramp()], axis=1)
+    write_wav(path, stereo, 16000, 24, extensible=True, extra_chunk=True)
+    info = native_audio.read_wav_header(path)
+    assert (info.channels, info.bits, info.is_float, info.frames) == (2, 24, False, 1000)
+    assert np.allclose(native_audio.read_audio(path), stereo.mean(axis=1), atol=1e-6)
+
+def test_streamed_wav_runs_to_the_end_of_the_file(tmp_path):
+    path = str(tmp_path / "a.wav")
+    write_wav(path, ramp(480), 48000, 16, streamed=True)
+    assert native_audio.read_wav_header(path).frames == 480
+    assert native_audio.media_duration(path) == pytest.approx(0.01)
+
+def test_unsupported_files_are_left_to_ffmpeg(tmp_path):
+    path = tmp_path / "a.wav"
+    path.write_bytes(b"RIFF\0\0\0\0WAVEjunk")
+    assert native_audio.read_wav_header(str(path)) is None
+    assert native_audio.read_audio(str(path)) is None
+    assert native_audio.read_flac_streaminfo(str(path)) is None
+
+def flac_bytes(sample_rate, channels, bits, total_samples, id3=False):
+    packed = (sample_rate << 44) | ((channels - 1) << 41) | ((bits - 1) << 36) | total_samples
+    streaminfo = struct.pack(">HH", 4096, 4096) + bytes(6) + packed.to_bytes(8, "big") + bytes(16)
+    body = b"fLaC" + bytes([0x80, 0, 0, 34]) + streaminfo  # Last-metadata-block flag, type 0 (STREAMINFO)
+    if id3:
+        tag = bytes(20)
+        body = b"ID3\x04\x00\x00" + bytes([0, 0, 0, len(tag)]) + tag + body
+    return body
+
+@pytest.mark.parametrize("id3", [False, True])
+def test_flac_streaminfo(tmp_path, id3):
+    path = tmp_path / "a.flac"
+    path.write_bytes(flac_bytes(44100, 2, 24, 44100 * 90, id3=id3))
+    assert native_audio.read_flac_streaminfo(str(path)) == native_audio.FlacInfo(44100, 2, 24, 44100 * 90)
+    assert native_audio.media_duration(str(path)) == pytest.approx(90.0)
+    assert native_audio.read_audio(str(path)) is None  # Decoding FLAC is left to ffmpeg
+
+@pytest.mark.parametrize("source_rate", [8000, 22050, 44100, 48000])
+def test_resampled_sine_matches_the_exact_signal(tmp_path, source_rate):
+    frequency, seconds = 440.0, 2.0
+    path = str(tmp_path / "a.wav")
+    write_wav(path, 0.5 * np.sin(2 * np.pi * frequency * np.arange(int(source_rate * seconds)) / source_rate),
+              source_rate, 32, is_float=True)
+    audio = native_audio.read_audio(path)
+    expected = 0.5 * np.sin(2 * np.pi * frequency * np.arange(audio.size) / native_audio.SAMPLE_RATE)
+    assert audio.size == int(native_audio.SAMPLE_RATE * seconds)
+    interior = slice(200, -200)  # Away from the zero padding at either end
+    assert np.max(np.abs(audio[interior] - expected[interior])) < 2e-3
+
+def test_resampling_removes_content_above_the_new_nyquist(tmp_path):
+    path = str(tmp_path / "a.wav")
+    write_wav(path, 0.5 * np.sin(2 * np.pi * 11000 * np.arange(48000) / 48000), 48000, 32, is_float=True)
+    audio = native_audio.read_audio(path)
+    assert np.sqrt(np.mean(audio[200:-200] ** 2)) < 0.5 / np.sqrt(2) * 0.01  # At least 40 dB down
@@ -0,0 +1,59 @@
+# tests/test_pdf_export.py
+import random
+
+import pytest
+
+pytest.importorskip("fpdf")
+
+import app_config as config
+import file_export_handler
+from benchmarks.pdf_export import synthetic_transcript
+
+def new_pdf():
+    pdf = file_export_handler.PDF()
+    pdf.add_page()
+    pdf.set_font(pdf.font_family_name, size=11)
+    return pdf
+
+def test_wrap_line_breaks_where_multi_cell_does():
+    pdf = new_pdf()
+    width = pdf.w - pdf.r_margin - pdf.x
+    char_widths = {}
+    text = synthetic_transcript(600, random.Random(0)).split("\n")
+    lines = text + [" ".join(text[i:i + 4]) for i in range(0, len(text), 4)]
+    for line in lines:
+        expected = pdf.multi_cell(0, 5, line, dry_run=True, output="LINES")
+        assert pdf.wrap_line(line, width - 2 * pdf.c_margin, char_widths) == expected
+
+@pytest.mark.parametrize("line", ["", " leading", "two  spaces", "tab\there", "x" * 400])
+def test_wrap_line_leaves_unusual_lines_to_multi_cell(line):
+    pdf = new_pdf()
+    assert pdf.wrap_line(line, 100, {}) is None
+
+def test_measured_wrap_keeps_the_layout(monkeypatch):
+    text = "\n".join(synthetic_transcript(1800, random.Random(1)).split("\n") + ["", "x" * 400, "two  spaces " * 20])
+    layouts = []
+    for measured in (False, True):
+        monkeypatch.setattr(config, "PDF_MEASURED_LINE_WRAP", measured)
+        pdf = file_export_handler.PDF()
+        pdf.add_page()
+        pdf.chapter_body(text)
+        layouts.append((pdf.page, pdf.y))
+    assert layouts[0] == layouts[1]
+
+def pdfs_from_cache(count):
+    file_export_handler.clear_font_cache()
+    return [file_export_handler.PDF().fonts_from_cache for _ in range(count)]
+
+def test_font_cache_reuses_parsed_fonts(monkeypatch):
+    monkeypatch.setattr(config, "PDF_FONT_CACHE_ENABLED", True)
+    monkeypatch.setattr(file_export_handler, "_FONT_CACHE_DISABLED", False)
+    assert pdfs_from_cache(3)[0] == 0
+    assert min(pdfs_from_cache(3)[1:]) > 0
+
+def test_font_cache_is_off_for_untested_fpdf_versions(monkeypatch):
+    monkeypatch.setattr(config, "PDF_FONT_CACHE_ENABLED", True)
+    monkeypatch.setattr(file_export_handler, "_FONT_CACHE_DISABLED", False)
+    monkeypatch.setattr(file_export_handler, "_FONT_CACHE_FPDF_VERSIONS", ())
+    monkeypatch.setattr(file_export_handler, "_PDF_CLASS", None)
+    assert pdfs_from_cache(3) == [0, 0, 0]
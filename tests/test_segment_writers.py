@@ -0,0 +1,80 @@
+# tests/test_segment_writers.py
+import json
+
+import pytest
+
+import segment_writers
+from segment_writers import OrderedBatchWriter, SrtWriter, WebVttWriter, JsonlWriter
+
+def segment(start, end, text):
+    return {"start": start, "end": end, "text": text, "language": "en"}
+
+def read(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+@pytest.mark.parametrize("seconds, srt", [
+    (0, "00:00:00,000"), (1.2345, "00:00:01,234"), (1.2346, "00:00:01,235"), (59.9996, "00:01:00,000"),
+    (3725.5, "01:02:05,500"), (-0.3, "00:00:00,000"), (36000, "10:00:00,000"),
+])
+def test_timestamp_formatting(seconds, srt):
+    assert segment_writers.format_srt_timestamp(seconds) == srt
+    assert segment_writers.format_vtt_timestamp(seconds) == srt.replace(",", ".")
+
+def test_srt_records(tmp_path):
+    with SrtWriter(str(tmp_path / "out")) as writer:
+        writer.write(segment(0.0, 1.5, " Hello there "))
+        writer.write(segment(1.5, 3.0, " a --> b"))
+    assert writer.output_path.endswith("out.srt")
+    assert read(writer.output_path) == ("1\n00:00:00,000 --> 00:00:01,500\nHello there\n\n"
+                                        "2\n00:00:01,500 --> 00:00:03,000\na -> b\n\n")
+
+def test_vtt_records_with_time_offset(tmp_path):
+    with WebVttWriter(str(tmp_path / "out.vtt")) as writer:
+        writer.write(segment(0.0, 2.0, " One"), time_offset=3600.0)
+    assert read(writer.output_path) == "WEBVTT\n\n01:00:00.000 --> 01:00:02.000\nOne\n\n"
+
+def test_jsonl_records_name_their_source(tmp_path):
+    with JsonlWriter(str(tmp_path / "out.jsonl")) as writer:
+        writer.write(segment(1.23456, 2.0, " Hi"), time_offset=10.0, source="a.wav")
+    record = json.loads(read(writer.output_path))
+    assert record == {"id": 0, "start": 11.235, "end": 12.0, "text": "Hi", "language": "en",
+                      "avg_logprob": None, "no_speech_prob": None, "file": "a.wav"}
+
+def test_only_complete_records_reach_the_file(tmp_path):
+    writer = WebVttWriter(str(tmp_path / "out.vtt"), flush_seconds=3600)
+    assert read(writer.output_path) == "WEBVTT\n\n"  # Header written at once
+    writer.write(segment(0.0, 1.0, " Pending"))
+    assert read(writer.output_path) == "WEBVTT\n\n"  # Held until the next flush
+    writer.flush()
+    assert read(writer.output_path).endswith("Pending\n\n")
+    writer.write(segment(1.0, 2.0, " Closing"))
+    writer.close()
+    assert read(writer.output_path).endswith("Closing\n\n")
+
+def test_ordered_batch_writer_keeps_input_order_and_shifts_times(tmp_path):
+    writer = SrtWriter(str(tmp_path / "combined.srt"))
+    batch = OrderedBatchWriter(writer, ["dir/a.wav", "dir/b.wav", "dir/c.wav"], time_offsets=[0.0, 10.0, 25.0])
+    batch.write(2, segment(0.0, 1.0, " c1"))  # Later files report first
+    batch.write(1, segment(0.0, 1.0, " b1"))
+    batch.write(0, segment(0.0, 2.0, " a1"))
+    batch.finish_file(2)
+    batch.write(0, segment(2.0, 4.0, " a2"))
+    batch.write(1, segment(1.0, 3.0, " b2"))
+    batch.finish_file(0)
+    batch.write(1, segment(3.0, 4.0, " b3"))
+    batch.finish_file(1)
+    batch.close()
+
+    blocks = read(writer.output_path).strip().split("\n\n")
+    assert [block.split("\n")[2] for block in blocks] == ["a1", "a2", "b1", "b2", "b3", "c1"]
+    assert [block.split("\n")[0] for block in blocks] == ["1", "2", "3", "4", "5", "6"]
+    assert blocks[2].split("\n")[1] == "00:00:10,000 --> 00:00:11,000"
+    assert blocks[5].split("\n")[1] == "00:00:25,000 --> 00:00:26,000"
+
+def test_ordered_batch_writer_keeps_segments_of_unfinished_files(tmp_path):
+    writer = JsonlWriter(str(tmp_path / "combined.jsonl"))
+    batch = OrderedBatchWriter(writer, ["a.wav", "b.wav"])
+    batch.write(1, segment(0.0, 1.0, " b1"))  # a.wav fails without finishing
+    batch.close()
+    assert [json.loads(line)["file"] for line in read(writer.output_path).splitlines()] == ["b.wav"]
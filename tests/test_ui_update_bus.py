@@ -0,0 +1,77 @@
+# tests/test_ui_update_bus.py
+import threading
+
+from ui_update_bus import UiUpdateBus
+
+class FakeWidget:
+    """Stands in for a Tk widget: after() callbacks run when the test calls frame()."""
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, delay_ms, callback):
+        self.scheduled.append((delay_ms, callback))
+
+    def frame(self):
+        scheduled, self.scheduled = self.scheduled, []
+        for _, callback in scheduled:
+            callback()
+
+def test_posts_coalesce_to_the_latest_value_per_frame():
+    widget, applied = FakeWidget(), []
+    bus = UiUpdateBus(widget, interval_ms=50)
+    progress = lambda value: applied.append(("progress", value))
+    detail = lambda text: applied.append(("detail", text))
+    for value in range(100):
+        bus.post(progress, value)
+    bus.post(detail, "first")
+    bus.post(detail, "second")
+    assert applied == []  # Nothing touches the widgets outside a frame
+    widget.frame()
+    assert applied == [("progress", 99), ("detail", "second")]
+    widget.frame()
+    assert len(applied) == 2  # An idle frame applies nothing
+    assert widget.scheduled[0][0] == 50
+
+def test_calls_all_run_in_order_after_the_posted_values():
+    widget, applied = FakeWidget(), []
+    bus = UiUpdateBus(widget, interval_ms=50)
+    bus.call(applied.append, "done 1")
+    bus.post(applied.append, "progress")
+    bus.call(applied.append, "done 2")
+    widget.frame()
+    assert applied == ["progress", "done 1", "done 2"]
+
+def test_posts_from_many_threads_apply_once_per_callback():
+    widget, applied = FakeWidget(), []
+    bus = UiUpdateBus(widget, interval_ms=50)
+    callback = applied.append
+
+    def worker(offset):
+        for value in range(1000):
+            bus.post(callback, offset + value)
+
+    threads = [threading.Thread(target=worker, args=(index * 1000,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    widget.frame()
+    assert len(applied) == 1 and applied[0] % 1000 == 999
+
+def test_a_failing_update_does_not_drop_the_rest_of_the_frame():
+    widget, applied = FakeWidget(), []
+    bus = UiUpdateBus(widget, interval_ms=50)
+    bus.post(lambda: 1 / 0)
+    bus.post(applied.append, "still applied")
+    widget.frame()
+    assert applied == ["still applied"]
+    assert widget.scheduled  # The bus keeps running
+
+def test_closed_bus_drops_updates_and_stops_rescheduling():
+    widget, applied = FakeWidget(), []
+    bus = UiUpdateBus(widget, interval_ms=50)
+    bus.post(applied.append, "queued")
+    bus.close()
+    bus.post(applied.append, "late")
+    widget.frame()
+    assert applied == [] and widget.scheduled == [] and bus.closed
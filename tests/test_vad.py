@@ -0,0 +1,41 @@
+# tests/test_vad.py
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import vad
+from benchmarks import synthetic_audio
+
+SECONDS = 20
+
+def speech_share(audio):
+    return sum(end - start for start, end in vad.detect_speech_regions(audio)) / len(audio)
+
+def test_continuous_tonal_audio_is_kept():
+    assert speech_share(synthetic_audio.generate("tones", SECONDS)) > 0.99
+
+def test_continuous_speech_over_a_bass_bed_is_kept():
+    speech = synthetic_audio.generate("speech", SECONDS)
+    t = np.arange(len(speech)) / vad.SAMPLE_RATE
+    bed = 0.3 * (np.sin(2 * np.pi * 65 * t) + np.sin(2 * np.pi * 98 * t) + np.sin(2 * np.pi * 130 * t))
+    assert speech_share(np.clip(speech + bed, -1, 1).astype(np.float32)) > 0.99
+
+def test_continuous_noisy_and_compressed_speech_is_kept():
+    speech = synthetic_audio.generate("speech", SECONDS)
+    noise = 0.05 * np.random.default_rng(0).standard_normal(len(speech))
+    assert speech_share(np.clip(speech + noise, -1, 1).astype(np.float32)) > 0.99
+    assert speech_share((np.tanh(8 * speech) / np.tanh(8)).astype(np.float32)) > 0.99
+
+def test_pauses_are_still_removed():
+    audio = synthetic_audio.generate("speech", SECONDS, silence_ratio=0.5)
+    assert 0.5 < speech_share(audio) < 0.75
+    assert vad.detect_speech_regions(np.zeros(vad.SAMPLE_RATE * 5, dtype=np.float32)) == []
+
+def test_speech_timeline_maps_back_to_the_original_times():
+    audio = np.zeros(vad.SAMPLE_RATE * 10, dtype=np.float32)
+    regions = [(vad.SAMPLE_RATE * 1, vad.SAMPLE_RATE * 3), (vad.SAMPLE_RATE * 6, vad.SAMPLE_RATE * 7)]
+    speech_audio, timeline = vad.build_speech_audio(audio, regions, gap_ms=500)
+    assert len(speech_audio) == vad.SAMPLE_RATE * 3.5
+    assert timeline.to_original(0.5) == pytest.approx(1.5)
+    assert timeline.to_original(2.7) == pytest.approx(6.2)
+    assert timeline.remap_segment({"start": 1.0, "end": 3.0, "text": "x"}) == {"start": 2.0, "end": 6.5, "text": "x"}
@@ -0,0 +1,49 @@
+# tests/test_window_decoding.py
+import pytest
+
+import window_decoding
+
+class FakeTokenizer:
+    """Text tokens are 0-99 (token n decodes to 'wn '), 100 is the end of text and timestamps start at 200."""
+    eot = 100
+    timestamp_begin = 200
+
+    def decode(self, tokens):
+        return "".join(f"w{token} " for token in tokens if token < self.eot)
+
+def ts(seconds):
+    return FakeTokenizer.timestamp_begin + round(seconds / window_decoding.TIME_PRECISION)
+
+WINDOW = window_decoding.N_FRAMES
+
+def test_complete_segments_advance_by_the_whole_window():
+    tokens = [ts(0), 1, 2, ts(2), ts(2), 3, ts(4)]
+    segments, seek_advance = window_decoding.split_window_segments(tokens, FakeTokenizer(), 10.0, WINDOW)
+    assert [(s["start"], s["end"], s["text"]) for s in segments] == [
+        (10.0, 12.0, "w1 w2 "), (12.0, 14.0, "w3 ")]
+    assert seek_advance == WINDOW
+
+def test_tail_without_closing_timestamp_is_left_for_the_next_seek_by_default():
+    tokens = [ts(0), 1, ts(2), ts(2), 3, 4]
+    segments, seek_advance = window_decoding.split_window_segments(tokens, FakeTokenizer(), 0.0, WINDOW)
+    assert [s["text"] for s in segments] == ["w1 "]
+    assert seek_advance == round(2 / window_decoding.TIME_PRECISION) * window_decoding.INPUT_STRIDE
+
+def test_keep_tail_emits_the_trailing_tokens_up_to_the_window_end():
+    tokens = [ts(0), 1, ts(2), ts(2), 3, 4]
+    segments, seek_advance = window_decoding.split_window_segments(tokens, FakeTokenizer(), 30.0, WINDOW, keep_tail=True)
+    assert [(s["start"], s["end"], s["text"]) for s in segments] == [
+        (30.0, 32.0, "w1 "), (32.0, pytest.approx(60.0), "w3 w4 ")]
+    assert segments[-1]["tokens"] == [ts(2), 3, 4]
+    assert seek_advance == WINDOW
+
+def test_keep_tail_ignores_a_lone_opening_timestamp():
+    tokens = [ts(0), 1, ts(2), ts(2)]
+    segments, seek_advance = window_decoding.split_window_segments(tokens, FakeTokenizer(), 0.0, WINDOW, keep_tail=True)
+    assert [s["text"] for s in segments] == ["w1 "]
+    assert seek_advance == WINDOW
+
+def test_window_without_consecutive_timestamps_is_one_segment():
+    segments, seek_advance = window_decoding.split_window_segments([ts(0), 1, 2, ts(3.5)], FakeTokenizer(), 0.0, WINDOW)
+    assert [(s["start"], s["end"]) for s in segments] == [(0.0, pytest.approx(3.5))]
+    assert seek_advance == WINDOW
@@ -0,0 +1,125 @@
+# transcription_cache.py
+import os
+import json
+import hashlib
+import threading
+
+import app_config as config
+
+CACHE_FORMAT_VERSION = 1
+FULL_HASH_MAX_BYTES = 8 * 1024 * 1024 # Files up to this size are hashed completely
+SAMPLE_BLOCK_BYTES = 1024 * 1024 # Larger files are fingerprinted from sampled blocks
+SAMPLE_BLOCK_COUNT = 8
+
+def fingerprint_media(file_path: str) -> str:
+    """
+    Content fingerprint of a media file. Small files are hashed in full; large (multi-GB) files are
+    hashed from their size plus evenly spaced 1 MB blocks, which reads a few MB instead of the whole file.
+    """
+    size = os.path.getsize(file_path)
+    digest = hashlib.sha256()
+    digest.update(str(size).encode("ascii"))
+    with open(file_path, "rb") as f:
+        if size <= FULL_HASH_MAX_BYTES:
+            for block in iter(lambda: f.read(SAMPLE_BLOCK_BYTES), b""):
+                digest.update(block)
+        else:
+            last_offset = size - SAMPLE_BLOCK_BYTES
+            for i in range(SAMPLE_BLOCK_COUNT):
+                f.seek(last_offset * i // (SAMPLE_BLOCK_COUNT - 1))
+                digest.update(f.read(SAMPLE_BLOCK_BYTES))
+    return digest.hexdigest()
+
+def make_cache_key(media_fingerprint: str, model_name: str, precision: str, task: str,
+                   language: str = None, decode_options: dict = None) -> str:
+    key_material = {
+        "version": CACHE_FORMAT_VERSION,
+        "media": media_fingerprint,
+        "model": model_name,
+        "precision": precision,
+        "task": task,
+        "language": language,
+        "decode_options": decode_options or {},
+    }
+    return hashlib.sha256(json.dumps(key_material, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+class TranscriptionCache:
+    """
+    Persistent on-disk cache of transcription results (text, full segment list, language).
+    Entries are JSON files named after their key; the least recently used entries are evicted
+    once the directory grows beyond `max_size_mb`.
+    """
+    def __init__(self, cache_dir: str = None, max_size_mb: float = None):
+        self.cache_dir = cache_dir or config.TRANSCRIPTION_CACHE_DIR
+        max_size_mb = config.TRANSCRIPTION_CACHE_MAX_MB if max_size_mb is None else max_size_mb
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str):
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            os.utime(entry_path) # Mark as recently used for eviction
+        except FileNotFoundError:
+            result = None
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"TranscriptionCache - Warning: Discarding unreadable entry {key[:12]}: {e}")
+            self._remove(entry_path)
+            result = None
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def put(self, key: str, result: dict):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entry_path = self._entry_path(key)
+            temp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f, ensure_ascii=False)
+            os.replace(temp_path, entry_path) # Atomic, so readers never see a partial entry
+        except OSError as e:
+            print(f"TranscriptionCache - Warning: Could not store entry {key[:12]}: {e}")
+            return
+        self.evict()
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in its size budget."""
+        if self.max_size_bytes <= 0:
+            return
+        try:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_file() and entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+TRANSCRIPTION_CACHE = TranscriptionCache()
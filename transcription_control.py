@@ -0,0 +1,41 @@
+# transcription_control.py
+import time
+
+class TranscriptionCancelled(Exception):
+    """Raised at a checkpoint once cancellation was requested."""
+
+class TranscriptionControl:
+    """
+    Cooperative cancel/pause for a running transcription. The decode loops call checkpoint() before
+    every 30-second window, so a cancel takes effect within one window and a pause holds the model and
+    decoder state where they are until resumed.
+
+    Both events may be threading or multiprocessing events; a set `pause_event` means paused.
+    """
+    def __init__(self, cancel_event=None, pause_event=None, poll_seconds: float = 0.1):
+        self.cancel_event = cancel_event
+        self.pause_event = pause_event
+        self.poll_seconds = poll_seconds
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event is not None and self.cancel_event.is_set()
+
+    @property
+    def paused(self) -> bool:
+        return self.pause_event is not None and self.pause_event.is_set()
+
+    def checkpoint(self):
+        """Blocks while paused; raises TranscriptionCancelled if cancellation was requested."""
+        while self.paused and not self.cancelled:
+            if self.cancel_event is not None:
+                self.cancel_event.wait(self.poll_seconds)
+            else:
+                time.sleep(self.poll_seconds)
+        if self.cancelled:
+            raise TranscriptionCancelled()
+
+def checkpoint(control):
+    """checkpoint() for an optional control."""
+    if control is not None:
+        control.checkpoint()
@@ -0,0 +1,318 @@
+# transcription_daemon.py
+"""
+Long-lived local transcription service that keeps models loaded between jobs.
+
+Usage (from the repository root):
+    python -m transcription_daemon --model base --port 8765
+
+The service listens on localhost only. Endpoints (JSON bodies and responses):
+    GET    /health                  status, loaded models and queue length
+    POST   /jobs                    {"file_path", "priority", "language", "task", "model_name", ...} -> {"job_id"}
+    GET    /jobs/<id>               job state, and the result once finished
+    GET    /jobs/<id>/events?from=N the job's progress events as JSON lines, streamed until the job ends
+    POST   /jobs/<id>/pause         pauses a running job at its next decoded window (POST .../resume continues it)
+    DELETE /jobs/<id>               cancels a job; a running job stops at its next decoded window
+Jobs with a higher priority run first; equal priorities run in submission order.
+"""
+import argparse
+import itertools
+import json
+import queue
+import threading
+import time
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import app_config as config
+from transcription_control import TranscriptionControl
+
+JOB_OPTIONS = ("language", "task", "model_name", "device", "precision", "use_cache", "use_vad", "resume_segments")
+FINISHED_STATES = ("done", "failed", "cancelled")
+
+class Job:
+    def __init__(self, file_path: str, priority: int, options: dict):
+        self.job_id = uuid.uuid4().hex
+        self.file_path = file_path
+        self.priority = priority
+        self.options = options
+        self.state = "queued"
+        self.result = None
+        self.events = []
+        self.finished_at = None
+        self.changed = threading.Condition()
+        self.control = TranscriptionControl(threading.Event(), threading.Event())
+
+    def add_event(self, event: dict):
+        with self.changed:
+            self.events.append(event)
+            self.changed.notify_all()
+
+    def finish(self, state: str, result=None):
+        with self.changed:
+            self.state = state
+            self.result = result
+            self.finished_at = time.monotonic()
+            self.events.append({"type": "job_finished", "state": state, "result": result})
+            self.changed.notify_all()
+
+    def summary(self) -> dict:
+        with self.changed:
+            return {"job_id": self.job_id, "file_path": self.file_path, "priority": self.priority,
+                    "state": self.state, "paused": self.control.paused, "result": self.result}
+
+class TranscriptionDaemon:
+    """
+    Owns the job queue and the worker threads. Workers call transcription_handler.transcribe_media,
+    so models stay in MODEL_REGISTRY between jobs and only the first job for a model pays its load time.
+    A model runs one job at a time (MODEL_REGISTRY.exclusive); extra workers let jobs for other models,
+    or long recordings transcribed as chunks in worker processes, run alongside it.
+    """
+    def __init__(self, worker_threads: int = None, retention_seconds: float = None):
+        import transcription_handler # Deferred so importing this module (e.g. for the client) stays cheap
+        self._transcription_handler = transcription_handler
+        transcription_handler.MODEL_REGISTRY.idle_timeout_seconds = 0  # Keeping models warm is the point of the daemon
+        self.worker_threads = worker_threads or config.DAEMON_WORKER_THREADS
+        self.retention_seconds = config.DAEMON_JOB_RETENTION_SECONDS if retention_seconds is None else retention_seconds
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._workers = []
+
+    def start(self, preload_models=()):
+        for model_name in preload_models:
+            self._transcription_handler.initialize_whisper_model(model_name, status_callback=print)
+        for index in range(max(1, self.worker_threads)):
+            worker = threading.Thread(target=self._worker_loop, name=f"daemon-worker-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self):
+        self._stop.set()
+        for _ in self._workers:
+            self._queue.put((float("inf"), next(self._sequence), None))
+
+    def submit(self, file_path: str, priority: int = 0, **options) -> Job:
+        job = Job(file_path, int(priority), {k: v for k, v in options.items() if k in JOB_OPTIONS})
+        with self._lock:
+            self._prune_finished()
+            self._jobs[job.job_id] = job
+        self._queue.put((-job.priority, next(self._sequence), job.job_id))
+        return job
+
+    def get(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None:
+            return False
+        with job.changed:
+            if job.state == "queued":
+                job.finish("cancelled")
+                return True
+            if job.state != "running":
+                return False
+            job.control.cancel_event.set()  # The worker finishes the job as cancelled
+        return True
+
+    def set_paused(self, job_id: str, paused: bool) -> bool:
+        job = self.get(job_id)
+        if job is None or job.state in FINISHED_STATES:
+            return False
+        job.control.pause_event.set() if paused else job.control.pause_event.clear()
+        return True
+
+    def status(self) -> dict:
+        with self._lock:
+            queued = sum(1 for job in self._jobs.values() if job.state == "queued")
+            running = sum(1 for job in self._jobs.values() if job.state == "running")
+        return {"status": "ok", "queued": queued, "running": running,
+                "loaded_models": [list(key) for key in self._transcription_handler.MODEL_REGISTRY.loaded_keys()]}
+
+    def _prune_finished(self):
+        # Caller holds self._lock. Finished jobs are kept for a while so clients can still fetch them.
+        now = time.monotonic()
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished_at is not None and now - job.finished_at > self.retention_seconds]:
+            del self._jobs[job_id]
+
+    def _worker_loop(self):
+        while not self._stop.is_set():
+            _, _, job_id = self._queue.get()
+            job = self.get(job_id) if job_id else None
+            if job is None:
+                continue
+            with job.changed:
+                if job.state != "queued":
+                    continue  # Cancelled while waiting
+                job.state = "running"
+            try:
+                result = self._transcription_handler.transcribe_media(job.file_path, progress_callback=job.add_event,
+                                                                      control=job.control, **job.options)
+                if job.control.cancelled:
+                    job.finish("cancelled")
+                else:
+                    job.finish("done" if result is not None else "failed", result)
+            except Exception as e:
+                job.add_event({"type": "status", "message": f"Error during transcription: {e}", "is_error": True})
+                job.finish("failed")
+
+class _DaemonRequestHandler(BaseHTTPRequestHandler):
+    daemon_service = None  # Set on the subclass created by serve()
+
+    def log_message(self, format, *args):
+        pass  # Progress is reported through the job events, not the access log
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _job_from_path(self, parts):
+        job = self.daemon_service.get(parts[1]) if len(parts) >= 2 else None
+        if job is None:
+            self._send_json(404, {"error": "Unknown job."})
+        return job
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if parts == ["health"]:
+            self._send_json(200, self.daemon_service.status())
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self._job_from_path(parts)
+            if job:
+                self._send_json(200, job.summary())
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "events":
+            job = self._job_from_path(parts)
+            if job:
+                start = int(parse_qs(url.query).get("from", ["0"])[0])
+                self._stream_events(job, start)
+        else:
+            self._send_json(404, {"error": "Not found."})
+
+    def _stream_events(self, job, position):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            while True:
+                with job.changed:
+                    while position >= len(job.events) and job.state not in FINISHED_STATES:
+                        job.changed.wait(timeout=15.0)
+                    pending = job.events[position:]
+                    finished = job.state in FINISHED_STATES
+                position += len(pending)
+                for event in pending:
+                    self.wfile.write((json.dumps(event) + "\n").encode("utf-8"))
+                self.wfile.flush()
+                if finished and position >= len(job.events):
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            return  # The client went away; the job keeps running
+
+    def do_POST(self):
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        if len(parts) == 3 and parts[0] == "jobs" and parts[2] in ("pause", "resume"):
+            job = self._job_from_path(parts)
+            if job:
+                self._send_json(200, {"paused" if parts[2] == "pause" else "resumed":
+                                      self.daemon_service.set_paused(job.job_id, parts[2] == "pause")})
+            return
+        if parts != ["jobs"]:
+            self._send_json(404, {"error": "Not found."})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            file_path = payload.pop("file_path")
+        except (ValueError, KeyError):
+            self._send_json(400, {"error": "Expected a JSON body with 'file_path'."})
+            return
+        job = self.daemon_service.submit(file_path, payload.pop("priority", 0), **payload)
+        self._send_json(201, {"job_id": job.job_id})
+
+    def do_DELETE(self):
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        job = self._job_from_path(parts) if len(parts) == 2 and parts[0] == "jobs" else None
+        if job:
+            self._send_json(200, {"cancelled": self.daemon_service.cancel(job.job_id)})
+        elif not (len(parts) == 2 and parts[0] == "jobs"):
+            self._send_json(404, {"error": "Not found."})
+
+def serve(host: str = None, port: int = None, worker_threads: int = None, preload_models=()):
+    service = TranscriptionDaemon(worker_threads=worker_threads)
+    service.start(preload_models=preload_models)
+    handler = type("DaemonRequestHandler", (_DaemonRequestHandler,), {"daemon_service": service})
+    server = ThreadingHTTPServer((host or config.DAEMON_HOST, port or config.DAEMON_PORT), handler)
+    server.daemon_threads = True
+    print(f"TranscriptionDaemon: Listening on http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+
+class DaemonClient:
+    """Submits jobs to a running daemon and follows their progress. Used by batch_engine and scripts."""
+    def __init__(self, host: str = None, port: int = None, timeout: float = 5.0):
+        self.base_url = f"http://{host or config.DAEMON_HOST}:{port or config.DAEMON_PORT}"
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, payload=None):
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read() or b"null")
+
+    def is_available(self) -> bool:
+        try:
+            return self._request("GET", "/health").get("status") == "ok"
+        except (OSError, ValueError):
+            return False
+
+    def submit(self, file_path: str, priority: int = 0, **options) -> str:
+        return self._request("POST", "/jobs", {"file_path": file_path, "priority": priority, **options})["job_id"]
+
+    def job(self, job_id: str) -> dict:
+        return self._request("GET", f"/jobs/{job_id}")
+
+    def cancel(self, job_id: str) -> bool:
+        return self._request("DELETE", f"/jobs/{job_id}").get("cancelled", False)
+
+    def pause(self, job_id: str) -> bool:
+        return self._request("POST", f"/jobs/{job_id}/pause").get("paused", False)
+
+    def resume(self, job_id: str) -> bool:
+        return self._request("POST", f"/jobs/{job_id}/resume").get("resumed", False)
+
+    def events(self, job_id: str, start: int = 0):
+        """Yields the job's progress events as they happen, ending with its 'job_finished' event."""
+        request = urllib.request.Request(f"{self.base_url}/jobs/{job_id}/events?from={start}")
+        with urllib.request.urlopen(request, timeout=None) as response:
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the local transcription daemon.")
+    parser.add_argument("--host", default=config.DAEMON_HOST, help="Interface to bind (keep it local).")
+    parser.add_argument("--port", type=int, default=config.DAEMON_PORT)
+    parser.add_argument("--workers", type=int, default=config.DAEMON_WORKER_THREADS, help="Jobs transcribed at once (jobs for the same model take turns).")
+    parser.add_argument("--model", action="append", default=None,
+                        help="Model to load at startup (repeatable). Defaults to DEFAULT_WHISPER_MODEL.")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, preload_models=args.model or [config.DEFAULT_WHISPER_MODEL])
+
+if __name__ == "__main__":
+    main()
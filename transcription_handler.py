@@ -3,47 +3,143 @@ import app_config as config
 import torch
 import os
 import sys
-import io
-import threading
-import re
-import time
-import unicodedata
-
-WHISPER_MODEL = None
-MODEL_LOADED_SUCCESSFULLY = False
-DEVICE_USED = None
-
-def initialize_whisper_model(model_name: str = None, status_callback=None):
-    global WHISPER_MODEL, MODEL_LOADED_SUCCESSFULLY, DEVICE_USED
-    if MODEL_LOADED_SUCCESSFULLY and WHISPER_MODEL is not None and DEVICE_USED == "cuda":
-        if status_callback:
-            status_callback(f"Whisper model '{model_name or config.DEFAULT_WHISPER_MODEL}' already loaded on CUDA.")
-        return True
+import gc
+import functools
+from contextlib import nullcontext
+import model_weights
+from native_audio import load_audio, read_audio
+from transcription_metrics import collects_metrics, stage
+from model_registry import ModelRegistry
+from transcription_control import TranscriptionCancelled, checkpoint
+from window_decoding import DEFAULT_TEMPERATURES, needs_fallback, is_silent_window, split_window_segments
+import vad
+from transcription_cache import TRANSCRIPTION_CACHE, fingerprint_media, make_cache_key
+from whisper.audio import SAMPLE_RATE, N_FRAMES, N_SAMPLES, HOP_LENGTH, log_mel_spectrogram, pad_or_trim
+from whisper.decoding import DecodingOptions
+from whisper.tokenizer import LANGUAGES, get_tokenizer
+from whisper.utils import format_timestamp
+
+SUPPORTED_CPU_PRECISIONS = ("fp32", "int8")
+
+def select_device(preferred_device: str = None):
+    """
+    Resolves the device to run Whisper on.
+    "auto" picks CUDA when PyTorch can see a GPU and falls back to the CPU otherwise.
+    Returns None if CUDA was explicitly requested but is not available.
+    """
+    preferred = (preferred_device or config.WHISPER_DEVICE or "auto").lower()
+    if preferred == "cpu":
+        return "cpu"
+    if preferred == "cuda":
+        return "cuda" if torch.cuda.is_available() else None
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+def resolve_precision(device: str, precision: str = None) -> str:
+    """CUDA always runs in fp16. On the CPU the choice is fp32 or int8 (dynamic quantization)."""
+    if device == "cuda":
+        return "fp16"
+    selected = (precision or config.WHISPER_CPU_PRECISION or "fp32").lower()
+    if selected not in SUPPORTED_CPU_PRECISIONS:
+        print(f"Warning: Unsupported CPU precision '{selected}'. Falling back to fp32.")
+        return "fp32"
+    return selected
+
+def configure_cpu_threads(intra_op_threads: int = None, inter_op_threads: int = None):
+    """
+    Applies explicit PyTorch thread counts for CPU inference. 0/None keeps the PyTorch default.
+    The inter-op pool can only be sized once per process, so a late call is reported and ignored.
+    """
+    intra = config.WHISPER_CPU_THREADS if intra_op_threads is None else intra_op_threads
+    inter = config.WHISPER_CPU_INTEROP_THREADS if inter_op_threads is None else inter_op_threads
+    if intra and intra > 0:
+        torch.set_num_threads(int(intra))
+    if inter and inter > 0:
+        try:
+            torch.set_num_interop_threads(int(inter))
+        except RuntimeError as e:
+            print(f"Warning: Could not set inter-op threads to {inter}: {e}")
+    return torch.get_num_threads(), torch.get_num_interop_threads()
+
+def _replace_whisper_linears(module):
+    # Whisper uses its own nn.Linear subclass, which the dynamic quantizer does not recognise.
+    for child_name, child in module.named_children():
+        if isinstance(child, whisper.model.Linear):
+            plain_linear = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+            plain_linear.weight = child.weight
+            if child.bias is not None:
+                plain_linear.bias = child.bias
+            setattr(module, child_name, plain_linear)
+        else:
+            _replace_whisper_linears(child)
+
+def quantize_model_int8(model):
+    """Dynamically quantizes all Linear layers of a CPU Whisper model to int8 weights."""
+    _replace_whisper_linears(model)
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def load_model_for_device(model_name: str, device: str, precision: str):
+    model = model_weights.load_whisper_model(model_name, device)
+    if device == "cpu" and precision == "int8":
+        model = quantize_model_int8(model)
+    model.eval()
+    return model
+
+def _release_model_memory():
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+MODEL_REGISTRY = ModelRegistry(
+    loader=load_model_for_device,
+    ram_budget_mb=config.MODEL_CACHE_RAM_BUDGET_MB,
+    idle_timeout_seconds=config.MODEL_IDLE_TIMEOUT_SECONDS,
+    after_unload=_release_model_memory,
+)
+
+def resolve_model_key(model_name: str = None, device: str = None, precision: str = None):
+    """Returns the registry key (model name, device, precision), or None if the requested device is unavailable."""
+    selected_device = select_device(device)
+    if selected_device is None:
+        return None
+    return (model_name or config.DEFAULT_WHISPER_MODEL, selected_device, resolve_precision(selected_device, precision))
+
+def initialize_whisper_model(model_name: str = None, status_callback=None, device: str = None,
+                             precision: str = None, cpu_threads: int = None, cpu_interop_threads: int = None):
     selected_model = model_name if model_name else config.DEFAULT_WHISPER_MODEL
-    if status_callback:
-        status_callback(f"Initializing Whisper model: {selected_model} for CUDA...")
-    if not torch.cuda.is_available():
-        error_msg = "Error: CUDA is not available on this system. GPU acceleration is required."
+    model_key = resolve_model_key(selected_model, device, precision)
+    if model_key is None:
+        error_msg = "Error: CUDA was requested but is not available on this system."
         if status_callback:
             status_callback(error_msg)
             status_callback("Ensure you have an NVIDIA GPU, latest drivers, and compatible CUDA Toolkit.")
-            status_callback("Verify your PyTorch installation includes CUDA support.")
+            status_callback("Verify your PyTorch installation includes CUDA support, or set the device to 'auto' or 'cpu'.")
         print(error_msg)
-        MODEL_LOADED_SUCCESSFULLY = False
-        DEVICE_USED = "cpu_check_failed_cuda"
         return False
-    DEVICE_USED = "cuda"
+    _, selected_device, selected_precision = model_key
+    device_label = f"{selected_device.upper()} ({selected_precision})"
+
+    if MODEL_REGISTRY.is_loaded(model_key):
+        if status_callback:
+            status_callback(f"Whisper model '{selected_model}' already loaded on {device_label}.")
+        return True
     if status_callback:
-        status_callback(f"Attempting to load model on device: {DEVICE_USED.upper()}")
+        status_callback(f"Initializing Whisper model: {selected_model} for {device_label}...")
+
+    if selected_device == "cpu":
+        intra_threads, inter_threads = configure_cpu_threads(cpu_threads, cpu_interop_threads)
+        if status_callback:
+            status_callback(f"CPU inference using {intra_threads} intra-op / {inter_threads} inter-op threads.")
+
+    if status_callback:
+        status_callback(f"Attempting to load model on device: {device_label}")
     try:
-        WHISPER_MODEL = whisper.load_model(selected_model, device=DEVICE_USED)
-        MODEL_LOADED_SUCCESSFULLY = True
+        MODEL_REGISTRY.preload(model_key)
         if status_callback:
-            status_callback(f"Whisper model '{selected_model}' loaded successfully on {DEVICE_USED.upper()}.")
-        print(f"Whisper model '{selected_model}' loaded successfully on {DEVICE_USED.upper()}.")
+            status_callback(f"Whisper model '{selected_model}' loaded successfully on {device_label}.")
+        print(f"Whisper model '{selected_model}' loaded successfully on {device_label}.")
         return True
     except Exception as e:
-        error_msg = f"Error loading Whisper model '{selected_model}' on CUDA: {e}"
+        error_msg = f"Error loading Whisper model '{selected_model}' on {device_label}: {e}"
         if "CUDA out of memory" in str(e):
             error_msg += "\nTry a smaller model or free up GPU memory."
         elif isinstance(e, FileNotFoundError):
@@ -51,138 +147,307 @@ def initialize_whisper_model(model_name: str = None, status_callback=None):
         if status_callback:
             status_callback(error_msg)
         print(error_msg)
-        MODEL_LOADED_SUCCESSFULLY = False
         return False
 
-def time_str_to_seconds(time_str: str) -> float:
-    parts = time_str.split(':')
+def _decode_with_fallback(model, mel_segment, decode_options, temperatures,
+                          compression_ratio_threshold, logprob_threshold, no_speech_threshold):
+    # Same temperature fallback rules as whisper.transcribe. `mel_segment` may also be the window's
+    # encoded audio features, which spares every retry another encoder pass.
+    decode_result = None
+    for temperature in temperatures:
+        kwargs = {**decode_options}
+        if temperature > 0:
+            kwargs.pop("beam_size", None)
+            kwargs.pop("patience", None)
+        else:
+            kwargs.pop("best_of", None)
+        decode_result = model.decode(mel_segment, DecodingOptions(**kwargs, temperature=temperature))
+        if not needs_fallback(decode_result, compression_ratio_threshold, logprob_threshold, no_speech_threshold):
+            break
+    return decode_result
+
+def iter_segments(audio, language: str = None, task: str = "transcribe", status_callback=None, model=None,
+                  model_name: str = None, device: str = None, precision: str = None, temperature=DEFAULT_TEMPERATURES, compression_ratio_threshold: float = 2.4,
+                  logprob_threshold: float = -1.0, no_speech_threshold: float = 0.6,
+                  condition_on_previous_text: bool = True, initial_prompt: str = None, control=None,
+                  **decode_options):
+    """
+    Transcribes `audio` (a media file path or a 16 kHz float32 array) and yields each segment
+    as soon as its 30-second window has been decoded.
+
+    Every segment is a dict with the same fields as whisper's result segments:
+    id, seek, start, end, text, tokens, temperature, avg_logprob, compression_ratio, no_speech_prob,
+    plus the detected/forced language.
+
+    Unless an explicit `model` is given, the model is taken from MODEL_REGISTRY and held
+    (never evicted) until the generator is exhausted or closed.
+
+    An optional TranscriptionControl is checked before every window: a pause blocks right there with
+    the decoder state intact, a cancel raises TranscriptionCancelled.
+    """
+    if model is None:
+        model_key = resolve_model_key(model_name, device, precision)
+        if model_key is None:
+            raise RuntimeError("The requested device is not available.")
+        with MODEL_REGISTRY.use(model_key) as registry_model:
+            yield from iter_segments(audio, language=language, task=task, status_callback=status_callback,
+                                     model=registry_model, temperature=temperature,
+                                     compression_ratio_threshold=compression_ratio_threshold,
+                                     logprob_threshold=logprob_threshold, no_speech_threshold=no_speech_threshold,
+                                     condition_on_previous_text=condition_on_previous_text,
+                                     initial_prompt=initial_prompt, control=control, **decode_options)
+        return
+
+    fp16 = decode_options.pop("fp16", True) and model.device.type != "cpu"
+    dtype = torch.float16 if fp16 else torch.float32
+    if isinstance(audio, str):
+        with stage("decode"):
+            audio = load_audio(audio)
+    with stage("mel"):
+        mel = log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES)
+    content_frames = mel.shape[-1] - N_FRAMES
+
+    if language is None:
+        if not model.is_multilingual:
+            language = "en"
+        else:
+            if status_callback:
+                status_callback("Detecting language using up to the first 30 seconds...")
+            _, probs = model.detect_language(pad_or_trim(mel, N_FRAMES).to(model.device).to(dtype))
+            language = max(probs, key=probs.get)
+            if status_callback:
+                status_callback(f"Detected language: {LANGUAGES[language].title()}")
+
+    tokenizer = get_tokenizer(model.is_multilingual, num_languages=model.num_languages, language=language, task=task)
+    decode_options = {**decode_options, "language": language, "task": task, "fp16": fp16}
+    temperatures = (temperature,) if isinstance(temperature, (int, float)) else tuple(temperature)
+
+    all_tokens = []
+    prompt_reset_since = 0
+    if initial_prompt:
+        all_tokens.extend(tokenizer.encode(" " + initial_prompt.strip()))
+    segment_id = 0
+    seek = 0
+
+    while seek < content_frames:
+        checkpoint(control)
+        time_offset = float(seek * HOP_LENGTH / SAMPLE_RATE)
+        segment_size = min(N_FRAMES, content_frames - seek)
+        mel_segment = pad_or_trim(mel[:, seek:seek + segment_size], N_FRAMES).to(model.device).to(dtype)
+
+        decode_options["prompt"] = all_tokens[prompt_reset_since:]
+        with stage("encoder"):
+            audio_features = model.embed_audio(mel_segment.unsqueeze(0))[0]
+        with stage("decoder"):
+            result = _decode_with_fallback(model, audio_features, decode_options, temperatures,
+                                           compression_ratio_threshold, logprob_threshold, no_speech_threshold)
+        tokens = torch.tensor(result.tokens)
+
+        if is_silent_window(result, logprob_threshold, no_speech_threshold):
+            seek += segment_size
+            continue
+
+        window_segments, seek_advance = split_window_segments(tokens, tokenizer, time_offset, segment_size)
+        for segment in window_segments:
+            all_tokens.extend(segment["tokens"])
+            yield {"id": segment_id, "seek": seek, **segment, "temperature": result.temperature,
+                   "avg_logprob": result.avg_logprob, "compression_ratio": result.compression_ratio,
+                   "no_speech_prob": result.no_speech_prob, "language": language}
+            segment_id += 1
+        seek += seek_advance
+
+        if not condition_on_previous_text or result.temperature > 0.5:
+            prompt_reset_since = len(all_tokens)  # Don't condition on text that may be garbage
+
+def detect_language(audio, model_name: str = None, device: str = None, precision: str = None) -> str:
+    """Detects the spoken language from the first 30 seconds of 16 kHz audio."""
+    model_key = resolve_model_key(model_name, device, precision)
+    if model_key is None:
+        raise RuntimeError("The requested device is not available.")
+    with MODEL_REGISTRY.use(model_key) as model, MODEL_REGISTRY.exclusive(model_key):
+        if not model.is_multilingual:
+            return "en"
+        mel = log_mel_spectrogram(pad_or_trim(audio), model.dims.n_mels).to(model.device)
+        if model.device.type != "cpu":
+            mel = mel.half()
+        _, probs = model.detect_language(mel)
+        return max(probs, key=probs.get)
+
+def format_segment_line(segment: dict) -> str:
+    """Formats a segment the way whisper's verbose console output does."""
+    return f"[{format_timestamp(segment['start'])} --> {format_timestamp(segment['end'])}] {segment['text'].strip()}"
+
+def _segment_event(segment: dict) -> dict:
+    return {'type': 'segment', 'start_seconds': segment["start"], 'end_seconds': segment["end"],
+            'text_segment': segment["text"].strip(), 'full_line': format_segment_line(segment),
+            'segment': segment}
+
+def _lookup_cached_result(file_path, model_key, task, language, decode_options):
     try:
-        if len(parts) == 3:
-            h, m, s_ms = parts
-            s, ms = s_ms.split('.')
-            return int(h) * 3600 + int(m) * 60 + int(s) + int(ms) / 1000.0
-        elif len(parts) == 2:
-            m, s_ms = parts
-            s, ms = s_ms.split('.')
-            return int(m) * 60 + int(s) + int(ms) / 1000.0
-    except ValueError:
-        print(f"Warning: Could not parse time string: {time_str}")
-        return 0.0
-    return 0.0
-
-def parse_segment_line(line: str, original_stdout_for_debug=sys.stdout):
-    normalized_line = unicodedata.normalize('NFC', line)
-    cleaned_line = normalized_line.replace("\xa0", " ").replace("\r", "")
-    stripped_line = cleaned_line.strip()
-    pattern = r"^\[(\d{2}:\d{2}(?::\d{2})?\.\d{3})\s*-->\s*(\d{2}:\d{2}(?::\d{2})?\.\d{3})\]\s*(.*)$"
-    segment_match = re.match(pattern, stripped_line)
-    if segment_match:
-        start_str, end_str, text_segment = segment_match.groups()
-        try:
-            start_seconds = time_str_to_seconds(start_str)
-            end_seconds = time_str_to_seconds(end_str)
-            return start_seconds, end_seconds, text_segment.strip(), stripped_line
-        except Exception as e:
-            print(f"Error in time_str_to_seconds: {e}", file=original_stdout_for_debug, flush=True)
-            return None, None, None, stripped_line
-    if stripped_line.startswith("Detecting language") or stripped_line.startswith("Detected language:"):
-        return None, None, None, stripped_line
-    if stripped_line:
-        return None, None, None, stripped_line
-    return None, None, None, None
+        cache_key = make_cache_key(fingerprint_media(file_path), model_key[0], model_key[2],
+                                   task, language, decode_options)
+    except OSError as e:
+        print(f"Warning: Could not fingerprint '{os.path.basename(file_path)}' for the cache: {e}")
+        return None, None
+    return cache_key, TRANSCRIPTION_CACHE.get(cache_key)
 
-def transcribe_media_file(file_path: str, language: str = None, task: str = "transcribe",
-                          progress_callback=None, verbose_transcription: bool = True):
-    global WHISPER_MODEL, MODEL_LOADED_SUCCESSFULLY, DEVICE_USED
-    if not MODEL_LOADED_SUCCESSFULLY or WHISPER_MODEL is None or DEVICE_USED != "cuda":
-        error_msg = "Error: Whisper model is not loaded on CUDA."
+@collects_metrics
+def transcribe_media(file_path: str, language: str = None, task: str = "transcribe",
+                     progress_callback=None, verbose_transcription: bool = True,
+                     model_name: str = None, device: str = None, precision: str = None, audio=None,
+                     use_cache: bool = None, use_vad: bool = None, chunk_workers: int = None,
+                     resume_segments: list = None, control=None, **decode_options):
+    """
+    Transcribes a media file, reporting every segment to progress_callback as it is decoded.
+    `audio` may hold the file's already decoded 16 kHz float32 PCM, which skips decoding it here.
+    `resume_segments` are segments committed by an interrupted earlier run (see batch_manifest): they are
+    kept as they are and only the audio after the last of them is transcribed.
+    `control` (a TranscriptionControl) pauses or cancels the file between decoded windows; a cancelled
+    file returns None.
+
+    With the voice-activity pre-pass enabled only detected speech is sent to the model and segment
+    times are mapped back to the original timeline; files without any speech are skipped ("no_speech").
+
+    Recordings longer than CHUNKED_MIN_DURATION_SECONDS are split into chunks that are transcribed by
+    parallel worker processes (see chunked_transcription) when more than one worker is available;
+    `chunk_workers` overrides the worker count (1 disables chunking).
+    Otherwise BATCHED_INFERENCE_ENABLED decodes the recording as independent windows in encoder
+    batches of ENCODER_BATCH_SIZE (see batched_inference).
+
+    Results are looked up in / stored to the on-disk TRANSCRIPTION_CACHE, keyed by the media content,
+    model, precision, task, language, decode options and the VAD, batching and chunking settings in
+    effect. A hit replays the cached segments instantly.
+    Returns {"text", "segments", "language", "no_speech", "from_cache", "metrics"} or None on failure;
+    "metrics" holds the file's stage timings (see transcription_metrics).
+    """
+    # These modules import this one, so they are imported here rather than at the top
+    import batch_engine
+    import batched_inference
+    import chunked_transcription
+
+    model_key = resolve_model_key(model_name, device, precision)
+    if model_key is None:
+        error_msg = "Error: The requested transcription device is not available."
         if progress_callback:
             progress_callback({'type': 'status', 'message': error_msg, 'is_error': True})
         print(error_msg)
         return None
+    filename = os.path.basename(file_path)
     if progress_callback:
-        progress_callback({'type': 'status', 'message': f"Preparing: {os.path.basename(file_path)}..."})
-    full_transcribed_text_from_result = None
-    options = {"language": language, "task": task, "fp16": True, "verbose": verbose_transcription}
-    options = {k: v for k, v in options.items() if v is not None}
-    if verbose_transcription:
-        old_stdout = sys.stdout
-        redirected_output = io.StringIO()
-        sys.stdout = redirected_output
-        all_captured_lines = []
-        last_segment_end_time = -1.0
-        transcription_result_holder = {"result_obj": None, "error": None}
-        def whisper_worker_function():
-            try:
-                transcription_result_holder["result_obj"] = WHISPER_MODEL.transcribe(file_path, **options)
-            except Exception as e:
-                transcription_result_holder["error"] = e
-                print(f"Error during transcription: {e}", file=old_stdout, flush=True)
-        whisper_thread = threading.Thread(target=whisper_worker_function, daemon=True)
-        whisper_thread.start()
-        if progress_callback:
-            progress_callback({'type': 'status', 'message': f"Transcription started for: {os.path.basename(file_path)}..."})
-        processed_lines_count = 0
-        while whisper_thread.is_alive():
-            whisper_thread.join(timeout=0.1)
-            current_lines = redirected_output.getvalue().splitlines()
-            if len(current_lines) > processed_lines_count:
-                new_lines = current_lines[processed_lines_count:]
-                for line in new_lines:
-                    all_captured_lines.append(line)
-                    start_s, end_s, text_seg, full_l_or_msg = parse_segment_line(line, old_stdout)
-                    if start_s is not None and end_s is not None:
-                        if end_s > last_segment_end_time and progress_callback:
-                            progress_callback({'type': 'segment', 'start_seconds': start_s, 'end_seconds': end_s, 'text_segment': text_seg, 'full_line': full_l_or_msg})
-                            last_segment_end_time = end_s
-                    elif full_l_or_msg and progress_callback:
-                        if not full_l_or_msg.strip().startswith("UI_HOME_SCREEN DEBUG:"):
-                            progress_callback({'type': 'status', 'message': full_l_or_msg})
-                processed_lines_count = len(current_lines)
-            time.sleep(0.05)
-        sys.stdout = old_stdout
-        final_lines = redirected_output.getvalue().splitlines()[processed_lines_count:]
-        for line in final_lines:
-            start_s, end_s, text_seg, full_l_or_msg = parse_segment_line(line, old_stdout)
-            if start_s is not None and end_s is not None and end_s > last_segment_end_time:
-                if progress_callback:
-                    progress_callback({'type': 'segment', 'start_seconds': start_s, 'end_seconds': end_s, 'text_segment': text_seg, 'full_line': full_l_or_msg})
-                last_segment_end_time = end_s
-            elif full_l_or_msg and progress_callback:
-                if not full_l_or_msg.strip().startswith("UI_HOME_SCREEN DEBUG:"):
-                    progress_callback({'type': 'status', 'message': full_l_or_msg})
-        redirected_output.close()
-        if transcription_result_holder["error"]:
-            error_msg = f"Error during transcription: {transcription_result_holder['error']}"
-            if progress_callback:
-                progress_callback({'type': 'status', 'message': error_msg, 'is_error': True})
-            print(error_msg, file=sys.stderr)
-            return None
-        if transcription_result_holder["result_obj"]:
-            full_transcribed_text_from_result = transcription_result_holder["result_obj"]["text"]
-        else:
-            error_msg = f"Transcription finished but no result object was found."
-            if progress_callback:
-                progress_callback({'type': 'status', 'message': error_msg, 'is_error': True})
-            print(error_msg, file=sys.stderr)
-            return None
-    else:
-        try:
-            if progress_callback:
-                progress_callback({'type': 'status', 'message': f"Transcription started for: {os.path.basename(file_path)} (non-verbose)..."})
-            result_obj = WHISPER_MODEL.transcribe(file_path, **options)
-            full_transcribed_text_from_result = result_obj["text"]
-        except Exception as e:
-            error_msg = f"Error during transcription: {e}"
+        progress_callback({'type': 'status', 'message': f"Preparing: {filename}..."})
+
+    use_cache = config.TRANSCRIPTION_CACHE_ENABLED if use_cache is None else use_cache
+    use_vad = config.VAD_ENABLED if use_vad is None else use_vad
+    chunk_worker_count = batch_engine.resolve_worker_count(2, model_key[1], chunk_workers)
+    cache_key = None
+    if use_cache:
+        # Long recordings are chunked whenever several workers are available, which changes the segments
+        chunking = {"min_seconds": config.CHUNKED_MIN_DURATION_SECONDS, "target_seconds": config.CHUNK_TARGET_SECONDS,
+                    "overlap_seconds": config.CHUNK_OVERLAP_SECONDS, "search_seconds": config.CHUNK_CUT_SEARCH_SECONDS,
+                    "workers": chunk_worker_count} if chunk_worker_count > 1 else None
+        cache_options = {**decode_options, "vad": vad.vad_settings() if use_vad else None,
+                         "batched": config.BATCHED_INFERENCE_ENABLED, "chunking": chunking}
+        cache_key, cached_result = _lookup_cached_result(file_path, model_key, task, language, cache_options)
+        if cached_result is not None:
+            if progress_callback and verbose_transcription:
+                for segment in cached_result["segments"]:
+                    progress_callback({**_segment_event(segment), 'replayed': True})
             if progress_callback:
-                progress_callback({'type': 'status', 'message': error_msg, 'is_error': True})
-            print(error_msg, file=sys.stderr)
-            return None
-    if full_transcribed_text_from_result is not None:
+                progress_callback({'type': 'status', 'message': f"Finished: {filename} (from cache)."})
+            return {**cached_result, "from_cache": True}
+
+    def status_cb(message):
+        if progress_callback:
+            progress_callback({'type': 'status', 'message': message})
+
+    segments = list(resume_segments or [])
+    resume_offset = segments[-1]["end"] if segments else 0.0
+    if segments and language is None:
+        language = segments[-1]["language"]  # The resumed part continues in the language already detected
+    detected_language = language
+    speech_timeline = None
+    has_audio_left = True
+    try:
+        with stage("decode"):
+            if audio is None:
+                audio = read_audio(file_path) # WAV is read in-process; None leaves other formats to ffmpeg
+            if audio is None and (segments or use_vad):
+                audio = load_audio(file_path)
+        if segments:
+            audio = audio[int(resume_offset * SAMPLE_RATE):]
+            status_cb(f"Resuming {filename} at {format_timestamp(resume_offset)} ({len(segments)} segments kept).")
+            if progress_callback and verbose_transcription:
+                for segment in segments:
+                    progress_callback({**_segment_event(segment), 'replayed': True})
+
+        if use_vad:
+            with stage("vad"):
+                speech_regions = vad.detect_speech_regions(audio)
+            if not speech_regions and segments:
+                has_audio_left = False  # No speech after the resumed part
+            elif not speech_regions:
+                status_cb(f"No speech detected in: {filename}. Skipped.")
+                result = {"text": "", "segments": [], "language": language, "no_speech": True}
+                if cache_key:
+                    TRANSCRIPTION_CACHE.put(cache_key, result)
+                return {**result, "from_cache": False}
+            else:
+                total_seconds = len(audio) / SAMPLE_RATE
+                with stage("vad"):
+                    audio, speech_timeline = vad.build_speech_audio(audio, speech_regions)
+                speech_seconds = sum(end - start for start, end in speech_regions) / SAMPLE_RATE
+                status_cb(f"Voice activity: {speech_seconds:.0f}s of speech found in {total_seconds:.0f}s of audio.")
+
+        segment_source = batched_inference.iter_batched_segments if config.BATCHED_INFERENCE_ENABLED else iter_segments
+        model_lock = MODEL_REGISTRY.exclusive(model_key)  # Threads sharing the model (daemon workers) take turns
+        if not has_audio_left:
+            segment_source = None
+        elif chunk_worker_count > 1:
+            if audio is None:
+                with stage("decode"):
+                    audio = load_audio(file_path)
+            if len(audio) / SAMPLE_RATE >= config.CHUNKED_MIN_DURATION_SECONDS:
+                segment_source = functools.partial(chunked_transcription.iter_chunked_segments, workers=chunk_workers)
+                model_lock = nullcontext()  # Chunks run on the worker processes' own models
+
         if progress_callback:
-            progress_callback({'type': 'status', 'message': f"Finished: {os.path.basename(file_path)}."})
-        return full_transcribed_text_from_result.strip()
-    else:
-        if not verbose_transcription and progress_callback:
-            progress_callback({'type': 'status', 'message': f"Failed to transcribe: {os.path.basename(file_path)}.", 'is_error': True})
+            progress_callback({'type': 'status', 'message': f"Transcription started for: {filename}..."})
+        resumed_count = len(segments)
+        with model_lock:
+            for segment in segment_source(file_path if audio is None else audio, language=language, task=task, status_callback=status_cb,
+                                          model_name=model_key[0], device=model_key[1], precision=model_key[2],
+                                          control=control, **decode_options) if segment_source else ():
+                if speech_timeline is not None:
+                    segment = speech_timeline.remap_segment(segment)
+                if resumed_count:
+                    segment = {**segment, "id": segment["id"] + resumed_count,
+                               "start": segment["start"] + resume_offset, "end": segment["end"] + resume_offset}
+                segments.append(segment)
+                detected_language = segment["language"]
+                if progress_callback and verbose_transcription:
+                    progress_callback(_segment_event(segment))
+    except TranscriptionCancelled:
+        status_cb(f"Cancelled: {filename} ({len(segments)} segments decoded).")
         return None
+    except Exception as e:
+        error_msg = f"Error during transcription: {e}"
+        if progress_callback:
+            progress_callback({'type': 'status', 'message': error_msg, 'is_error': True})
+        print(error_msg, file=sys.stderr)
+        return None
+
+    if progress_callback:
+        progress_callback({'type': 'status', 'message': f"Finished: {filename}."})
+    result = {"text": "".join(segment["text"] for segment in segments).strip(),
+              "segments": segments, "language": detected_language, "no_speech": False}
+    if cache_key and not resume_segments:
+        TRANSCRIPTION_CACHE.put(cache_key, result)
+    return {**result, "from_cache": False}
+
+def transcribe_media_file(file_path: str, language: str = None, task: str = "transcribe",
+                          progress_callback=None, verbose_transcription: bool = True,
+                          model_name: str = None, device: str = None, precision: str = None, control=None):
+    result = transcribe_media(file_path, language=language, task=task,
+                              progress_callback=progress_callback, verbose_transcription=verbose_transcription,
+                              model_name=model_name, device=device, precision=precision, control=control)
+    return result["text"] if result is not None else None
@@ -0,0 +1,265 @@
+# transcription_metrics.py
+import csv
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import app_config as config
+
+# Pipeline stages in the order they happen. probe, export and ui_dispatch are measured by the app; the
+# others by the thread transcribing a file, so they also cover files transcribed in worker processes.
+STAGES = ("probe", "decode", "vad", "mel", "encoder", "decoder", "export", "ui_dispatch")
+
+_local = threading.local()
+
+def peak_rss_mb() -> float:
+    """Peak resident memory of this process in MB (0.0 where it can't be read)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return _windows_peak_rss_mb()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024  # Bytes on macOS, KB elsewhere
+
+def _windows_peak_rss_mb() -> float:
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+    try:
+        get_current_process = ctypes.windll.kernel32.GetCurrentProcess
+        get_current_process.restype = wintypes.HANDLE
+        get_memory_info = ctypes.windll.psapi.GetProcessMemoryInfo
+        get_memory_info.argtypes = [wintypes.HANDLE, ctypes.POINTER(ProcessMemoryCounters), wintypes.DWORD]
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        if not get_memory_info(get_current_process(), ctypes.byref(counters), counters.cb):
+            return 0.0
+    except (AttributeError, OSError):
+        return 0.0
+    return counters.PeakWorkingSetSize / (1024 * 1024)
+
+class StageTimer:
+    """Seconds and calls per stage for one file, filled in by stage() on the thread transcribing it."""
+    def __init__(self):
+        self.seconds = {}
+        self.calls = {}
+
+    def add(self, name: str, seconds: float):
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def as_dict(self) -> dict:
+        return {"stage_seconds": dict(self.seconds), "stage_calls": dict(self.calls), "peak_rss_mb": peak_rss_mb()}
+
+@contextmanager
+def collect():
+    """Makes a fresh StageTimer the target of stage() on this thread while the block runs."""
+    previous = getattr(_local, "timer", None)
+    timer = _local.timer = StageTimer()
+    try:
+        yield timer
+    finally:
+        _local.timer = previous
+
+@contextmanager
+def stage(name: str):
+    """
+    Adds the block's wall time to stage `name` of the file being collected on this thread (a no-op
+    otherwise). On CUDA, kernels run asynchronously, so GPU time shows up in the stage that waits for
+    the result (usually the decoder) rather than the one that queued it.
+    """
+    timer = getattr(_local, "timer", None)
+    if timer is None or not config.METRICS_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer.add(name, time.perf_counter() - start)
+
+def collects_metrics(function):
+    """Runs `function` under collect() and adds the timings to the result dict it returns, as "metrics"."""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with collect() as timer:
+            result = function(*args, **kwargs)
+        if isinstance(result, dict) and config.METRICS_ENABLED:
+            result["metrics"] = timer.as_dict()
+        return result
+    return wrapper
+
+class BatchMetrics:
+    """
+    Per-file and batch-wide performance figures for one batch: stage timings, real-time factor
+    (processing time / audio duration, below 1 is faster than real time), time to first segment,
+    segments per second and peak memory. Fed from the batch's progress events and results; every
+    method may be called from any thread.
+    """
+    def __init__(self, file_paths, durations: dict = None):
+        self.file_paths = list(file_paths)
+        self.durations = durations if durations is not None else {}  # Read live, so it may fill in later
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._finished = None
+        self._first_segment_at = None
+        self._peak_rss_mb = 0.0
+        self._files = {}
+
+    def _file(self, index):
+        return self._files.setdefault(index, {"started": None, "first_segment": None, "finished": None,
+                                              "segments": 0, "audio_done": 0.0, "status": "pending",
+                                              "from_cache": False, "stage_seconds": {}, "peak_rss_mb": 0.0})
+
+    def file_started(self, index: int):
+        with self._lock:
+            self._file(index)["started"] = time.perf_counter()
+
+    def segment(self, index: int, end_seconds: float = 0.0, replayed: bool = False):
+        now = time.perf_counter()
+        with self._lock:
+            entry = self._file(index)
+            entry["segments"] += 1
+            entry["audio_done"] = max(entry["audio_done"], end_seconds)
+            if not replayed:
+                if entry["first_segment"] is None:
+                    entry["first_segment"] = now
+                if self._first_segment_at is None:
+                    self._first_segment_at = now
+
+    def file_finished(self, index: int, result):
+        with self._lock:
+            entry = self._file(index)
+            entry["finished"] = time.perf_counter()
+            if result is None:
+                entry["status"] = "failed"
+                return
+            entry["status"] = "no_speech" if result.get("no_speech") else "ok"
+            entry["from_cache"] = bool(result.get("from_cache") or result.get("from_manifest"))
+            metrics = result.get("metrics") or {}
+            for name, seconds in metrics.get("stage_seconds", {}).items():
+                entry["stage_seconds"][name] = entry["stage_seconds"].get(name, 0.0) + seconds
+            entry["peak_rss_mb"] = max(entry["peak_rss_mb"], metrics.get("peak_rss_mb", 0.0))
+
+    def add_stage(self, name: str, seconds: float, index: int = None):
+        with self._lock:
+            stages = self._file(-1 if index is None else index)["stage_seconds"]  # -1 holds batch-wide work
+            stages[name] = stages.get(name, 0.0) + seconds
+
+    @contextmanager
+    def measure(self, name: str, index: int = None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - start, index)
+
+    def timed(self, name: str, function, index: int = None):
+        """`function` wrapped so its run time is added to stage `name`, e.g. for an export job."""
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with self.measure(name, index):
+                return function(*args, **kwargs)
+        return wrapper
+
+    def finish(self):
+        with self._lock:
+            self._finished = self._finished or time.perf_counter()
+
+    def _audio_seconds(self, index, entry) -> float:
+        duration = self.durations.get(self.file_paths[index]) or 0.0
+        if entry["finished"] is not None and entry["status"] != "failed":
+            return duration or entry["audio_done"]
+        return min(entry["audio_done"], duration) if duration else entry["audio_done"]
+
+    def _file_row(self, index, entry) -> dict:
+        audio_seconds = self._audio_seconds(index, entry)
+        wall = None
+        if entry["started"] is not None:
+            wall = (entry["finished"] or time.perf_counter()) - entry["started"]
+        first = entry["first_segment"] - entry["started"] if entry["first_segment"] and entry["started"] else None
+        row = {"file": os.path.basename(self.file_paths[index]), "status": entry["status"],
+               "from_cache": entry["from_cache"], "audio_seconds": round(audio_seconds, 3),
+               "wall_seconds": round(wall, 3) if wall is not None else None,
+               "real_time_factor": round(wall / audio_seconds, 4) if wall and audio_seconds else None,
+               "time_to_first_segment": round(first, 3) if first is not None else None,
+               "segments": entry["segments"],
+               "segments_per_second": round(entry["segments"] / wall, 3) if wall else None,
+               "worker_peak_rss_mb": round(entry["peak_rss_mb"], 1)}
+        for name in STAGES:
+            row[f"{name}_seconds"] = round(entry["stage_seconds"].get(name, 0.0), 4)
+        return row
+
+    def summary(self) -> dict:
+        """Batch-wide figures so far (or final ones after finish())."""
+        peak_rss = peak_rss_mb()
+        with self._lock:
+            self._peak_rss_mb = max(self._peak_rss_mb, peak_rss)
+            now = self._finished or time.perf_counter()
+            wall = now - self._started
+            files = [(index, entry) for index, entry in self._files.items() if index >= 0]
+            audio_seconds = sum(self._audio_seconds(index, entry) for index, entry in files)
+            segments = sum(entry["segments"] for _, entry in files)
+            stage_totals = {}
+            for entry in self._files.values():
+                for name, seconds in entry["stage_seconds"].items():
+                    stage_totals[name] = stage_totals.get(name, 0.0) + seconds
+            worker_peak = max([entry["peak_rss_mb"] for _, entry in files] or [0.0])
+            return {"files": len(self.file_paths),
+                    "files_finished": sum(1 for _, entry in files if entry["finished"] is not None),
+                    "audio_seconds": round(audio_seconds, 3), "wall_seconds": round(wall, 3),
+                    "real_time_factor": round(wall / audio_seconds, 4) if audio_seconds else None,
+                    "time_to_first_segment": (round(self._first_segment_at - self._started, 3)
+                                              if self._first_segment_at else None),
+                    "segments": segments, "segments_per_second": round(segments / wall, 3) if wall else None,
+                    "peak_rss_mb": round(max(self._peak_rss_mb, worker_peak), 1),
+                    "stage_seconds": {name: round(stage_totals.get(name, 0.0), 4) for name in STAGES}}
+
+    def format_summary(self) -> str:
+        """One line for a progress display, e.g. "RTF 0.31 | 2.4 seg/s | first segment 3.1s | peak 812 MB"."""
+        s = self.summary()
+        parts = []
+        if s["real_time_factor"] is not None:
+            parts.append(f"RTF {s['real_time_factor']:.2f}")
+        if s["segments_per_second"]:
+            parts.append(f"{s['segments_per_second']:.1f} seg/s")
+        if s["time_to_first_segment"] is not None:
+            parts.append(f"first segment {s['time_to_first_segment']:.1f}s")
+        parts.append(f"peak {s['peak_rss_mb']:.0f} MB")
+        return " | ".join(parts)
+
+    def file_rows(self) -> list:
+        with self._lock:
+            return [self._file_row(index, self._file(index)) for index in range(len(self.file_paths))]
+
+    def write_report(self, directory: str = None, name: str = None):
+        """
+        Writes the batch summary and per-file rows to <name>.json and the rows to <name>.csv in
+        `directory` (METRICS_REPORT_DIR by default). Returns (json_path, csv_path), or None on failure.
+        """
+        directory = directory or config.METRICS_REPORT_DIR
+        name = name or time.strftime("batch-%Y%m%d-%H%M%S")
+        json_path, csv_path = (os.path.join(directory, f"{name}.{ext}") for ext in ("json", "csv"))
+        summary, rows = self.summary(), self.file_rows()
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(json_path, "w", encoding="utf-8") as f:
+                json.dump({"batch": summary, "files": rows}, f, indent=2)
+            with open(csv_path, "w", encoding="utf-8", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["file"])
+                writer.writeheader()
+                writer.writerows(rows)
+        except OSError as e:
+            print(f"TranscriptionMetrics - Warning: Could not write the metrics report: {e}")
+            return None
+        return json_path, csv_path
@@ -3,13 +3,19 @@ import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import os
 import app_config as config
-from PIL import Image
 
-import transcription_handler
 import file_export_handler
 import threading
+from batch_manifest import BatchManifest
+from export_pool import ExportPool
+import segment_writers
+from media_probe import MediaProber
+from startup_profile import STARTUP_PROFILER
+from transcription_metrics import BatchMetrics
 from ui_transcription_popup import TranscriptionPopup
-import utils
+
+# Output formats written segment by segment while transcribing (see segment_writers)
+SEGMENT_OUTPUT_FORMATS = {"SubRip subtitles (.srt)": "srt", "WebVTT subtitles (.vtt)": "vtt", "JSON Lines (.jsonl)": "jsonl"}
 
 class HomeScreen(ctk.CTkFrame):
     def __init__(self, master, **kwargs):
@@ -21,7 +27,23 @@ class HomeScreen(ctk.CTkFrame):
         self.transcription_popup_window = None
         self.file_durations_map = {}
         self.total_estimated_duration = 0.0
+        # Durations are read in the background as soon as files are selected
+        self.media_prober = MediaProber()
+
+        with STARTUP_PROFILER.phase("home screen: icons"):
+            self._load_file_icons()
+
+        self.audio_extensions = config.AUDIO_EXTENSIONS
+        self.video_extensions = config.VIDEO_EXTENSIONS
 
+        with STARTUP_PROFILER.phase("home screen: widgets and fonts"):
+            self._build_widgets()
+
+        self.toggle_filename_entry_state()
+        self.update_output_dir_display()
+
+    def _load_file_icons(self):
+        from PIL import Image # Pillow is only needed once the home screen is built
         self.audio_icon_image = None
         self.video_icon_image = None
         try:
@@ -35,9 +57,7 @@ class HomeScreen(ctk.CTkFrame):
         except Exception as e:
             print(f"Error loading video icon: {e}")
 
-        self.audio_extensions = ['.mp3', '.wav', '.m4a', '.flac', '.ogg', '.aac']
-        self.video_extensions = ['.mp4', '.mkv', '.mov', '.avi', '.flv', '.wmv']
-
+    def _build_widgets(self):
         self.content_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.content_frame.pack(expand=True, fill="both", padx=20, pady=15)
         self.top_frame = ctk.CTkFrame(self.content_frame, fg_color="transparent")
@@ -59,7 +79,7 @@ class HomeScreen(ctk.CTkFrame):
         self.middle_frame.grid_columnconfigure(1, weight=1)
         self.output_format_label = ctk.CTkLabel(self.middle_frame, text="Output Format:", font=ctk.CTkFont(family=config.FONT_FAMILY_POPPINS, size=14), text_color=config.CHILD_TEXT_COLOR)
         self.output_format_label.grid(row=0, column=0, padx=(15,5), pady=10, sticky="w")
-        self.output_format_combobox = ctk.CTkComboBox(self.middle_frame, values=["Word (.docx)", "PDF (.pdf)"], font=ctk.CTkFont(family=config.FONT_FAMILY_POPPINS, size=14), dropdown_font=ctk.CTkFont(family=config.FONT_FAMILY_POPPINS, size=14), border_color=config.BUTTON_PRIMARY_COLOR, button_color=config.BUTTON_PRIMARY_COLOR, button_hover_color=config.BUTTON_HOVER_COLOR, state="readonly", height=30)
+        self.output_format_combobox = ctk.CTkComboBox(self.middle_frame, values=["Word (.docx)", "PDF (.pdf)", *SEGMENT_OUTPUT_FORMATS], font=ctk.CTkFont(family=config.FONT_FAMILY_POPPINS, size=14), dropdown_font=ctk.CTkFont(family=config.FONT_FAMILY_POPPINS, size=14), border_color=config.BUTTON_PRIMARY_COLOR, button_color=config.BUTTON_PRIMARY_COLOR, button_hover_color=config.BUTTON_HOVER_COLOR, state="readonly", height=30)
         self.output_format_combobox.set("Word (.docx)")
         self.output_format_combobox.grid(row=0, column=1, columnspan=2, padx=(0,15), pady=10, sticky="ew")
         self.output_name_label = ctk.CTkLabel(self.middle_frame, text="Output Filename:", font=ctk.CTkFont(family=config.FONT_FAMILY_POPPINS, size=14), text_color=config.CHILD_TEXT_COLOR)
@@ -81,15 +101,13 @@ class HomeScreen(ctk.CTkFrame):
         self.clear_button = ctk.CTkButton(self.bottom_frame, text="Clear Fields", command=self.clear_fields_action, font=ctk.CTkFont(family=config.BUTTON_FONT_TUPLE[0], size=config.BUTTON_FONT_TUPLE[1], weight=config.BUTTON_FONT_TUPLE[2]), height=40, fg_color=config.ACCENT_COLOR, hover_color=config.BUTTON_HOVER_COLOR, text_color=config.CHILD_TEXT_COLOR, corner_radius=config.DEFAULT_BUTTON_STYLE.get("corner_radius", 8))
         self.clear_button.grid(row=0, column=1, padx=(10,0), pady=5, sticky="ew")
 
-        self.toggle_filename_entry_state()
-        self.update_output_dir_display()
-
     def select_files(self):
         filetypes = [("Media files", "*.mp3 *.wav *.m4a *.flac *.ogg *.mp4 *.mkv *.mov *.avi *.webm"), ("Audio files", "*.mp3 *.wav *.m4a *.flac *.ogg *.aac"), ("Video files", "*.mp4 *.mkv *.mov *.avi *.webm *.flv"), ("All files", "*.*")]
         filepaths = filedialog.askopenfilenames(title="Select Audio/Video Files", filetypes=filetypes)
         if filepaths:
             new_files = [fp for fp in filepaths if fp not in self.selected_files]
             self.selected_files.extend(new_files)
+            self.media_prober.probe(new_files)
             self.update_selected_files_display()
         print(f"Selected files: {self.selected_files}")
 
@@ -169,9 +187,24 @@ class HomeScreen(ctk.CTkFrame):
             messagebox.showwarning("In Progress", "A transcription process is already running.")
             return
 
-        self.file_durations_map = {}
-        self.total_estimated_duration = 0.0
-        files_with_unknown_duration = []
+        manifest = BatchManifest(self.selected_files, {"output_dir": os.path.abspath(self.output_directory),
+                                                       "format": self.output_format_combobox.get(),
+                                                       "separate": is_separate_files,
+                                                       "base_filename": output_filename_base,
+                                                       "model": config.DEFAULT_WHISPER_MODEL},
+                                 # A combined subtitle file is rebuilt from the finished files' segments on resume
+                                 keep_segments=not is_separate_files and self.output_format_combobox.get() in SEGMENT_OUTPUT_FORMATS)
+        if manifest.has_progress():
+            if messagebox.askyesno("Resume Batch", f"An earlier run of this batch stopped after {manifest.done_count()} "
+                                   f"of {len(self.selected_files)} files.\nResume where it left off?"):
+                print(f"Resuming batch {manifest.batch_id} ({manifest.done_count()} files already done).")
+            else:
+                manifest.delete()
+
+        files_to_process = list(self.selected_files)
+        self.file_durations_map = self.media_prober.durations # Filled in as probes finish
+        probe_state = {"done": 0, "unknown": []}
+        probe_lock = threading.Lock()
 
         if self.transcription_popup_window is None or not self.transcription_popup_window.winfo_exists():
             self.transcription_popup_window = TranscriptionPopup(
@@ -184,208 +217,333 @@ class HomeScreen(ctk.CTkFrame):
         else:
             self.transcription_popup_window.lift()
 
-        self.transcription_popup_window.after(0, lambda: self.transcription_popup_window.update_overall_status(0))
-        self.transcription_popup_window.after(0, lambda: self.transcription_popup_window.update_current_action("Calculating file durations..."))
-        self.transcription_popup_window.after(0, lambda: self.transcription_popup_window.update_detailed_progress(""))
-        self.transcription_popup_window.after(0, lambda: self.transcription_popup_window.update_progress_bar_value(0.01))
-
-        print("Calculating media durations...")
-        for fp_idx, fp in enumerate(self.selected_files):
-            duration = utils.get_media_duration(fp)
-            if duration <= 0:
-                files_with_unknown_duration.append(os.path.basename(fp))
-                print(f"Warning: Could not determine duration for {os.path.basename(fp)} or it's zero.")
-                self.file_durations_map[fp] = 30.0 # Assign a default duration for progress calculation
-                self.total_estimated_duration += 30.0
-            else:
-                self.file_durations_map[fp] = duration
-                self.total_estimated_duration += duration
-
-        if files_with_unknown_duration:
-            messagebox.showwarning("Duration Warning", f"Could not determine duration for:\n{', '.join(files_with_unknown_duration)}\nUsing a default of 30s for progress estimation for these files.")
-
-        print(f"Total estimated duration for transcription: {self.total_estimated_duration:.2f} seconds")
-
-        if self.transcription_popup_window and self.transcription_popup_window.winfo_exists():
-            self.transcription_popup_window.total_estimated_duration_seconds = self.total_estimated_duration
-            self.transcription_popup_window.after(0, lambda: self.transcription_popup_window.update_progress_bar_value(0.02)) # Small initial bump
+        popup_window = self.transcription_popup_window
+        popup_window.ui_bus.post(popup_window.update_overall_status, 0)
+        popup_window.ui_bus.post(popup_window.update_current_action, "Starting...")
+        popup_window.ui_bus.post(popup_window.update_detailed_progress, "")
+        popup_window.ui_bus.post(popup_window.update_progress_bar_value, 0.01)
+
+        def on_duration_probed(fp, duration):
+            # Runs on a probe thread; transcription is already under way meanwhile
+            with probe_lock:
+                probe_state["done"] += 1
+                if duration <= 0:
+                    probe_state["unknown"].append(os.path.basename(fp))
+                    print(f"Warning: Could not determine duration for {os.path.basename(fp)} or it's zero.")
+                all_probed = probe_state["done"] == len(files_to_process)
+            if not all_probed:
+                return
+            self.total_estimated_duration = sum(self.file_durations_map.get(f) or 30.0 for f in files_to_process)
+            print(f"Total estimated duration for transcription: {self.total_estimated_duration:.2f} seconds")
+            if popup_window.is_open():
+                popup_window.total_estimated_duration_seconds = self.total_estimated_duration
+            if probe_state["unknown"]:
+                popup_window.ui_bus.call(messagebox.showwarning, "Duration Warning", f"Could not determine duration for:\n{', '.join(probe_state['unknown'])}\nUsing a default of 30s for progress estimation for these files.")
+
+        print(f"Reading media durations ({self.media_prober.pending_count(files_to_process)} not cached yet)...")
+        self.media_prober.probe(files_to_process, callback=on_duration_probed)
 
         transcription_args = {
-            "files_to_process": list(self.selected_files),
+            "files_to_process": files_to_process,
             "output_dir": self.output_directory,
             "output_format_str": self.output_format_combobox.get(),
             "is_separate": is_separate_files,
             "base_filename_user": output_filename_base,
             "popup_window": self.transcription_popup_window,
-            "file_durations_map": self.file_durations_map.copy(),
-            "total_duration_all_files": self.total_estimated_duration
+            "media_prober": self.media_prober,
+            "manifest": manifest
         }
         self.transcription_thread = threading.Thread(target=self._transcription_worker, kwargs=transcription_args, daemon=True)
         self.transcription_thread.start()
 
     def _transcription_worker(self, files_to_process, output_dir, output_format_str,
                               is_separate, base_filename_user, popup_window,
-                              file_durations_map, total_duration_all_files):
+                              media_prober, manifest=None):
 
+        import batch_engine # Pulls in torch/whisper, kept off the startup path
+        file_durations_map = media_prober.durations # Grows while transcription runs
+        metrics = BatchMetrics(files_to_process, file_durations_map)
         overall_success = True
         # THIS STORES THE SUM OF DURATIONS OF *PREVIOUSLY FULLY COMPLETED* FILES
         accumulated_duration_of_completed_files = 0.0
+        # Files may run in parallel worker processes, so in-flight progress is tracked per file index
+        processed_time_by_file_in_progress = {}
+        files_started = 0
+        cache_hits = 0
+        cache_misses = 0
         all_text_combined = []
-
-        try:
-            for i, input_filepath in enumerate(files_to_process):
-                if not popup_window.winfo_exists() or popup_window.cancel_requested.is_set():
-                    popup_window.after(0, lambda: popup_window.update_current_action("Cancellation acknowledged. Stopping..."))
+        # Subtitle/JSONL output is streamed to disk segment by segment; documents are written per file
+        segment_format = SEGMENT_OUTPUT_FORMATS.get(output_format_str)
+        segment_writers_by_file = {}
+        combined_segment_writer = None
+        if segment_format and not is_separate:
+            probed = media_prober.wait(files_to_process) # Offsets need every duration
+            time_offsets, offset = [], 0.0
+            for index in range(len(files_to_process)):
+                time_offsets.append(offset) # Recordings play back to back in the combined file
+                offset += probed[files_to_process[index]]
+            combined_segment_writer = segment_writers.OrderedBatchWriter(
+                segment_writers.create_writer(segment_format, os.path.join(output_dir, base_filename_user)),
+                files_to_process, time_offsets)
+        # Separate documents are written in the background while the next file is transcribed
+        export_pool = ExportPool() if is_separate and not segment_format else None
+
+        def stream_segment(file_index, segment):
+            if combined_segment_writer:
+                combined_segment_writer.write(file_index, segment)
+                return
+            writer = segment_writers_by_file.get(file_index)
+            if writer is None: # Opened on the first segment, so files finished in an earlier run are left as they are
+                file_base_name = os.path.splitext(os.path.basename(files_to_process[file_index]))[0]
+                writer = segment_writers_by_file[file_index] = segment_writers.create_writer(
+                    segment_format, os.path.join(output_dir, file_base_name))
+            writer.write(segment)
+
+        def finish_segment_output(index, result):
+            # Returns the path the file's segments went to
+            if combined_segment_writer:
+                combined_segment_writer.finish_file(index)
+                return combined_segment_writer.writer.output_path
+            writer = segment_writers_by_file.pop(index, None)
+            if writer is None:
+                return None
+            writer.close()
+            return writer.output_path
+
+        def duration_of(index):
+            # Files that haven't been probed yet (or couldn't be) count as 30 s for progress
+            duration = file_durations_map.get(files_to_process[index]) or 30.0
+            return duration if duration > 0 else 30.0
+
+        def total_duration_all_files():
+            return sum(duration_of(index) for index in range(len(files_to_process)))
+
+        def handle_transcription_progress_update(data_dict):
+            file_index = data_dict.get('file_index', 0)
+            if data_dict['type'] == 'file_started':
+                metrics.file_started(file_index)
+            elif data_dict['type'] == 'segment':
+                metrics.segment(file_index, data_dict.get('end_seconds', 0.0), replayed=bool(data_dict.get('replayed')))
+            if segment_format and data_dict['type'] == 'segment' and 'segment' in data_dict:
+                with metrics.measure("export", file_index):
+                    stream_segment(file_index, data_dict['segment'])
+            with metrics.measure("ui_dispatch", file_index):
+                dispatch_progress_to_ui(data_dict)
+            popup_window.ui_bus.post(popup_window.update_metrics_summary, metrics) # Formatted once per frame
+
+        def dispatch_progress_to_ui(data_dict):
+            if not popup_window.is_open(): return
+
+            nonlocal overall_success, files_started
+            file_index = data_dict.get('file_index', 0)
+
+            if data_dict['type'] == 'file_started':
+                files_started += 1
+                filename_only = os.path.basename(files_to_process[file_index])
+                processed_time_by_file_in_progress.setdefault(file_index, 0.0)
+                popup_window.ui_bus.post(popup_window.update_overall_status, files_started)
+                popup_window.ui_bus.post(popup_window.update_current_action, f"Starting: {filename_only}")
+                popup_window.ui_bus.post(popup_window.update_detailed_progress, "") # Clear details for new file
+
+            elif data_dict['type'] == 'segment':
+                segment_line = data_dict.get('full_line', 'Processing segment...')
+                segment_end_s = data_dict.get('end_seconds', 0.0)
+
+                # Update how much of this file has been processed
+                if file_index in processed_time_by_file_in_progress:
+                    processed_time_by_file_in_progress[file_index] = min(segment_end_s, duration_of(file_index))
+
+                popup_window.ui_bus.post(popup_window.update_detailed_progress, segment_line)
+
+                if total_duration_all_files() > 0:
+                    # Overall progress:
+                    # Time from (previously) completed files + progress in files still running
+                    current_total_processed_time_for_all_files = accumulated_duration_of_completed_files + sum(processed_time_by_file_in_progress.values())
+                    overall_progress_value = min(1.0, current_total_processed_time_for_all_files / total_duration_all_files())
+                    popup_window.ui_bus.post(popup_window.update_progress_bar_value, overall_progress_value)
+
+            elif data_dict['type'] == 'status':
+                status_msg = data_dict['message']
+                # Simple heuristic to decide where to show status
+                if "transcription started for" in status_msg.lower() or \
+                   "finished" in status_msg.lower() or \
+                   "saving" in status_msg.lower() or \
+                   "error" in status_msg.lower() or \
+                   "failed" in status_msg.lower():
+                     popup_window.ui_bus.post(popup_window.update_current_action, status_msg)
+                else: # Whisper's language detection etc.
+                    popup_window.ui_bus.post(popup_window.update_detailed_progress, status_msg)
+
+                if data_dict.get('is_error'):
                     overall_success = False
-                    break
-
-                current_file_duration = file_durations_map.get(input_filepath, 30.0)
-                if current_file_duration <= 0: current_file_duration = 30.0
+        # --- END Progress callback ---
 
+        try:
+            files_finished = 0
+            batch_results = batch_engine.run_batch(
+                files_to_process,
+                progress_callback=handle_transcription_progress_update,
+                cancel_event=popup_window.cancel_requested,
+                pause_event=popup_window.pause_requested,
+                file_durations=file_durations_map,
+                manifest=manifest
+            )
+            # Results come back in input order, even when files finish out of order in parallel workers
+            for i, input_filepath, transcription_result in batch_results:
+                files_finished += 1
+                metrics.file_finished(i, transcription_result)
+                metrics.add_stage("probe", media_prober.probe_seconds.get(input_filepath, 0.0), i)
                 filename_only = os.path.basename(input_filepath)
                 file_base_name, _ = os.path.splitext(filename_only)
+                processed_time_for_current_file = processed_time_by_file_in_progress.pop(i, 0.0)
 
-                # Tracks how much of the CURRENT file has been processed via segments
-                # This is reset for each new file.
-                processed_time_for_current_file_via_segments = 0.0
-
-                popup_window.after(0, lambda current_idx=i + 1: popup_window.update_overall_status(current_idx))
-                popup_window.after(0, lambda fn=filename_only: popup_window.update_current_action(f"Starting: {fn}"))
-                popup_window.after(0, lambda: popup_window.update_detailed_progress("")) # Clear details for new file
-
-
-                def handle_transcription_progress_update(data_dict):
-                    if not popup_window.winfo_exists(): return
-
-                    nonlocal overall_success
-                    # We need to update processed_time_for_current_file_via_segments
-                    # and use accumulated_duration_of_completed_files (read-only here)
-                    nonlocal processed_time_for_current_file_via_segments
-
-                    if data_dict['type'] == 'segment':
-                        segment_line = data_dict.get('full_line', 'Processing segment...')
-                        segment_end_s = data_dict.get('end_seconds', 0.0)
-
-                        # Update how much of the *current* file has been processed
-                        processed_time_for_current_file_via_segments = min(segment_end_s, current_file_duration)
-
-                        popup_window.after(0, lambda txt=segment_line: popup_window.update_detailed_progress(txt))
-
-                        if total_duration_all_files > 0:
-                            # Overall progress:
-                            # Time from (previously) completed files + progress in current file
-                            current_total_processed_time_for_all_files = accumulated_duration_of_completed_files + processed_time_for_current_file_via_segments
-                            overall_progress_value = min(1.0, current_total_processed_time_for_all_files / total_duration_all_files)
-
-                            # DEBUG PRINT FOR UI PROGRESS VALUES
-                            print(f"UI_HOME_SCREEN DEBUG: acc_dur_completed={accumulated_duration_of_completed_files:.2f}, "
-                                  f"proc_time_current_seg={processed_time_for_current_file_via_segments:.2f}, "
-                                  f"total_proc_all={current_total_processed_time_for_all_files:.2f}, "
-                                  f"overall_val={overall_progress_value:.4f}")
-
-                            popup_window.after(0, lambda p=overall_progress_value: popup_window.update_progress_bar_value(p))
-
-                    elif data_dict['type'] == 'status':
-                        status_msg = data_dict['message']
-                        # Simple heuristic to decide where to show status
-                        if "transcription started for" in status_msg.lower() or \
-                           "finished" in status_msg.lower() or \
-                           "saving" in status_msg.lower() or \
-                           "error" in status_msg.lower() or \
-                           "failed" in status_msg.lower():
-                             popup_window.after(0, lambda msg=status_msg: popup_window.update_current_action(msg))
-                        else: # Whisper's language detection etc.
-                            popup_window.after(0, lambda msg=status_msg: popup_window.update_detailed_progress(msg))
-
-                        if data_dict.get('is_error'):
-                            overall_success = False
-                # --- END Progress callback ---
-
-                transcribed_text = transcription_handler.transcribe_media_file(
-                    input_filepath,
-                    progress_callback=handle_transcription_progress_update,
-                    verbose_transcription=True
-                )
-
-                if not popup_window.winfo_exists() or popup_window.cancel_requested.is_set():
-                    if popup_window.winfo_exists() and popup_window.cancel_requested.is_set():
+                if not popup_window.is_open() or popup_window.cancel_requested.is_set():
+                    if popup_window.is_open() and popup_window.cancel_requested.is_set():
                          # If cancelled, add the portion of the current file that was actually processed
-                        accumulated_duration_of_completed_files += processed_time_for_current_file_via_segments
+                        accumulated_duration_of_completed_files += processed_time_for_current_file
                     overall_success = False; break
 
 
-                if transcribed_text is None: # Transcription failed for this file
-                    popup_window.after(0, lambda fn=filename_only: popup_window.update_detailed_progress(f"Failed to transcribe {fn}. Skipping."))
+                if transcription_result is None: # Transcription failed for this file
+                    popup_window.ui_bus.post(popup_window.update_detailed_progress, f"Failed to transcribe {filename_only}. Skipping.")
                     overall_success = False
+                    if segment_format:
+                        finish_segment_output(i, None) # Keeps what was decoded; later files in a combined file can follow
                     # Add the actual processed part of THIS FAILED file to the accumulated time
-                    accumulated_duration_of_completed_files += processed_time_for_current_file_via_segments
+                    accumulated_duration_of_completed_files += processed_time_for_current_file
                 else: # Transcription succeeded for this file
+                    transcribed_text = transcription_result["text"]
+                    from_manifest = transcription_result.get("from_manifest", False)
+                    if from_manifest:
+                        pass # Finished (and, for separate files, saved) in an earlier run
+                    elif transcription_result.get("from_cache"):
+                        cache_hits += 1
+                    else:
+                        cache_misses += 1
+                    popup_window.ui_bus.post(popup_window.update_cache_stats, cache_hits, cache_misses)
                     # File Saving Logic
-                    if is_separate:
+                    if segment_format:
+                        segment_output_path = finish_segment_output(i, transcription_result)
+                        if manifest and not from_manifest:
+                            manifest.mark_done(i, transcription_result, segment_output_path)
+                        if segment_output_path and is_separate:
+                            popup_window.ui_bus.post(popup_window.update_detailed_progress, f"Saved: {os.path.basename(segment_output_path)}")
+                    elif transcription_result.get("no_speech"):
+                        print(f"No speech detected in {filename_only}; no transcript written.")
+                        popup_window.ui_bus.post(popup_window.update_detailed_progress, f"No speech detected in {filename_only}. Skipped.")
+                        if not is_separate:
+                            all_text_combined.append(f"--- Transcription for {filename_only} ---\n[No speech detected]\n\n")
+                        if manifest and not from_manifest:
+                            manifest.mark_done(i, transcription_result)
+                    elif is_separate and from_manifest:
+                        popup_window.ui_bus.post(popup_window.update_detailed_progress, f"{filename_only} was saved in an earlier run.")
+                    elif is_separate:
                         current_output_filename = f"{file_base_name}.docx" if "Word" in output_format_str else f"{file_base_name}.pdf"
                         output_filepath_full = os.path.join(output_dir, current_output_filename)
-                        popup_window.after(0, lambda fn=current_output_filename: popup_window.update_current_action(f"Saving: {fn}..."))
+                        popup_window.ui_bus.post(popup_window.update_detailed_progress, f"Saving {current_output_filename} in the background...")
 
-                        save_successful = False
-                        status_saver_cb = lambda msg_data: popup_window.after(0, lambda m=(msg_data if isinstance(msg_data, dict) else {'type':'status', 'message': str(msg_data)}).get('message', str(msg_data)): popup_window.update_detailed_progress(m))
+                        # Export outcomes share the detail line with the next file's segments; the latest one shows
+                        status_saver_cb = lambda message: popup_window.ui_bus.post(popup_window.update_detailed_progress, str(message))
 
-                        if "Word" in output_format_str:
-                            save_successful = file_export_handler.save_text_to_word(transcribed_text, output_filepath_full, status_callback=status_saver_cb)
-                        else:
-                            save_successful = file_export_handler.save_text_to_pdf(transcribed_text, output_filepath_full, status_callback=status_saver_cb)
-                        if not save_successful:
-                            overall_success = False
-                            popup_window.after(0, lambda fn=current_output_filename: popup_window.update_detailed_progress(f"Failed to save {fn}."))
+                        def on_export_done(index, ok, output_path, result=transcription_result):
+                            fn = os.path.basename(output_path)
+                            if not ok:
+                                popup_window.ui_bus.post(popup_window.update_detailed_progress, f"Failed to save {fn}.")
+                            elif manifest:
+                                manifest.mark_done(index, result, output_path)
+
+                        save_function = file_export_handler.save_text_to_word if "Word" in output_format_str else file_export_handler.save_text_to_pdf
+                        export_pool.submit(i, metrics.timed("export", save_function, i), transcribed_text, output_filepath_full,
+                                           status_callback=status_saver_cb, on_done=on_export_done)
                     else:
                         all_text_combined.append(f"--- Transcription for {filename_only} ---\n{transcribed_text}\n\n")
+                        if manifest and not from_manifest:
+                            manifest.mark_done(i, transcription_result) # The combined file is rebuilt from the manifest on resume
+
+
+                    accumulated_duration_of_completed_files += duration_of(i)
+
 
+                # Update progress bar to reflect completion of this file's contribution
 
-                    accumulated_duration_of_completed_files += current_file_duration
+                if total_duration_all_files() > 0:
+                    progress_val = min(1.0, (accumulated_duration_of_completed_files + sum(processed_time_by_file_in_progress.values())) / total_duration_all_files())
+                    popup_window.ui_bus.post(popup_window.update_progress_bar_value, progress_val)
 
+            batch_results.close() # Stops any workers still running after an early break
 
-                # Update progress bar to reflect completion of this file's contribution before starting next
+            if export_pool:
+                if export_pool.pending() and popup_window.is_open():
+                    popup_window.ui_bus.post(popup_window.update_current_action, f"Finishing {export_pool.pending()} pending export(s)...")
+                export_pool.wait() # Transcripts that are already done are still written after a cancel
+                failed_exports = export_pool.failed()
+                if failed_exports:
+                    overall_success = False
+                    print(f"Failed to save: {', '.join(os.path.basename(files_to_process[j]) for j in failed_exports)}")
 
-                if total_duration_all_files > 0:
-                    progress_val = min(1.0, accumulated_duration_of_completed_files / total_duration_all_files)
-                    print(f"UI_HOME_SCREEN DEBUG (End of File {i+1}): acc_dur_completed={accumulated_duration_of_completed_files:.2f}, "
-                          f"final_file_progress_val={progress_val:.4f}")
-                    popup_window.after(0, lambda p=progress_val: popup_window.update_progress_bar_value(p))
+            if files_finished < len(files_to_process):
+                # The engine stops early on cancellation
+                overall_success = False
+                if popup_window.is_open():
+                    popup_window.ui_bus.post(popup_window.update_current_action, "Cancellation acknowledged. Stopping...")
 
+            if combined_segment_writer:
+                combined_segment_writer.close()
+                print(f"Combined {segment_format} file written: {combined_segment_writer.writer.output_path}")
 
             # After the loop, if not creating separate files, save the combined content
             if not is_separate and all_text_combined:
-                if not popup_window.winfo_exists() or popup_window.cancel_requested.is_set(): overall_success = False
+                if not popup_window.is_open() or popup_window.cancel_requested.is_set(): overall_success = False
                 else:
                     combined_output_filename = f"{base_filename_user}.docx" if "Word" in output_format_str else f"{base_filename_user}.pdf"
                     combined_output_filepath_full = os.path.join(output_dir, combined_output_filename)
-                    popup_window.after(0, lambda fn=combined_output_filename: popup_window.update_current_action(f"Saving combined file: {fn}..."))
+                    popup_window.ui_bus.post(popup_window.update_current_action, f"Saving combined file: {combined_output_filename}...")
                     combined_text_str = "".join(all_text_combined)
 
-                    status_saver_cb_combined = lambda msg_data: popup_window.after(0, lambda m=(msg_data if isinstance(msg_data, dict) else {'type':'status', 'message': str(msg_data)}).get('message', str(msg_data)): popup_window.update_detailed_progress(m))
+                    status_saver_cb_combined = lambda msg_data: popup_window.ui_bus.post(popup_window.update_detailed_progress, (msg_data if isinstance(msg_data, dict) else {'type':'status', 'message': str(msg_data)}).get('message', str(msg_data)))
 
                     save_successful = False
-                    if "Word" in output_format_str:
-                        save_successful = file_export_handler.save_text_to_word(combined_text_str, combined_output_filepath_full, status_callback=status_saver_cb_combined)
-                    else:
-                        save_successful = file_export_handler.save_text_to_pdf(combined_text_str, combined_output_filepath_full, status_callback=status_saver_cb_combined)
+                    with metrics.measure("export"):
+                        if "Word" in output_format_str:
+                            save_successful = file_export_handler.save_text_to_word(combined_text_str, combined_output_filepath_full, status_callback=status_saver_cb_combined)
+                        else:
+                            save_successful = file_export_handler.save_text_to_pdf(combined_text_str, combined_output_filepath_full, status_callback=status_saver_cb_combined)
                     if not save_successful:
                         overall_success = False
-                        popup_window.after(0, lambda fn=combined_output_filename: popup_window.update_detailed_progress(f"Failed to save {fn}."))
+                        popup_window.ui_bus.post(popup_window.update_detailed_progress, f"Failed to save {combined_output_filename}.")
 
-            if overall_success and not popup_window.cancel_requested.is_set() and total_duration_all_files > 0:
-                 popup_window.after(0, lambda: popup_window.update_progress_bar_value(1.0))
+            if overall_success and not popup_window.cancel_requested.is_set():
+                if manifest:
+                    manifest.delete() # Nothing left to resume
+                if total_duration_all_files() > 0:
+                    popup_window.ui_bus.post(popup_window.update_progress_bar_value, 1.0)
 
         except Exception as e:
-            if popup_window.winfo_exists():
-                popup_window.after(0, lambda err=str(e): popup_window.update_detailed_progress(f"An error occurred in worker: {err}"))
+            if popup_window.is_open():
+                popup_window.ui_bus.post(popup_window.update_detailed_progress, f"An error occurred in worker: {e}")
             print(f"Error in transcription worker (ui_home_screen.py): {e}") # Log to console
             import traceback
             traceback.print_exc() # Print full traceback
             overall_success = False
         finally:
-            if popup_window.winfo_exists():
+            if export_pool:
+                export_pool.close()
+            # Whatever was decoded so far stays on disk as a valid file
+            for writer in segment_writers_by_file.values():
+                writer.close()
+            if combined_segment_writer:
+                combined_segment_writer.close()
+            if manifest:
+                manifest.close()
+            metrics.finish()
+            if config.METRICS_ENABLED:
+                report_paths = metrics.write_report()
+                if report_paths:
+                    print(f"Performance report: {report_paths[0]}")
+            if popup_window.is_open():
+                popup_window.ui_bus.post(popup_window.update_metrics_summary, metrics)
                 final_success_state = overall_success and not popup_window.cancel_requested.is_set()
-                popup_window.after(0, lambda s=final_success_state: popup_window.process_complete(s))
+                popup_window.ui_bus.call(popup_window.process_complete, final_success_state)
 
 
 
@@ -2,8 +2,8 @@ import customtkinter as ctk
 import webbrowser
 import threading
 import app_config as config
-import transcription_handler
 import system_checker # For system compatibility checks
+from startup_profile import STARTUP_PROFILER
 
 # Define a warning color 
 WARNING_TEXT_COLOR = "#FFA500" # Orange
@@ -20,6 +20,9 @@ class LoadingScreen(ctk.CTkFrame):
         self.model_loaded_event = threading.Event()
         self.model_load_success = False
         self.system_checks_passed_critically = False # For overall system readiness
+        self.cpu_info = {}
+        self.pytorch_info = None # Set by the model-loading thread, shown by the UI thread
+        self.compute_device_shown = False
 
         # --- Main container frame using grid ---
         self.main_container = ctk.CTkFrame(self, fg_color="transparent")
@@ -85,7 +88,7 @@ class LoadingScreen(ctk.CTkFrame):
         sys_check_heading_label.pack(fill="x", padx=10, pady=(10, 5))
         
         # Placeholder labels for system checks - will be updated
-        self.cuda_status_label = self._create_sys_check_label(self.sys_check_info_frame, "CUDA GPU:")
+        self.cuda_status_label = self._create_sys_check_label(self.sys_check_info_frame, "Compute Device:")
         self.ffmpeg_status_label = self._create_sys_check_label(self.sys_check_info_frame, "FFmpeg/FFprobe:")
         self.model_status_label = self._create_sys_check_label(self.sys_check_info_frame, f"Whisper Model ('{config.DEFAULT_WHISPER_MODEL}'):")
         self.summary_status_label = ctk.CTkLabel(
@@ -135,27 +138,17 @@ class LoadingScreen(ctk.CTkFrame):
         return label
 
     def run_system_checks(self):
-        """Runs system checks and updates the UI."""
-        report = system_checker.get_system_summary()
+        """
+        Runs the quick system checks and updates the UI. The compute device check imports torch, so it
+        runs on the model-loading thread and is shown by show_compute_device_check.
+        """
+        with STARTUP_PROFILER.phase("system checks"):
+            report = system_checker.get_system_summary(include_pytorch=False)
         all_critical_ok = True
         summary_messages = []
+        self.cpu_info = report['cpu']
 
-        # 1. PyTorch & CUDA
-        pytorch_info = report['pytorch']
-        if pytorch_info.get('installed') and pytorch_info.get('cuda_available'):
-            gpu_name = pytorch_info['gpus'][0]['name'] if pytorch_info.get('gpus') else "Unknown GPU"
-            self.cuda_status_label.configure(text=f"CUDA GPU: Detected ({gpu_name})", text_color=SUCCESS_TEXT_COLOR)
-            summary_messages.append("✓ CUDA GPU ready.")
-        elif pytorch_info.get('installed'):
-            self.cuda_status_label.configure(text="CUDA GPU: PyTorch CPU-only or CUDA error!", text_color=FAILURE_TEXT_COLOR)
-            summary_messages.append("✗ CRITICAL: PyTorch found but CUDA is not available. GPU acceleration will not work.")
-            all_critical_ok = False
-        else:
-            self.cuda_status_label.configure(text=f"CUDA GPU: PyTorch NOT installed!", text_color=FAILURE_TEXT_COLOR)
-            summary_messages.append("✗ CRITICAL: PyTorch is not installed.")
-            all_critical_ok = False
-        
-        # 2. FFprobe
+        # 1. FFprobe
         ffprobe_info = report['ffprobe']
         if ffprobe_info['found']:
             self.ffmpeg_status_label.configure(text=f"FFmpeg/FFprobe: Found (v{ffprobe_info.get('version', 'Unknown')})", text_color=SUCCESS_TEXT_COLOR)
@@ -177,6 +170,29 @@ class LoadingScreen(ctk.CTkFrame):
         
         self.system_checks_passed_critically = all_critical_ok
 
+    def show_compute_device_check(self, pytorch_info):
+        """Shows the PyTorch & compute device check (CUDA if available, otherwise CPU). UI thread only."""
+        requested_device = (config.WHISPER_DEVICE or "auto").lower()
+        critical_message = None
+        if pytorch_info.get('installed') and pytorch_info.get('cuda_available') and requested_device != "cpu":
+            gpu_name = pytorch_info['gpus'][0]['name'] if pytorch_info.get('gpus') else "Unknown GPU"
+            self.cuda_status_label.configure(text=f"Compute Device: CUDA ({gpu_name})", text_color=SUCCESS_TEXT_COLOR)
+        elif pytorch_info.get('installed') and requested_device == "cuda":
+            self.cuda_status_label.configure(text="Compute Device: CUDA requested but not available!", text_color=FAILURE_TEXT_COLOR)
+            critical_message = "CUDA was requested but is not available."
+        elif pytorch_info.get('installed'):
+            precision = (config.WHISPER_CPU_PRECISION or "fp32").lower()
+            self.cuda_status_label.configure(text=f"Compute Device: CPU ({self.cpu_info.get('logical_cores', '?')} cores, {precision})", text_color=SUCCESS_TEXT_COLOR)
+        else:
+            self.cuda_status_label.configure(text=f"Compute Device: PyTorch NOT installed!", text_color=FAILURE_TEXT_COLOR)
+            critical_message = "PyTorch is not installed."
+
+        if critical_message:
+            self.system_checks_passed_critically = False
+            final_summary = f"Critical pre-requisites not met (see red items).\n{critical_message}"
+            self.summary_status_label.configure(text=final_summary, text_color=FAILURE_TEXT_COLOR)
+        self.compute_device_shown = True
+
 
     def open_link(self, url):
         try: webbrowser.open_new_tab(url)
@@ -216,10 +232,19 @@ class LoadingScreen(ctk.CTkFrame):
                     msg["is_model_status"] = True
                     self.update_status_from_thread(msg)
 
-            self.model_load_success = transcription_handler.initialize_whisper_model(
-                model_name=config.DEFAULT_WHISPER_MODEL,
-                status_callback=model_status_cb
-            )
+            with STARTUP_PROFILER.phase("system checks: PyTorch and CUDA"):
+                self.pytorch_info = system_checker.get_pytorch_info() # Imports torch, so it runs here rather than on the UI thread
+            if not self.pytorch_info.get('installed'):
+                model_status_cb("Error: PyTorch is not installed; the model can't be loaded.")
+                self.model_loaded_event.set()
+                return
+            with STARTUP_PROFILER.phase("imports: engine (torch, whisper)"):
+                import transcription_handler # Heavy, so imported here on the loader thread rather than at startup
+            with STARTUP_PROFILER.phase("model load"):
+                self.model_load_success = transcription_handler.initialize_whisper_model(
+                    model_name=config.DEFAULT_WHISPER_MODEL,
+                    status_callback=model_status_cb
+                )
             self.model_loaded_event.set()
         
         thread = threading.Thread(target=_load_model, daemon=True)
@@ -278,11 +303,16 @@ class LoadingScreen(ctk.CTkFrame):
             else:
                 self.continue_button.configure(state="normal") # Still enable to allow exit command
 
+            STARTUP_PROFILER.mark("ready")
+            STARTUP_PROFILER.report()
+
             if self.on_load_complete_callback:
                 self.on_load_complete_callback(overall_readiness)
 
 
     def wait_for_model_and_proceed(self, step_target_progress):
+        if self.pytorch_info is not None and not self.compute_device_shown:
+            self.show_compute_device_check(self.pytorch_info)
         if self.model_loaded_event.is_set():
             if not self.model_load_success:
                 
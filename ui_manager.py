@@ -5,6 +5,7 @@ from ui_loading_Screen import LoadingScreen # Assuming LoadingScreen is now a CT
 from ui_home_screen import HomeScreen # Your placeholder HomeScreen
 import app_config as config
 import tkinter as tk # For messagebox
+from startup_profile import STARTUP_PROFILER
 
 class UIManager:
     def __init__(self, root_app_window: ctk.CTk):
@@ -53,7 +54,7 @@ class UIManager:
             error_label = ctk.CTkLabel(
                 self.root,
                 text="Critical Error: Transcription model failed to load.\n"
-                     "CUDA might not be available or the model files are missing.\n"
+                     "The requested device might not be available or the model files are missing.\n"
                      "Please check the console output for details.\nApplication cannot continue.",
                 font=ctk.CTkFont(family=config.FONT_FAMILY_POPPINS, size=16),
                 text_color="red",
@@ -72,7 +73,9 @@ class UIManager:
 
             return
 
-        self.current_frame = HomeScreen(master=self.root)
-        self.current_frame.pack(expand=True, fill="both")
+        with STARTUP_PROFILER.phase("home screen"):
+            self.current_frame = HomeScreen(master=self.root)
+            self.current_frame.pack(expand=True, fill="both")
         print("UIManager: Switched to Home Screen.")
+        STARTUP_PROFILER.report() # Adds the home screen phases to the loading screen's report
 
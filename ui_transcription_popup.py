@@ -4,6 +4,7 @@ import app_config as config
 import os # For os.startfile
 import threading
 import time  
+from ui_update_bus import UiUpdateBus
 
 class TranscriptionPopup(ctk.CTkToplevel):
     def __init__(self, master, total_files, output_folder_path, total_estimated_duration_seconds=0, **kwargs):
@@ -13,7 +14,12 @@ class TranscriptionPopup(ctk.CTkToplevel):
         self.total_files = total_files
         self.files_processed = 0
         self.cancel_requested = threading.Event()
+        self.pause_requested = threading.Event() # Set while paused; the worker waits at its next decoded window
         self.total_estimated_duration_seconds = total_estimated_duration_seconds # Store for potential use
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Worker threads post their updates here; the main loop applies them once per frame
+        self.ui_bus = UiUpdateBus(self)
 
         self.title("Transcription Progress")
         width = getattr(config, "POPUP_WINDOW_WIDTH", 480) 
@@ -41,7 +47,8 @@ class TranscriptionPopup(ctk.CTkToplevel):
         self.main_frame.grid_rowconfigure(1, weight=0) # current_action_label
         self.main_frame.grid_rowconfigure(2, weight=1, minsize=40) # detailed_progress_label (allow to expand if needed, but also minsize)
         self.main_frame.grid_rowconfigure(3, weight=0) # progress_bar
-        self.main_frame.grid_rowconfigure(4, weight=0) # button_frame
+        self.main_frame.grid_rowconfigure(4, weight=0) # metrics_label
+        self.main_frame.grid_rowconfigure(5, weight=0) # button_frame
         self.main_frame.grid_columnconfigure(0, weight=1)
 
 
@@ -82,11 +89,19 @@ class TranscriptionPopup(ctk.CTkToplevel):
             progress_color=config.BUTTON_PRIMARY_COLOR
         )
         self.progress_bar.set(0)
-        self.progress_bar.grid(row=3, column=0, pady=(10,15), padx=10, sticky="ew") 
+        self.progress_bar.grid(row=3, column=0, pady=(10,5), padx=10, sticky="ew") 
+
+        # Live performance summary (real-time factor, segments/s, time to first segment, peak memory)
+        self.metrics_label = ctk.CTkLabel(
+            self.main_frame, text="",
+            font=ctk.CTkFont(family=config.FONT_FAMILY_POPPINS, size=10),
+            text_color=config.SUB_CHILD_TEXT_COLOR
+        )
+        self.metrics_label.grid(row=4, column=0, pady=(0,10), sticky="ew")
 
         self.button_frame = ctk.CTkFrame(self.main_frame, fg_color="transparent")
-        self.button_frame.grid(row=4, column=0, pady=(5,0), sticky="ew") 
-        self.button_frame.grid_columnconfigure((0,1), weight=1)
+        self.button_frame.grid(row=5, column=0, pady=(5,0), sticky="ew") 
+        self.button_frame.grid_columnconfigure((0,1,2), weight=1)
 
         cancel_button_style_custom = {
             "hover_color": "red",
@@ -102,6 +117,14 @@ class TranscriptionPopup(ctk.CTkToplevel):
         )
         self.cancel_button.grid(row=0, column=0, padx=(0,5), sticky="ew")
 
+        self.pause_button = ctk.CTkButton(
+            self.button_frame, text="Pause",
+            command=self.toggle_pause,
+            font=ctk.CTkFont(family=config.BUTTON_FONT_TUPLE[0], size=config.BUTTON_FONT_TUPLE[1], weight=config.BUTTON_FONT_TUPLE[2]),
+            **config.DEFAULT_BUTTON_STYLE
+        )
+        self.pause_button.grid(row=0, column=1, padx=5, sticky="ew")
+
         self.go_to_folder_button = ctk.CTkButton(
             self.button_frame, text="Go to Folder",
             command=self.open_output_folder,
@@ -109,15 +132,29 @@ class TranscriptionPopup(ctk.CTkToplevel):
             font=ctk.CTkFont(family=config.BUTTON_FONT_TUPLE[0], size=config.BUTTON_FONT_TUPLE[1], weight=config.BUTTON_FONT_TUPLE[2]),
             **config.DEFAULT_BUTTON_STYLE
         )
-        self.go_to_folder_button.grid(row=0, column=1, padx=(5,0), sticky="ew")
+        self.go_to_folder_button.grid(row=0, column=2, padx=(5,0), sticky="ew")
 
         self.ok_button = None
 
+    def _overall_status_text(self) -> str:
+        text = f"Processing file {self.files_processed} of {self.total_files}..."
+        if self.cache_hits:
+            text += f" ({self.cache_hits} cached)"
+        return text
+
+    def _cache_stats_text(self) -> str:
+        return f"Cache: {self.cache_hits} hit(s), {self.cache_misses} miss(es)"
+
     def update_overall_status(self, files_done: int):
         self.files_processed = files_done
         if self.winfo_exists():
-            self.overall_status_label.configure(text=f"Processing file {files_done} of {self.total_files}...")
-            self.update_idletasks()
+            self.overall_status_label.configure(text=self._overall_status_text())
+
+    def update_cache_stats(self, hits: int, misses: int):
+        self.cache_hits = hits
+        self.cache_misses = misses
+        if self.winfo_exists():
+            self.overall_status_label.configure(text=self._overall_status_text())
 
     def update_current_action(self, action_text: str):
         if self.winfo_exists():
@@ -126,7 +163,6 @@ class TranscriptionPopup(ctk.CTkToplevel):
             if len(action_text) > max_len:
                 action_text = action_text[:max_len-3] + "..."
             self.current_action_label.configure(text=action_text)
-            self.update_idletasks()
 
     def update_detailed_progress(self, segment_text: str):
         if self.winfo_exists():
@@ -138,12 +174,15 @@ class TranscriptionPopup(ctk.CTkToplevel):
                 display_text = segment_text
             
             self.detailed_progress_label.configure(text=display_text)
-            self.update_idletasks()
 
     def update_progress_bar_value(self, value: float):
         if self.winfo_exists():
             self.progress_bar.set(min(max(0.0, value), 1.0))
-            self.update_idletasks()
+
+    def update_metrics_summary(self, metrics):
+        # Takes the BatchMetrics itself, so the summary is only formatted when a frame is drawn
+        if self.winfo_exists():
+            self.metrics_label.configure(text=metrics.format_summary())
 
     def process_complete(self, success=True):
         if self.winfo_exists():
@@ -157,6 +196,8 @@ class TranscriptionPopup(ctk.CTkToplevel):
                 max_path_len = 50 
                 if len(self.output_folder_path) > max_path_len :
                     final_message = f"All files processed.\nOutput saved to folder:\n...{self.output_folder_path[-max_path_len:]}"
+                if self.cache_hits or self.cache_misses:
+                    final_message += f"\n{self._cache_stats_text()}"
 
                 self.current_action_label.configure(text=final_message)
                 self.progress_bar.set(1)
@@ -171,6 +212,8 @@ class TranscriptionPopup(ctk.CTkToplevel):
 
             if hasattr(self, 'cancel_button') and self.cancel_button.winfo_exists():
                 self.cancel_button.grid_remove()
+            if hasattr(self, 'pause_button') and self.pause_button.winfo_exists():
+                self.pause_button.grid_remove()
 
             self.ok_button = ctk.CTkButton(
                 self.button_frame, text="OK",
@@ -181,9 +224,9 @@ class TranscriptionPopup(ctk.CTkToplevel):
             # If cancel button was removed, ok_button should span or be centered.
             # If go_to_folder is also there, it shares space.
             if self.go_to_folder_button.winfo_ismapped() and self.go_to_folder_button.cget("state") == "normal":
-                self.ok_button.grid(row=0, column=0, padx=(0,5), sticky="ew") # next to go_to_folder
+                self.ok_button.grid(row=0, column=0, columnspan=2, padx=(0,5), sticky="ew") # next to go_to_folder
             else: # cancel is gone, go_to_folder is disabled or also gone
-                self.ok_button.grid(row=0, column=0, columnspan=2, padx=5, sticky="ew")
+                self.ok_button.grid(row=0, column=0, columnspan=3, padx=5, sticky="ew")
 
 
     def request_cancel(self):
@@ -191,9 +234,33 @@ class TranscriptionPopup(ctk.CTkToplevel):
             self.update_current_action("Cancellation requested, finishing current step...")
             if hasattr(self, 'cancel_button') and self.cancel_button.winfo_exists():
                 self.cancel_button.configure(state="disabled", text="Cancelling...")
-            self.cancel_requested.set()
+            if hasattr(self, 'pause_button') and self.pause_button.winfo_exists():
+                self.pause_button.configure(state="disabled")
+            self.cancel_requested.set() # Also ends a pause
             print("Transcription cancel requested by user.")
 
+    def toggle_pause(self):
+        if not self.winfo_exists() or self.cancel_requested.is_set():
+            return
+        if self.pause_requested.is_set():
+            self.pause_requested.clear()
+            self.pause_button.configure(text="Pause")
+            self.update_current_action("Resuming...")
+            print("Transcription resumed by user.")
+        else:
+            self.pause_requested.set()
+            self.pause_button.configure(text="Resume")
+            self.update_current_action("Paused after the current window. Press Resume to continue.")
+            print("Transcription paused by user.")
+
+    def is_open(self) -> bool:
+        """Thread-safe stand-in for winfo_exists(), for use by worker threads."""
+        return not self.ui_bus.closed
+
+    def destroy(self):
+        self.ui_bus.close()
+        super().destroy()
+
     def on_close_button(self):
         # self.request_cancel() # No, this would prevent closing if process complete
         self.destroy() # Just destroy the window. The worker thread is a daemon.
@@ -221,18 +288,18 @@ if __name__ == '__main__':
 
         def simulate_updates():
             for i in range(1, 6):
-                if not popup.winfo_exists() or popup.cancel_requested.is_set():
+                if not popup.is_open() or popup.cancel_requested.is_set():
                     break
-                popup.update_overall_status(i)
-                popup.update_current_action(f"Main action for file {i} - a somewhat longer action description to test its truncation.")
+                popup.ui_bus.post(popup.update_overall_status, i)
+                popup.ui_bus.post(popup.update_current_action, f"Main action for file {i} - a somewhat longer action description to test its truncation.")
                 if i % 2 == 0:
-                    popup.update_detailed_progress(long_text)
+                    popup.ui_bus.post(popup.update_detailed_progress, long_text)
                 else:
-                    popup.update_detailed_progress(short_text + f" (File {i})")
-                popup.update_progress_bar_value(i/5)
+                    popup.ui_bus.post(popup.update_detailed_progress, short_text + f" (File {i})")
+                popup.ui_bus.post(popup.update_progress_bar_value, i/5)
                 time.sleep(2)
-            if popup.winfo_exists():
-                popup.process_complete(not popup.cancel_requested.is_set())
+            if popup.is_open():
+                popup.ui_bus.call(popup.process_complete, not popup.cancel_requested.is_set())
 
 
 
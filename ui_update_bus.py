@@ -0,0 +1,60 @@
+# ui_update_bus.py
+import threading
+from collections import deque
+
+import app_config as config
+
+class UiUpdateBus:
+    """
+    Hands widget updates from worker threads to the Tk main loop, which applies them at most once
+    every UI_UPDATE_INTERVAL_MS.
+
+    post() is latest-value-wins: of several posts to the same callback between two frames only the
+    last one runs, so progress, action and detail updates cost one widget update per frame however
+    fast segments arrive. call() queues a callback that always runs, in order, after the posted
+    values of its frame (e.g. showing the final state). Both are safe to use from any thread and
+    never touch Tk themselves.
+    """
+    def __init__(self, widget, interval_ms: int = None):
+        self.widget = widget
+        self.interval_ms = max(1, interval_ms or config.UI_UPDATE_INTERVAL_MS)
+        self._lock = threading.Lock()
+        self._latest = {}  # callback -> args, in first-posted order
+        self._calls = deque()
+        self._closed = threading.Event()
+        self.widget.after(self.interval_ms, self._drain)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed.is_set()
+
+    def post(self, callback, *args):
+        if not self._closed.is_set():
+            with self._lock:
+                self._latest[callback] = args
+
+    def call(self, callback, *args):
+        if not self._closed.is_set():
+            with self._lock:
+                self._calls.append((callback, args))
+
+    def _drain(self):
+        if self._closed.is_set():
+            return
+        with self._lock:
+            latest, self._latest = self._latest, {}
+            calls, self._calls = self._calls, deque()
+        for callback, args in list(latest.items()) + list(calls):
+            try:
+                callback(*args)
+            except Exception as e:  # One failing update must not drop the rest of the frame
+                print(f"UiUpdateBus - Warning: UI update failed: {e}")
+        if not self._closed.is_set():
+            self.widget.after(self.interval_ms, self._drain)
+
+    def close(self):
+        """Drops anything still queued; called when the widget goes away."""
+        self._closed.set()
+        with self._lock:
+            self._latest.clear()
+            self._calls.clear()
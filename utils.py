@@ -6,24 +6,35 @@ def get_media_duration(filepath: str) -> float:
     """
     Gets the duration of a media file in seconds using ffprobe.
     Returns 0.0 if duration cannot be determined or ffprobe fails.
+    Only the container's duration is read; streams are inspected when it has none.
+    WAV and FLAC durations are read from the file header without starting ffprobe.
     """
     if not os.path.exists(filepath):
         
         print(f"Utils - Error: File not found for duration check: {filepath}")
         return 0.0
 
+    import native_audio # Pulls in numpy, so it is loaded with the first probe rather than at startup
+    duration = native_audio.media_duration(filepath)
+    if duration:
+        return duration
+
     command = [
         "ffprobe",
         "-v", "quiet",
         "-print_format", "json",
-        "-show_format",      
-        "-show_streams",     
+        "-show_entries", "format=duration",
         filepath
     ]
     try:
         # Using shell=False (default) and passing command as a list is safer
         result = subprocess.run(command, capture_output=True, text=True, check=True, encoding='utf-8')
         data = json.loads(result.stdout)
+        if not data.get('format', {}).get('duration'):
+            # Some containers only report durations per stream
+            command[command.index("-show_entries") + 1] = "stream=codec_type,duration"
+            result = subprocess.run(command, capture_output=True, text=True, check=True, encoding='utf-8')
+            data = json.loads(result.stdout)
         
         duration = None
         # Prefer duration from the format section
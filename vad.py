@@ -0,0 +1,128 @@
+# vad.py
+import bisect
+import numpy as np
+
+import app_config as config
+
+SAMPLE_RATE = 16000
+SPEECH_BAND_HZ = (300.0, 3400.0)
+FRAMES_PER_BLOCK = 8192 # Frames analysed per FFT block, bounds memory on multi-hour files
+
+def _frame_features(audio: np.ndarray, frame_length: int):
+    """Per-frame energy (dBFS) and energy inside the speech band (dBFS)."""
+    n_frames = len(audio) // frame_length
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.float32)
+    frames = audio[:n_frames * frame_length].reshape(n_frames, frame_length)
+    window = np.hanning(frame_length).astype(np.float32)
+    freqs = np.fft.rfftfreq(frame_length, d=1.0 / SAMPLE_RATE)
+    band = (freqs >= SPEECH_BAND_HZ[0]) & (freqs <= SPEECH_BAND_HZ[1])
+
+    energy_db = np.empty(n_frames, dtype=np.float32)
+    band_db = np.empty(n_frames, dtype=np.float32)
+    for block_start in range(0, n_frames, FRAMES_PER_BLOCK):
+        block = frames[block_start:block_start + FRAMES_PER_BLOCK]
+        mean_square = np.mean(np.square(block, dtype=np.float32), axis=1)
+        energy_db[block_start:block_start + len(block)] = 10.0 * np.log10(mean_square + 1e-20)
+        power = np.abs(np.fft.rfft(block * window, axis=1)) ** 2
+        band_share = power[:, band].sum(axis=1) / (power.sum(axis=1) + 1e-10)
+        band_db[block_start:block_start + len(block)] = 10.0 * np.log10(mean_square * band_share + 1e-20)
+    return energy_db, band_db
+
+def detect_speech_regions(audio: np.ndarray, frame_ms: int = None, threshold_db: float = None,
+                          min_speech_ms: int = None, min_silence_ms: int = None, speech_pad_ms: int = None):
+    """
+    Finds speech in 16 kHz mono float32 audio with an energy + spectral VAD.
+
+    A frame counts as speech when its energy in the speech band is `threshold_db` above the noise floor
+    and its overall energy is above VAD_ABSOLUTE_FLOOR_DB. The noise floor is a low percentile of the
+    band energies (VAD_NOISE_PERCENTILE), capped at VAD_ABSOLUTE_FLOOR_DB: in continuous speech, music
+    beds or compressed audio the quietest frames are not silence, so they must not raise the bar. Band
+    energy rather than band share is compared, so speech over a loud bass bed still counts.
+    Gaps shorter than `min_silence_ms` are bridged, regions shorter than `min_speech_ms` are dropped and
+    each region is padded by `speech_pad_ms`. Returns a list of (start_sample, end_sample).
+    """
+    frame_ms = frame_ms or config.VAD_FRAME_MS
+    threshold_db = config.VAD_THRESHOLD_DB if threshold_db is None else threshold_db
+    min_speech_ms = config.VAD_MIN_SPEECH_MS if min_speech_ms is None else min_speech_ms
+    min_silence_ms = config.VAD_MIN_SILENCE_MS if min_silence_ms is None else min_silence_ms
+    speech_pad_ms = config.VAD_SPEECH_PAD_MS if speech_pad_ms is None else speech_pad_ms
+
+    frame_length = SAMPLE_RATE * frame_ms // 1000
+    energy_db, band_db = _frame_features(np.asarray(audio, dtype=np.float32), frame_length)
+    if len(energy_db) == 0:
+        return []
+
+    noise_floor_db = min(np.percentile(band_db, config.VAD_NOISE_PERCENTILE), config.VAD_ABSOLUTE_FLOOR_DB)
+    is_speech = (band_db > noise_floor_db + threshold_db) & (energy_db > config.VAD_ABSOLUTE_FLOOR_DB)
+    if not is_speech.any():
+        return []
+
+    # Run boundaries of consecutive speech frames
+    padded = np.concatenate(([False], is_speech, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    starts, ends = edges[0::2], edges[1::2]
+
+    min_silence_frames = max(1, min_silence_ms // frame_ms)
+    min_speech_frames = max(1, min_speech_ms // frame_ms)
+    merged = []
+    for start, end in zip(starts, ends):
+        if merged and start - merged[-1][1] < min_silence_frames:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    pad_samples = SAMPLE_RATE * speech_pad_ms // 1000
+    regions = []
+    for start, end in merged:
+        if end - start < min_speech_frames:
+            continue
+        start_sample = int(max(0, start * frame_length - pad_samples))
+        end_sample = int(min(len(audio), end * frame_length + pad_samples))
+        if regions and start_sample <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], end_sample) # Padding made neighbours overlap
+        else:
+            regions.append((start_sample, end_sample))
+    return regions
+
+class SpeechTimeline:
+    """Maps times in the concatenated speech-only audio back to the original file's timeline."""
+    def __init__(self, pieces):
+        self.pieces = pieces # (speech_start_s, original_start_s, duration_s), sorted by speech_start_s
+        self._speech_starts = [piece[0] for piece in pieces]
+
+    def to_original(self, speech_time: float) -> float:
+        index = max(0, bisect.bisect_right(self._speech_starts, speech_time) - 1)
+        speech_start, original_start, duration = self.pieces[index]
+        return original_start + min(max(0.0, speech_time - speech_start), duration)
+
+    def remap_segment(self, segment: dict) -> dict:
+        return {**segment, "start": self.to_original(segment["start"]), "end": self.to_original(segment["end"])}
+
+def build_speech_audio(audio: np.ndarray, regions, gap_ms: int = None):
+    """
+    Concatenates the speech regions (separated by short silent gaps so Whisper still sees a pause)
+    and returns (speech_audio, SpeechTimeline).
+    """
+    gap_ms = config.VAD_GAP_MS if gap_ms is None else gap_ms
+    gap = np.zeros(SAMPLE_RATE * gap_ms // 1000, dtype=np.float32)
+    parts, pieces = [], []
+    position = 0
+    for start, end in regions:
+        if parts and len(gap):
+            parts.append(gap)
+            position += len(gap)
+        parts.append(audio[start:end])
+        pieces.append((position / SAMPLE_RATE, start / SAMPLE_RATE, (end - start) / SAMPLE_RATE))
+        position += end - start
+    speech_audio = np.concatenate(parts).astype(np.float32, copy=False) if parts else np.zeros(0, dtype=np.float32)
+    return speech_audio, SpeechTimeline(pieces)
+
+def vad_settings() -> dict:
+    """Current VAD parameters, used as part of the transcription cache key."""
+    return {
+        "frame_ms": config.VAD_FRAME_MS, "threshold_db": config.VAD_THRESHOLD_DB,
+        "absolute_floor_db": config.VAD_ABSOLUTE_FLOOR_DB, "noise_percentile": config.VAD_NOISE_PERCENTILE,
+        "min_speech_ms": config.VAD_MIN_SPEECH_MS, "min_silence_ms": config.VAD_MIN_SILENCE_MS,
+        "speech_pad_ms": config.VAD_SPEECH_PAD_MS, "gap_ms": config.VAD_GAP_MS,
+    }
@@ -0,0 +1,88 @@
+# window_decoding.py
+"""
+Rules for turning one decoded 30-second window into segments, shared by the sequential decode loop
+(transcription_handler), the batched decoder (batched_inference) and the streaming session. Plain
+Python on token lists, so importing it loads neither torch nor whisper.
+"""
+SAMPLE_RATE = 16000  # whisper.audio's values
+HOP_LENGTH = 160
+N_FRAMES = 3000  # Mel frames in a 30-second window
+INPUT_STRIDE = N_FRAMES // 1500  # Mel frames per output token (n_audio_ctx is 1500 for every model): 2
+TIME_PRECISION = INPUT_STRIDE * HOP_LENGTH / SAMPLE_RATE  # Time per output token: 0.02 (seconds)
+
+DEFAULT_TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+def needs_fallback(decode_result, compression_ratio_threshold, logprob_threshold, no_speech_threshold) -> bool:
+    """Whether a decoding result should be retried at the next temperature."""
+    retry = False
+    if compression_ratio_threshold is not None and decode_result.compression_ratio > compression_ratio_threshold:
+        retry = True  # Too repetitive
+    if logprob_threshold is not None and decode_result.avg_logprob < logprob_threshold:
+        retry = True  # Average log probability is too low
+    if (no_speech_threshold is not None and decode_result.no_speech_prob > no_speech_threshold
+            and logprob_threshold is not None and decode_result.avg_logprob < logprob_threshold):
+        retry = False  # Silence
+    return retry
+
+def is_silent_window(decode_result, logprob_threshold, no_speech_threshold) -> bool:
+    """Whether a decoded window is silence and its segments should be dropped."""
+    if no_speech_threshold is None:
+        return False
+    should_skip = decode_result.no_speech_prob > no_speech_threshold
+    if logprob_threshold is not None and decode_result.avg_logprob > logprob_threshold:
+        should_skip = False  # Don't skip if the log probability is high enough despite no_speech_prob
+    return should_skip
+
+def split_window_segments(tokens, tokenizer, time_offset: float, segment_size: int, keep_tail: bool = False):
+    """
+    Splits the decoded tokens of one 30-second window (a list or 1-D tensor) into segments at
+    consecutive timestamp tokens. Returns ([{"start", "end", "text", "tokens"}, ...], mel frames to
+    advance the seek by). Instantaneous or empty segments are dropped.
+
+    Tokens after the last complete segment are normally left for the next seek, which decodes that
+    audio again. Callers with fixed windows that never re-seek pass keep_tail=True: those tokens then
+    become a final segment running to the end of the window, and the seek advances by the whole window.
+    """
+    tokens = tokens.tolist() if hasattr(tokens, "tolist") else list(tokens)
+    timestamp_begin = tokenizer.timestamp_begin
+    is_timestamp = [token >= timestamp_begin for token in tokens]
+    single_timestamp_ending = is_timestamp[-2:] == [False, True]
+    consecutive = [index + 1 for index in range(len(tokens) - 1) if is_timestamp[index] and is_timestamp[index + 1]]
+
+    raw_segments = []
+    if consecutive:
+        # The window contains several segments delimited by consecutive timestamp tokens
+        slices = consecutive + ([len(tokens)] if single_timestamp_ending else [])
+        last_slice = 0
+        for current_slice in slices:
+            sliced_tokens = tokens[last_slice:current_slice]
+            start_pos = sliced_tokens[0] - timestamp_begin
+            end_pos = sliced_tokens[-1] - timestamp_begin
+            raw_segments.append((time_offset + start_pos * TIME_PRECISION,
+                                 time_offset + end_pos * TIME_PRECISION, sliced_tokens))
+            last_slice = current_slice
+        if single_timestamp_ending:
+            seek_advance = segment_size
+        elif keep_tail and last_slice < len(tokens):
+            # The tail starts at the timestamp that opened it and runs to the end of the window
+            raw_segments.append((time_offset + (tokens[last_slice] - timestamp_begin) * TIME_PRECISION,
+                                 time_offset + segment_size * HOP_LENGTH / SAMPLE_RATE, tokens[last_slice:]))
+            seek_advance = segment_size
+        else:
+            # Resume from the last complete segment
+            seek_advance = (tokens[last_slice - 1] - timestamp_begin) * INPUT_STRIDE
+    else:
+        duration = segment_size * HOP_LENGTH / SAMPLE_RATE
+        timestamps = [token for token, timestamp in zip(tokens, is_timestamp) if timestamp]
+        if timestamps and timestamps[-1] != timestamp_begin:
+            duration = (timestamps[-1] - timestamp_begin) * TIME_PRECISION
+        raw_segments.append((time_offset, time_offset + duration, tokens))
+        seek_advance = segment_size
+
+    window_segments = []
+    for seg_start, seg_end, seg_tokens in raw_segments:
+        text = tokenizer.decode([t for t in seg_tokens if t < tokenizer.eot])
+        if seg_start == seg_end or not text.strip():
+            continue
+        window_segments.append({"start": seg_start, "end": seg_end, "text": text, "tokens": list(seg_tokens)})
+    return window_segments, seek_advance